@@ -1,14 +1,41 @@
-import OpenGL.GLUT as GLUT
 import OpenGL.GL as GL
 import glfw
+import argparse
+import os
 import time
 import numpy as np
 
 from camera import Camera
 from voxel_editor import VoxelEditor
-from utils import look_at, perspective
-from opengl_helpers import init_geometry, init_shaders, init_window, load_texture, set_matrices, set_selection_uniforms, update_offsets_buffer, update_materials_buffer, draw_voxels, draw_text_2d
-from constants import GRID_SIZE, VOXEL_SIZE, YAW, PITCH, RADIUS, WIDTH, HEIGHT
+from opengl_helpers import init_geometry, init_shaders, init_window, create_texture_array, create_material_ubo, bind_material_texture, set_matrices, set_selection_uniforms
+from text_renderer import TextRenderer
+from profiler import Profiler
+from materials import MATERIALS, load_material_layers, material_table
+from scene_file import save_scene
+from autosave import AutoSaver, AUTOSAVE_INTERVAL, recover_scene
+from renderer import ChunkRenderer, MODE_INSTANCED, MODE_MESHED
+from mesh_scheduler import MeshScheduler
+from gpu_picking import GpuPicker, PICK_POINT, PICK_RECT, decode_point, decode_region
+from streaming import StreamBuffer
+from terrain import generate_world, parse_dimensions, TERRAIN_SIZE, TERRAIN_HEIGHT
+from edit_server import EditServer, EDIT_SERVER_HOST, EDIT_SERVER_PORT
+from constants import GRID_SIZE, VOXEL_SIZE, YAW, PITCH, RADIUS, WIDTH, HEIGHT, IDLE_WAIT_TIMEOUT, LOD_DISTANCE
+
+LOOP_IDLE = "idle"                         # klatka rysowana tylko po zmianie stanu, pętla czeka na zdarzenia
+LOOP_CONTINUOUS = "continuous"             # klatka rysowana w każdym obiegu pętli
+PICKING_CPU = "cpu"                        # wybór voxela promieniem na CPU
+PICKING_GPU = "gpu"                        # wybór voxela z bufora identyfikatorów (wynik w kolejnej klatce)
+UPLOAD_STREAM = "stream"                   # dane chunków wysyłane przez zmapowany pierścień (StreamBuffer)
+UPLOAD_DIRECT = "direct"                   # dane chunków wysyłane glBufferData/glBufferSubData
+HELP_LINES = [
+    "A: dodaj blok",
+    "D: usun blok",
+    "Klawisze 1-5: wybór materialu (1-drewno, 2-trawa, 3-kamien, 4-piasek, 5-liście)",
+    "Rolka: zoom",
+    "PPM + ruch myszą: obracanie kamery",
+    "Ctrl+Z / Ctrl+Y: cofnij / ponów",
+]
+MARQUEE_MIN_DRAG = 4                       # minimalne przeciągnięcie (px), od którego powstaje prostokąt zaznaczenia
 
 def cursor_pos_callback(window, x, y):
     """
@@ -24,6 +51,7 @@ def cursor_pos_callback(window, x, y):
 
     app.last_mouse_pos = app.mouse_pos[:]
     app.mouse_pos = [x, y]
+    app.dirty = True
 
     if app.mouse_right:
         dx = app.mouse_pos[0] - app.last_mouse_pos[0]
@@ -46,6 +74,14 @@ def mouse_button_callback(window, button, action, mods):
 
     if button == glfw.MOUSE_BUTTON_LEFT:
         app.mouse_left = (action == glfw.PRESS)
+        if action == glfw.PRESS:
+            app.marquee_start = app.mouse_pos[:]
+        elif app.marquee_start is not None:
+            start, end = app.marquee_start, app.mouse_pos
+            if max(abs(end[0] - start[0]), abs(end[1] - start[1])) >= MARQUEE_MIN_DRAG:
+                app.marquee_rect = (start[0], start[1], end[0], end[1])
+                app.dirty = True
+            app.marquee_start = None
     if button == glfw.MOUSE_BUTTON_RIGHT:
         app.mouse_right = (action == glfw.PRESS)
 
@@ -63,111 +99,447 @@ def scroll_callback(window, xoffset, yoffset):
         return
     app.camera.zoom(yoffset)
 
+
+def key_callback(window, key, scancode, action, mods):
+    """
+    Callback obsługujący klawiaturę. Klawisze są odczytywane w pętli głównej,
+    tutaj jedynie oznaczamy, że stan mógł się zmienić.
+
+    :param window: Okno GLFW.
+    :param int key: Klawisz.
+    :param int action: Akcja (naciśnięcie, powtórzenie lub zwolnienie).
+    """
+    app = glfw.get_window_user_pointer(window)
+    if app is None:
+        return
+    app.dirty = True
+
+
+def framebuffer_size_callback(window, width, height):
+    """
+    Callback obsługujący zmianę rozmiaru okna.
+
+    :param window: Okno GLFW.
+    :param int width: Nowa szerokość bufora ramki.
+    :param int height: Nowa wysokość bufora ramki.
+    """
+    window_refresh_callback(window)
+
+
+def window_refresh_callback(window):
+    """
+    Callback wywoływany, gdy zawartość okna musi zostać narysowana ponownie (np. po odsłonięciu).
+
+    :param window: Okno GLFW.
+    """
+    app = glfw.get_window_user_pointer(window)
+    if app is None:
+        return
+    app.dirty = True
+
+
+"""
+Statystyki pętli głównej: liczba narysowanych klatek oraz użycie procesora,
+osobno dla obiegów bez rysowania (bezczynność).
+"""
+class LoopStats:
+    def __init__(self):
+        self.frames = 0
+        self.iterations = 0
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.idle_wall = 0.0               # czas obiegów bez rysowania (łącznie z oczekiwaniem)
+        self.idle_cpu = 0.0
+        self.sample_wall = self.start_wall
+        self.sample_cpu = self.start_cpu
+        self.cpu_percent = 0.0             # użycie procesora od poprzedniej próbki
+
+    def record(self, wall, cpu, rendered):
+        """
+        Zapisuje jeden obieg pętli.
+
+        :param float wall: Czas rzeczywisty obiegu (s).
+        :param float cpu: Czas procesora obiegu (s).
+        :param bool rendered: Czy w obiegu narysowano klatkę.
+        """
+        self.iterations += 1
+        if rendered:
+            self.frames += 1
+        else:
+            self.idle_wall += wall
+            self.idle_cpu += cpu
+
+        now_wall, now_cpu = time.perf_counter(), time.process_time()
+        if now_wall - self.sample_wall >= 1.0:
+            self.cpu_percent = 100.0 * (now_cpu - self.sample_cpu) / (now_wall - self.sample_wall)
+            self.sample_wall, self.sample_cpu = now_wall, now_cpu
+
+    def summary(self):
+        """Zwraca podsumowanie całego działania pętli jako tekst."""
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        idle = 100.0 * self.idle_cpu / self.idle_wall if self.idle_wall > 0 else 0.0
+        return (f"klatki: {self.frames}, obiegi pętli: {self.iterations}, czas: {wall:.1f} s, "
+                f"CPU: {100.0 * cpu / max(wall, 1e-9):.1f}%, CPU w bezczynności: {idle:.1f}%")
+
 """Główna klasa aplikacji."""
 class App:
-    def __init__(self):
+    def __init__(self, loop_mode=LOOP_IDLE, picking=PICKING_CPU, profile=False, gpu_timers=False, scene_path=None, autosave_interval=AUTOSAVE_INTERVAL,
+                 lod_distance=LOD_DISTANCE, upload=UPLOAD_STREAM, edit_server=None, generate=None, seed=0):
         self.window = init_window()
-        self.camera = Camera(YAW, PITCH, RADIUS)
-        self.world = VoxelEditor(GRID_SIZE, VOXEL_SIZE)
+        self.loop_mode = loop_mode
+        self.dirty = True                  # zdarzenie okna wymaga narysowania nowej klatki
+        self.rendered_state = None         # (wersja kamery, wersja świata, tryb) ostatniej klatki
+        self.stats = LoopStats()
+        self.scene_path = scene_path       # plik sceny zapisywany klawiszami Ctrl+S
+        self.autosave = None               # autozapis sceny w tle (AutoSaver) lub None
+        if generate is None:
+            new_world = lambda: (VoxelEditor(GRID_SIZE, VOXEL_SIZE), MATERIALS)
+        else:
+            # nowy świat (także gdy brak pliku sceny) z wygenerowanym terenem (rozmiar, wysokość)
+            new_world = lambda: (generate_world(*generate, seed=seed), MATERIALS)
+        if scene_path is None:
+            self.world, self.materials = new_world()
+        else:
+            self.world, self.materials, replayed, dirty = recover_scene(scene_path, new_world)
+            if replayed:
+                print(f"Odtworzono {replayed} zmian z dziennika autozapisu ({len(dirty)} chunków)")
+            if autosave_interval > 0:
+                self.autosave = AutoSaver(self.world, scene_path, self.materials, interval=autosave_interval, dirty=dirty)
+        # kamera i zakres przybliżania dopasowane do rozmiaru świata
+        scale = max(self.world.grid_size / GRID_SIZE, 1.0)
+        self.camera = Camera(YAW, PITCH, RADIUS * scale, near=0.1 * scale, far=500.0 * scale, max_radius=100.0 * scale)
+        self.edit_server = None            # lokalny serwer edycji (EditServer) lub None
+        if edit_server is not None:
+            # po autozapisie: serwer przekazuje zmiany świata dalej do dziennika autozapisu
+            self.edit_server = EditServer(self.world, edit_server, on_queued=glfw.post_empty_event)
+            print(f"Serwer edycji nasłuchuje na {self.edit_server.describe()}")
 
         self.mouse_pos = [WIDTH / 2.0, HEIGHT / 2.0]
         self.last_mouse_pos = self.mouse_pos.copy()
         self.mouse_left = False
         self.mouse_right = False
+        self.marquee_start = None          # pozycja myszy przy wciśnięciu LPM
+        self.marquee_rect = None           # prostokąt zaznaczenia czekający na odczyt z bufora wyboru
+        self.marquee_selection = np.zeros((0, 3), dtype=np.int64)
 
         glfw.set_window_user_pointer(self.window, self)
         glfw.set_cursor_pos_callback(self.window, cursor_pos_callback)
         glfw.set_mouse_button_callback(self.window, mouse_button_callback)
         glfw.set_scroll_callback(self.window, scroll_callback)
+        glfw.set_key_callback(self.window, key_callback)
+        glfw.set_framebuffer_size_callback(self.window, framebuffer_size_callback)
+        glfw.set_window_refresh_callback(self.window, window_refresh_callback)
 
-        self.program, self.loc_view, self.loc_proj, self.loc_selected, self.loc_highlight, self.loc_light, self.loc_viewpos = init_shaders()
+        self.programs = {
+            MODE_INSTANCED: init_shaders("shaders/voxel.vert", "shaders/voxel.frag"),
+            MODE_MESHED: init_shaders("shaders/voxel_mesh.vert", "shaders/voxel.frag"),
+        }
 
-        GLUT.glutInit()
         GL.glEnable(GL.GL_DEPTH_TEST)
 
-        self.textures = [
-            load_texture("Textures/wood_texture.jpg"),     
-            load_texture("Textures/grass.jpg"),    
-            load_texture("Textures/stone.jpg"),   
-            load_texture("Textures/sand.jpg"), 
-            load_texture("Textures/leaves.jpg"),
-        ]
+        levels, _ = load_material_layers(self.materials)
+        self.material_texture = create_texture_array(levels)
+        self.material_ubo = create_material_ubo(material_table(self.materials))
 
         self.current_material_id = 0
-        self.vao, self.vbo_cube, self.vbo_offsets, self.vbo_materials, self.num_cube_vertices = init_geometry()
+        self.vbo_cube, self.num_cube_vertices = init_geometry()
+        self.mesh_scheduler = MeshScheduler(on_done=glfw.post_empty_event)
+        self.stream = StreamBuffer() if upload == UPLOAD_STREAM else None
+        self.renderer = ChunkRenderer(self.vbo_cube, self.num_cube_vertices, scheduler=self.mesh_scheduler, lod_distance=lod_distance,
+                                      stream=self.stream)
         self.selected_voxel = None
+        self.selected_normal = None
+        self.pick_key = None               # (mysz, rozmiar okna, wersja macierzy kamery, wersja świata) ostatniego wyboru
+        self.text = TextRenderer()
+        self.hud_lines = 0                 # liczba napisów HUD w poprzedniej klatce
+        self.profiler = Profiler(enabled=profile, gpu_timers=gpu_timers)
+        self.picker = GpuPicker(*glfw.get_framebuffer_size(self.window)) if picking == PICKING_GPU else None
         self.last_action_time = 0.0
 
-    def run(self):
-        """Główna pętla aplikacji."""
-
+    def frame_state(self):
+        """Zwraca stan, od którego zależy obraz, a który nie jest zgłaszany przez zdarzenia okna."""
+        return (self.camera.version, self.world.version, self.renderer.mode)
+
+    def needs_redraw(self):
+        """
+        Sprawdza, czy trzeba narysować nową klatkę: zdarzenie okna (ruch myszy, klawisz, zmiana rozmiaru),
+        zmiana kamery, edycja świata, siatki czekające na wysłanie lub zlecenia serwera edycji.
+        """
+        return (self.loop_mode == LOOP_CONTINUOUS or self.dirty
+                or self.frame_state() != self.rendered_state or self.renderer.meshes_ready()
+                or (self.picker is not None and self.picker.busy())
+                or (self.edit_server is not None and self.edit_server.pending()))
+
+    def update_selection(self, width, height):
+        """
+        Wyznacza voxel pod kursorem. Wynik jest zapamiętywany i promień nie jest rzucany ponownie,
+        dopóki nie zmieni się pozycja myszy, rozmiar okna, macierze kamery lub świat.
+
+        :param int width: Szerokość okna w pikselach.
+        :param int height: Wysokość okna w pikselach.
+        """
+        key = (self.mouse_pos[0], self.mouse_pos[1], width, height, self.camera.matrices_version, self.world.version)
+        if key == self.pick_key:
+            return
+        camera = self.camera
+        self.selected_voxel, self.selected_normal, _ = self.world.pick(
+            self.mouse_pos[0], self.mouse_pos[1], width, height,
+            camera.view, camera.proj, camera.pos, camera.inv_view, camera.inv_proj)
+        self.pick_key = key
+
+    def collect_gpu_picks(self, width, height):
+        """
+        Odbiera wyniki przebiegu wyboru z poprzednich klatek (wyniki nieaktualnego wyboru są pomijane).
+        Chunki rysowane z piramidy LOD dają przybliżony wynik (voxel narożny grubej komórki), więc
+        voxele puste w rzeczywistej siatce są odrzucane, a wybór pod kursorem jest wtedy liczony promieniem na CPU.
+
+        :param int width: Szerokość okna w pikselach.
+        :param int height: Wysokość okna w pikselach.
+        """
+        for kind, tag, pixels in self.picker.poll():
+            if kind == PICK_POINT and tag == self.pick_key:
+                voxel, normal = decode_point(pixels[0, 0])
+                if voxel is not None and self.world.chunk_map.read_cells(np.array([voxel]))[0] == 0:
+                    camera = self.camera
+                    voxel, normal, _ = self.world.pick(
+                        self.mouse_pos[0], self.mouse_pos[1], width, height,
+                        camera.view, camera.proj, camera.pos, camera.inv_view, camera.inv_proj)
+                self.selected_voxel, self.selected_normal = voxel, normal
+            elif kind == PICK_RECT:
+                selection = decode_region(pixels)
+                self.marquee_selection = selection[self.world.chunk_map.read_cells(selection) != 0]
+
+    def request_gpu_picks(self, width, height):
+        """
+        Renderuje bufor wyboru i zleca odczyt piksela pod kursorem oraz prostokąta zaznaczenia,
+        jeśli zmieniła się mysz, okno, kamera lub świat albo zakończono przeciąganie.
+
+        :param int width: Szerokość okna w pikselach.
+        :param int height: Wysokość okna w pikselach.
+        """
+        key = (self.mouse_pos[0], self.mouse_pos[1], width, height, self.camera.matrices_version, self.world.version)
+        if key == self.pick_key and self.marquee_rect is None:
+            return
+        self.picker.resize(width, height)
+        self.picker.render(self.renderer, self.world, self.camera)
+        if key != self.pick_key:
+            self.pick_key = key
+            self.picker.request_point(self.mouse_pos[0], self.mouse_pos[1], key)
+        if self.marquee_rect is not None:
+            self.picker.request_rect(*self.marquee_rect)
+            self.marquee_rect = None
+        GL.glViewport(0, 0, width, height)
+
+    def handle_keys(self):
+        """Obsługuje klawisze: wybór materiału, przełączanie trybów i edycję świata."""
+        if glfw.get_key(self.window, glfw.KEY_1) == glfw.PRESS:
+            self.current_material_id = 0 
+        elif glfw.get_key(self.window, glfw.KEY_2) == glfw.PRESS:
+            self.current_material_id = 1   
+        elif glfw.get_key(self.window, glfw.KEY_3) == glfw.PRESS:
+            self.current_material_id = 2   
+        elif glfw.get_key(self.window, glfw.KEY_4) == glfw.PRESS:
+            self.current_material_id = 3  
+        elif glfw.get_key(self.window, glfw.KEY_5) == glfw.PRESS:
+            self.current_material_id = 4    
+       
+        now = time.time()
+        if now - self.last_action_time > 0.15 and glfw.get_key(self.window, glfw.KEY_M) == glfw.PRESS:
+            self.renderer.set_mode(MODE_MESHED if self.renderer.mode == MODE_INSTANCED else MODE_INSTANCED)
+            self.last_action_time = now
+        if now - self.last_action_time > 0.15 and glfw.get_key(self.window, glfw.KEY_P) == glfw.PRESS:
+            self.toggle_profiler()
+            self.last_action_time = now
+        if now - self.last_action_time > 0.15 and self.selected_voxel is not None:
+            if glfw.get_key(self.window, glfw.KEY_D) == glfw.PRESS:
+                self.world.remove(self.selected_voxel)
+                self.last_action_time = now
+            elif glfw.get_key(self.window, glfw.KEY_A) == glfw.PRESS:
+                self.world.add_next_to(self.selected_voxel, self.selected_normal, self.current_material_id)
+                self.last_action_time = now
+        if now - self.last_action_time > 0.15 and len(self.marquee_selection) > 0 and glfw.get_key(self.window, glfw.KEY_X) == glfw.PRESS:
+            # jeden zapis: jeden wpis w dzienniku i jedno powiadomienie on_change dla całego zaznaczenia
+            self.world.write_cells(self.marquee_selection, np.zeros(len(self.marquee_selection), np.uint8), "usunięcie zaznaczenia")
+            self.marquee_selection = np.zeros((0, 3), dtype=np.int64)
+            self.last_action_time = now
+        ctrl = glfw.get_key(self.window, glfw.KEY_LEFT_CONTROL) == glfw.PRESS or glfw.get_key(self.window, glfw.KEY_RIGHT_CONTROL) == glfw.PRESS
+        if now - self.last_action_time > 0.15 and ctrl:
+            if glfw.get_key(self.window, glfw.KEY_Z) == glfw.PRESS:
+                self.world.undo()
+                self.last_action_time = now
+            elif glfw.get_key(self.window, glfw.KEY_Y) == glfw.PRESS:
+                self.world.redo()
+                self.last_action_time = now
+            elif glfw.get_key(self.window, glfw.KEY_S) == glfw.PRESS and self.scene_path is not None:
+                if self.autosave is not None:
+                    # zapis w wątku autozapisu: pętla nie czeka na dysk
+                    self.autosave.compact()
+                else:
+                    size = save_scene(self.world, self.scene_path, self.materials)
+                    print(f"Zapisano scenę {self.scene_path} ({size / 1024:.0f} KiB)")
+                self.last_action_time = now
+
+    def toggle_profiler(self):
+        """Włącza lub wyłącza profiler razem z jego nakładką na HUD."""
+        self.profiler.enabled = not self.profiler.enabled
+        self.dirty = True
+
+    def update_hud(self, height):
+        """
+        Ustawia napisy interfejsu. Napisy, które się nie zmieniły, nie są przebudowywane.
+
+        :param int height: Wysokość okna w pikselach.
+        """
+        lines = HELP_LINES + [
+            f"M: tryb renderowania ({self.renderer.mode}), trojkaty: {self.renderer.triangles}",
+            f"Chunki: rysowane {self.renderer.drawn_chunks} (w tym LOD {self.renderer.lod_chunks}), odrzucone {self.renderer.culled_chunks}",
+            f"Petla: {self.loop_mode}, klatki: {self.stats.frames}, CPU: {self.stats.cpu_percent:.1f}%",
+        ]
+        if self.picker is not None:
+            lines.append(f"LPM + przeciagniecie: zaznaczenie, X: usun zaznaczone ({len(self.marquee_selection)})")
+        if self.scene_path is not None:
+            lines.append(f"Ctrl+S: zapisz scene ({os.path.basename(self.scene_path)})")
+        if self.autosave is not None:
+            lines.append(f"Autozapis: {self.autosave.status()}")
+        if self.edit_server is not None:
+            lines.append(f"Serwer edycji: {self.edit_server.status()}")
+        if self.stream is not None:
+            lines.append(f"Wysylanie: {self.stream.status()}")
+        else:
+            lines.append(f"Wysylanie: {self.renderer.uploaded_bytes / 2**20:.1f} MiB, {self.renderer.upload_rate():.0f} MiB/s")
+        lines.append(f"P: profiler ({'wl.' if self.profiler.enabled else 'wyl.'})")
+        if self.profiler.enabled:
+            lines += self.profiler.overlay_lines()
+        for i, line in enumerate(lines):
+            self.text.set_text(i, 10, height - 20 * (i + 1), line)
+        for i in range(len(lines), self.hud_lines):
+            self.text.remove(i)
+        self.hud_lines = len(lines)
+
+    def run(self, trace_path=None):
+        """
+        Główna pętla aplikacji. W trybie LOOP_IDLE pętla czeka na zdarzenia i rysuje klatkę
+        tylko wtedy, gdy coś się zmieniło; w trybie LOOP_CONTINUOUS rysuje w każdym obiegu.
+
+        :param str trace_path: Ścieżka pliku, do którego po zakończeniu zostanie zapisany ślad profilera (Chrome trace) lub None.
+        """
+
+        prof = self.profiler
         while not glfw.window_should_close(self.window):
-            glfw.poll_events()
+            start_wall, start_cpu = time.perf_counter(), time.process_time()
+            prof.begin_frame()
+            with prof.stage("events"):
+                if self.needs_redraw():
+                    glfw.poll_events()
+                else:
+                    glfw.wait_events_timeout(IDLE_WAIT_TIMEOUT)
+            if self.autosave is not None:
+                self.autosave.tick()
+            if self.edit_server is not None:
+                # zlecenia z serwera edycji są stosowane na granicy klatki, przed synchronizacją renderera
+                with prof.stage("server"):
+                    self.edit_server.apply()
+            if not self.needs_redraw():
+                prof.end_frame(discard=True)
+                self.stats.record(time.perf_counter() - start_wall, time.process_time() - start_cpu, False)
+                continue
+
+            self.dirty = False
+            # stan sprzed edycji: edycja w tym obiegu wymusi kolejną klatkę z nowym wyborem voxela
+            self.rendered_state = self.frame_state()
 
             width, height = glfw.get_framebuffer_size(self.window)
             aspect = width / float(height if height > 0 else 1)
 
-            GL.glViewport(0, 0, width, height)
-            GL.glClearColor(0.05, 0.05, 0.08, 1.0)
-            GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
-
-            grid_center = self.world.get_center()
-            cam_pos = self.camera.get_pos(grid_center)
-            view = look_at(cam_pos, grid_center, np.array([0.0, 1.0, 0.0], dtype=np.float32))
-            proj = perspective(45.0, aspect, 0.1, 500.0)
-
-            self.selected_voxel = self.world.pick(self.mouse_pos[0], self.mouse_pos[1], width, height, view, proj, cam_pos)
-
-            if glfw.get_key(self.window, glfw.KEY_1) == glfw.PRESS:
-                    self.current_material_id = 0 
-            elif glfw.get_key(self.window, glfw.KEY_2) == glfw.PRESS:
-                    self.current_material_id = 1   
-            elif glfw.get_key(self.window, glfw.KEY_3) == glfw.PRESS:
-                    self.current_material_id = 2   
-            elif glfw.get_key(self.window, glfw.KEY_4) == glfw.PRESS:
-                    self.current_material_id = 3  
-            elif glfw.get_key(self.window, glfw.KEY_5) == glfw.PRESS:
-                    self.current_material_id = 4    
-           
-            now = time.time()
-            if now - self.last_action_time > 0.15 and self.selected_voxel is not None:
-                if glfw.get_key(self.window, glfw.KEY_D) == glfw.PRESS:
-                    self.world.remove(self.selected_voxel)
-                    self.last_action_time = now
-                elif glfw.get_key(self.window, glfw.KEY_A) == glfw.PRESS:
-                    self.world.add_next_to(self.selected_voxel, self.mouse_pos[0], self.mouse_pos[1], width, height, view, proj, cam_pos, self.current_material_id)
-                    self.last_action_time = now
-
-            update_offsets_buffer(self.vbo_offsets, self.world.offsets)
-            update_materials_buffer(self.vbo_materials, self.world.material_ids)
-
-            GL.glUseProgram(self.program)
-            set_matrices(self.loc_view, self.loc_proj, view, proj)
-            set_selection_uniforms(self.loc_selected, self.loc_highlight, self.selected_voxel)
-
-            GL.glUniform3f(self.loc_light, GRID_SIZE * 1.25, GRID_SIZE * 2.25, GRID_SIZE * 1.25)
-            GL.glUniform3f(self.loc_viewpos, cam_pos[0], cam_pos[1], cam_pos[2])
-
-            for i, tex_id in enumerate(self.textures):
-                GL.glActiveTexture(GL.GL_TEXTURE0 + i)
-                GL.glBindTexture(GL.GL_TEXTURE_2D, tex_id)
-
-            draw_voxels(self.vao, self.num_cube_vertices, self.world.offsets)
-
-            for i, tex_id in enumerate(self.textures):
-                GL.glActiveTexture(GL.GL_TEXTURE0 + i)
-                GL.glBindTexture(GL.GL_TEXTURE_2D, tex_id)
-
-
-            draw_text_2d(10, height - 20,  "A: dodaj blok")
-            draw_text_2d(10, height - 40,  "D: usun blok")
-            draw_text_2d(10, height - 60,  "Klawisze 1-5: wybór materialu (1-drewno, 2-trawa, 3-kamien, 4-piasek, 5-liście)")
-            draw_text_2d(10, height - 80,  "Rolka: zoom")
-            draw_text_2d(10, height - 100, "PPM + ruch myszą: obracanie kamery")
-            glfw.swap_buffers(self.window)
+            with prof.stage("clear", gpu=True):
+                GL.glViewport(0, 0, width, height)
+                GL.glClearColor(0.05, 0.05, 0.08, 1.0)
+                GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+            with prof.stage("pick"):
+                self.camera.update_matrices(self.world.get_center(), aspect)
+                cam_pos = self.camera.pos
+                if self.picker is not None:
+                    self.collect_gpu_picks(width, height)
+                else:
+                    self.update_selection(width, height)
+
+            with prof.stage("input"):
+                self.handle_keys()
+
+            with prof.stage("upload", gpu=True):
+                self.renderer.sync(self.world)
+
+            with prof.stage("bind"):
+                program, loc_view, loc_proj, loc_selected, loc_highlight, loc_light, loc_viewpos, loc_chunk_origin, loc_voxel_size, loc_cell_scale = self.programs[self.renderer.mode]
+                GL.glUseProgram(program)
+                GL.glUniform1f(loc_voxel_size, self.world.voxel_size)
+                set_matrices(loc_view, loc_proj, self.camera.view, self.camera.proj)
+                set_selection_uniforms(loc_selected, loc_highlight, self.selected_voxel)
+
+                grid_size = self.world.grid_size
+                GL.glUniform3f(loc_light, grid_size * 1.25, grid_size * 2.25, grid_size * 1.25)
+                GL.glUniform3f(loc_viewpos, cam_pos[0], cam_pos[1], cam_pos[2])
+
+                bind_material_texture(self.material_texture)
+
+            with prof.stage("draw", gpu=True):
+                self.renderer.draw(self.world, loc_chunk_origin, self.camera.view_proj, cam_pos, loc_cell_scale)
+            if self.picker is not None:
+                with prof.stage("gpu_pick", gpu=True):
+                    self.request_gpu_picks(width, height)
+
+            with prof.stage("hud", gpu=True):
+                self.update_hud(height)
+                self.text.draw(width, height)
+            with prof.stage("swap"):
+                glfw.swap_buffers(self.window)
+            prof.end_frame()
+            self.stats.record(time.perf_counter() - start_wall, time.process_time() - start_cpu, True)
         
+        self.mesh_scheduler.shutdown()
+        if self.edit_server is not None:
+            self.edit_server.close()
+        if self.autosave is not None:
+            self.autosave.close()
+        if self.picker is not None:
+            self.picker.release()
+        if self.stream is not None:
+            self.stream.release()
+        self.text.release()
+        self.profiler.release()
         glfw.terminate()
+        if trace_path is not None:
+            self.profiler.export_trace(trace_path)
+        print(f"Pętla ({self.loop_mode}): {self.stats.summary()}")
 
 if __name__ == "__main__":
-    app = App()
-    app.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Voxel Editor 3D")
+    parser.add_argument("--loop", choices=[LOOP_IDLE, LOOP_CONTINUOUS], default=LOOP_IDLE,
+                        help="idle: rysowanie tylko po zmianie stanu, continuous: rysowanie w każdej klatce")
+    parser.add_argument("--picking", choices=[PICKING_CPU, PICKING_GPU], default=PICKING_CPU,
+                        help="cpu: promień na CPU, gpu: bufor identyfikatorów z odczytem asynchronicznym i zaznaczaniem prostokątem")
+    parser.add_argument("--profile", action="store_true", help="włącza profiler etapów klatki od startu (klawisz P przełącza go w trakcie)")
+    parser.add_argument("--gpu-timers", action="store_true", help="mierzy czas GPU etapów zapytaniami GL_TIME_ELAPSED")
+    parser.add_argument("--trace", metavar="PLIK", help="zapisuje ostatnie klatki profilera w formacie Chrome trace-event JSON")
+    parser.add_argument("--scene", metavar="PLIK", help="plik sceny (.vxs) wczytywany przy starcie, jeśli istnieje, i zapisywany klawiszami Ctrl+S")
+    parser.add_argument("--autosave-interval", type=float, default=AUTOSAVE_INTERVAL, metavar="S",
+                        help="odstęp między zapisami migawki sceny w tle w sekundach (0 wyłącza autozapis i dziennik zmian)")
+    parser.add_argument("--lod-distance", type=float, default=LOD_DISTANCE, metavar="VOXELE",
+                        help="odległość od kamery, od której chunki są rysowane z piramidy LOD (0 wyłącza LOD)")
+    parser.add_argument("--upload", choices=[UPLOAD_STREAM, UPLOAD_DIRECT], default=UPLOAD_STREAM,
+                        help="stream: dane chunków przez zmapowany pierścień buforów z fence, direct: glBufferData/glBufferSubData")
+    parser.add_argument("--edit-server", nargs="?", const=f"{EDIT_SERVER_HOST}:{EDIT_SERVER_PORT}", metavar="ADRES",
+                        help="uruchamia lokalny serwer edycji (JSON/binarne zlecenia przez gniazdo) na porcie, host:port "
+                             f"lub ścieżce gniazda uniksowego (domyślnie {EDIT_SERVER_HOST}:{EDIT_SERVER_PORT})")
+    parser.add_argument("--generate", nargs="?", const=f"{TERRAIN_SIZE // 2}x{TERRAIN_HEIGHT // 2}", type=parse_dimensions,
+                        metavar="ROZMIARxWYSOKOŚĆ", help="nowy świat z proceduralnie wygenerowanym terenem "
+                                                         f"(domyślnie {TERRAIN_SIZE // 2}x{TERRAIN_HEIGHT // 2})")
+    parser.add_argument("--seed", type=int, default=0, help="ziarno generatora terenu")
+    args = parser.parse_args()
+
+    app = App(loop_mode=args.loop, picking=args.picking, profile=args.profile or args.trace is not None, gpu_timers=args.gpu_timers,
+              scene_path=args.scene, autosave_interval=args.autosave_interval, lod_distance=args.lod_distance,
+              upload=args.upload, edit_server=args.edit_server, generate=args.generate, seed=args.seed)
+    app.run(trace_path=args.trace)
\ No newline at end of file
@@ -0,0 +1,344 @@
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from chunks import pack_keys, unpack_keys
+from scene_file import SceneFile, encode_chunk, mapped_scene_files, open_scene, write_scene_file
+
+"""
+Autozapis sceny w tle. Każda zmiana komórek świata (VoxelEditor.on_change) jest dopisywana do dziennika
+obok pliku sceny (<scena>.log) przez osobny wątek zapisujący; pętla renderowania tylko wstawia zmianę
+do kolejki, więc nigdy nie czeka na dysk. Zapisy są synchronizowane z dyskiem (fsync) zbiorczo,
+co najwyżej raz na FSYNC_INTERVAL.
+
+Co pewien czas brana jest migawka chunków zmienionych od poprzedniej migawki (kopia ich komórek,
+reszta świata nie jest kopiowana). Wątek zapisujący łączy ją z niezmienionymi chunkami bieżącego
+pliku sceny (przepisywanymi bez dekodowania), zastępuje plik sceny i usuwa dziennik z okresu przed
+migawką. Rekordy dziennika zawierają wartości komórek, a nie różnice, więc ponowne zastosowanie
+starszego dziennika na nowszym pliku daje ten sam wynik - przerwanie zapisu w dowolnym miejscu
+nie gubi zmian.
+
+Rekord dziennika (little-endian): RECORD (liczba komórek, CRC32 danych), współrzędne int32 (N, 3),
+wartości komórek uint8 (N,). Niepełny lub uszkodzony rekord na końcu pliku (awaria w trakcie zapisu)
+kończy odtwarzanie i jest odcinany.
+"""
+
+RECORD = struct.Struct("<II")              # liczba komórek, CRC32 danych rekordu
+AUTOSAVE_INTERVAL = 30.0                   # domyślny odstęp między migawkami (s)
+FSYNC_INTERVAL = 0.5                       # maksymalny czas od zapisu rekordu do fsync (s)
+
+_EDIT = 0                                  # rodzaje zadań w kolejce wątku zapisującego
+_SNAPSHOT = 1
+_STOP = 2
+
+
+def log_paths(scene_path):
+    """
+    Zwraca ścieżki dziennika sceny: bieżącego i sprzed trwającej (lub przerwanej) migawki.
+
+    :param str scene_path: Ścieżka pliku sceny.
+    :return: (dziennik sprzed migawki, bieżący dziennik) w kolejności odtwarzania.
+    """
+    return scene_path + ".log.old", scene_path + ".log"
+
+
+def encode_record(coords, values):
+    """
+    Koduje zmianę komórek jako rekord dziennika.
+
+    :param np.array coords: Współrzędne voxeli (N, 3).
+    :param np.array values: Nowe wartości komórek (N,).
+    :return: bytes
+    """
+    payload = np.ascontiguousarray(coords, dtype="<i4").tobytes() + np.ascontiguousarray(values, dtype=np.uint8).tobytes()
+    return RECORD.pack(len(values), zlib.crc32(payload)) + payload
+
+
+def read_records(data):
+    """
+    Dekoduje kolejne poprawne rekordy dziennika.
+
+    :param data: Zawartość pliku dziennika (bytes).
+    :return: Generator krotek (coords, values, położenie końca rekordu).
+    """
+    offset = 0
+    while offset + RECORD.size <= len(data):
+        n, crc = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        end = start + n * 13
+        if end > len(data) or zlib.crc32(data[start:end]) != crc:
+            return
+        coords = np.frombuffer(data, dtype="<i4", count=n * 3, offset=start).reshape(n, 3)
+        values = np.frombuffer(data, dtype=np.uint8, count=n, offset=start + n * 12)
+        yield coords, values, end
+        offset = end
+
+
+def chunk_keys_of(coords, chunk_size):
+    """
+    Zwraca klucze chunków zawierających podane voxele.
+
+    :param np.array coords: Współrzędne voxeli (N, 3).
+    :param int chunk_size: Rozmiar chunka.
+    :return: Lista kluczy (krotek) bez powtórzeń.
+    """
+    keys = np.unique(pack_keys(np.floor_divide(coords, chunk_size)))
+    return list(map(tuple, unpack_keys(keys).tolist()))
+
+
+def replay_log(path, world):
+    """
+    Stosuje rekordy dziennika na świecie. Niepełny rekord na końcu pliku jest odcinany,
+    aby kolejne rekordy dopisane do tego pliku dało się odczytać.
+
+    :param str path: Ścieżka pliku dziennika.
+    :param VoxelEditor world: Obiekt świata voxelowego.
+    :return: (liczba rekordów, zbiór kluczy zmienionych chunków)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    records = 0
+    valid = 0
+    touched = set()
+    for coords, values, end in read_records(data):
+        world.chunk_map.write_cells(coords, values)
+        touched.update(chunk_keys_of(coords, world.chunk_map.chunk_size))
+        records += 1
+        valid = end
+    if valid < len(data):
+        os.truncate(path, valid)
+    if records:
+        world.version += 1
+    return records, touched
+
+
+def recover_scene(scene_path, new_world):
+    """
+    Wczytuje scenę i odtwarza na niej dzienniki autozapisu pozostawione przez przerwaną sesję.
+
+    :param str scene_path: Ścieżka pliku sceny.
+    :param new_world: Funkcja bez argumentów zwracająca (VoxelEditor, materiały), używana, gdy pliku sceny jeszcze nie ma.
+    :return: (VoxelEditor, materiały, liczba odtworzonych rekordów, zbiór kluczy zmienionych chunków)
+    """
+    if os.path.exists(scene_path):
+        world, materials = open_scene(scene_path)
+    else:
+        world, materials = new_world()
+    records = 0
+    touched = set()
+    for path in log_paths(scene_path):
+        if os.path.exists(path):
+            n, keys = replay_log(path, world)
+            records += n
+            touched |= keys
+    return world, materials, records, touched
+
+
+def _fsync_dir(path):
+    """Utrwala na dysku zmiany wpisów katalogu (utworzenie, zmiana nazwy, usunięcie pliku)."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+"""
+Autozapis jednego świata do pliku sceny. Wszystkie operacje na plikach wykonuje wątek zapisujący;
+metody wywoływane z pętli renderowania (record, tick, compact) tylko kopiują dane do kolejki.
+"""
+class AutoSaver:
+    def __init__(self, world, scene_path, materials, interval=AUTOSAVE_INTERVAL, fsync_interval=FSYNC_INTERVAL, dirty=None):
+        """
+        :param VoxelEditor world: Obiekt świata voxelowego (autozapis ustawia jego on_change).
+        :param str scene_path: Ścieżka pliku sceny.
+        :param list materials: Lista materiałów zapisywana w pliku sceny.
+        :param float interval: Odstęp między migawkami w sekundach.
+        :param float fsync_interval: Maksymalny czas od zapisu rekordu do fsync w sekundach.
+        :param set dirty: Klucze chunków zmienionych, a jeszcze nie zapisanych w pliku sceny (np. odtworzonych z dziennika).
+        """
+        self.world = world
+        self.scene_path = scene_path
+        self.materials = [tuple(m) for m in materials]
+        self.interval = interval
+        self.fsync_interval = fsync_interval
+        self.chunk_size = world.chunk_map.chunk_size
+        # pliki sceny, z których świat dekoduje chunki; wątek zapisujący mapuje je na nowo po każdej migawce
+        self.scenes = mapped_scene_files(world, scene_path)
+        if not os.path.exists(scene_path):
+            # pliku jeszcze nie ma: pierwsza migawka musi objąć cały świat
+            dirty = set(world.chunks)
+        self.dirty = set(dirty or ())      # klucze chunków zmienionych od ostatniej migawki
+        self.last_snapshot = time.monotonic()
+        self.records = 0                   # rekordy dopisane do dziennika od ostatniej migawki
+        self.snapshots = 0                 # zakończone migawki
+        self.compacting = False            # migawka czeka w kolejce lub jest zapisywana
+        self.error = None                  # wyjątek wątku zapisującego (autozapis jest wtedy zatrzymany)
+
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self.thread.start()
+        world.on_change = self.record
+
+    def record(self, coords, values):
+        """
+        Przekazuje zmianę komórek do dziennika (wywoływana przez VoxelEditor.on_change).
+
+        :param np.array coords: Współrzędne voxeli (N, 3) int32.
+        :param np.array values: Nowe wartości komórek (N,) uint8.
+        """
+        if len(coords) == 0 or self.error is not None:
+            return
+        self.dirty.update(chunk_keys_of(coords, self.chunk_size))
+        self.queue.put((_EDIT, coords, values))
+        self.records += 1
+
+    def tick(self, now=None):
+        """
+        Zleca migawkę, jeśli od poprzedniej minął odstęp interval, a w świecie są niezapisane zmiany.
+        Wywoływana w każdym obiegu pętli; sama tylko sprawdza czas.
+
+        :param float now: Bieżący czas (time.monotonic) lub None.
+        """
+        now = time.monotonic() if now is None else now
+        if self.dirty and not self.compacting and now - self.last_snapshot >= self.interval:
+            self.compact()
+
+    def compact(self):
+        """
+        Bierze migawkę zmienionych chunków i zleca wątkowi zapisującemu zastąpienie pliku sceny.
+        Kopiowane są tylko komórki chunków zmienionych od poprzedniej migawki.
+
+        :return: True jeśli migawka została zlecona.
+        """
+        if self.compacting or self.error is not None:
+            return False
+        chunks = self.world.chunks
+        snapshot = {}
+        for key in self.dirty:
+            chunk = chunks.get(key)
+            # chunk usunięty lub pusty: None, czyli brak wpisu w nowym pliku
+            snapshot[key] = (chunk.count, chunk.cells.copy()) if chunk is not None and chunk.count > 0 else None
+        self.dirty = set()
+        self.records = 0
+        self.compacting = True
+        self.last_snapshot = time.monotonic()
+        self.queue.put((_SNAPSHOT, snapshot, (self.world.grid_size, self.world.voxel_size)))
+        return True
+
+    def status(self):
+        """Zwraca krótki opis stanu autozapisu do HUD."""
+        if self.error is not None:
+            return f"blad ({self.error})"
+        state = "zapis..." if self.compacting else f"niezapisane chunki: {len(self.dirty)}"
+        return f"{state}, rekordy dziennika: {self.records}, migawki: {self.snapshots}"
+
+    def close(self, final_snapshot=True):
+        """
+        Kończy autozapis: opcjonalnie zapisuje ostatnią migawkę i czeka na wątek zapisujący.
+        Po pełnej migawce dziennik jest usuwany, więc po poprawnym zamknięciu zostaje sam plik sceny.
+
+        :param bool final_snapshot: Czy zapisać niezapisane zmiany do pliku sceny.
+        """
+        self.world.on_change = None
+        if final_snapshot and self.dirty:
+            self.compacting = False
+            self.compact()
+        self.queue.put((_STOP, None, None))
+        self.thread.join()
+
+    def _run(self):
+        """Wątek zapisujący: dopisuje rekordy, synchronizuje je zbiorczo i zapisuje migawki."""
+        old_path, log_path = log_paths(self.scene_path)
+        log = open(log_path, "ab")
+        unsynced = False
+        try:
+            while True:
+                try:
+                    item = self.queue.get(timeout=self.fsync_interval) if unsynced else self.queue.get()
+                except queue.Empty:
+                    os.fsync(log.fileno())
+                    unsynced = False
+                    continue
+                kind, a, b = item
+                if kind == _EDIT:
+                    log.write(encode_record(a, b))
+                    # bufor pliku jest opróżniany dopiero, gdy kolejka jest pusta
+                    if self.queue.empty():
+                        log.flush()
+                        unsynced = True
+                    continue
+                log.flush()
+                os.fsync(log.fileno())
+                unsynced = False
+                if kind == _STOP:
+                    break
+                log = self._rotate(log, old_path, log_path)
+                self._write_snapshot(a, *b)
+                os.remove(old_path)
+                _fsync_dir(log_path)
+                self.snapshots += 1
+                self.compacting = False
+        except Exception as e:
+            self.error = e
+            self.compacting = False
+        finally:
+            empty = log.tell() == 0
+            log.close()
+            if empty and self.error is None and not os.path.exists(old_path):
+                os.remove(log_path)
+
+    def _rotate(self, log, old_path, log_path):
+        """
+        Przenosi bieżący dziennik do pliku sprzed migawki i otwiera nowy. Jeśli plik sprzed
+        migawki już istnieje (poprzednia migawka została przerwana), dziennik jest do niego dopisywany.
+
+        :return: Nowy, pusty plik dziennika.
+        """
+        log.close()
+        if os.path.exists(old_path):
+            with open(log_path, "rb") as src, open(old_path, "ab") as dst:
+                dst.write(src.read())
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.remove(log_path)
+        else:
+            os.replace(log_path, old_path)
+        log = open(log_path, "ab")
+        _fsync_dir(log_path)
+        return log
+
+    def _write_snapshot(self, snapshot, grid_size, voxel_size):
+        """
+        Zastępuje plik sceny: chunki z migawki są kodowane na nowo, a pozostałe przepisywane
+        z bieżącego pliku bez dekodowania.
+
+        :param dict snapshot: Klucz chunka -> (liczba voxeli, kopia komórek) lub None dla chunka usuniętego.
+        """
+        def records(base):
+            if base is not None:
+                for entry, (key, count) in enumerate(zip(base.index["key"].tolist(), base.index["count"].tolist())):
+                    key = tuple(key)
+                    if key not in snapshot:
+                        row = base.index[entry]
+                        yield key, count, int(row["encoding"]), int(row["value"]), base.payload(entry)
+                # plik bazowy musi być zamknięty przed zastąpieniem go nowym
+                base.close()
+            for key, item in snapshot.items():
+                if item is not None:
+                    count, cells = item
+                    yield (key, count) + encode_chunk(cells)
+
+        base = SceneFile(self.scene_path) if os.path.exists(self.scene_path) else None
+        try:
+            write_scene_file(self.scene_path, grid_size, voxel_size, self.chunk_size, self.materials, records(base), self.scenes)
+        finally:
+            if base is not None:
+                base.close()
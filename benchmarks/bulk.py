@@ -0,0 +1,83 @@
+"""
+Czas operacji zbiorczych VoxelEditor (prostopadłościan, kula, walec, zamiana materiału,
+wypełnianie obszaru, kopiowanie i wklejanie z obrotem) w świecie o zadanym rozmiarze,
+w porównaniu z edycją voxel po voxelu (add_next_to) przeliczoną na tę samą liczbę voxeli.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/bulk.py --size 256
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from voxel_editor import VoxelEditor
+
+
+def timed(fn, *args, **kwargs):
+    """
+    Mierzy czas pojedynczego wywołania.
+
+    :return: (czas w ms, wynik)
+    """
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def per_voxel_rate(size, count):
+    """
+    Mierzy czas dodawania voxeli pojedynczo przez add_next_to.
+
+    :param int size: Rozmiar świata.
+    :param int count: Liczba dodawanych voxeli.
+    :return: Czas na voxel w ms.
+    """
+    world = VoxelEditor(size, 1.0)
+    start = time.perf_counter()
+    for i in range(count):
+        x, z = i % size, (i // size) % size
+        world.add_next_to((x, i // (size * size), z), (0, 1, 0), 0)
+    return (time.perf_counter() - start) * 1000.0 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--per-voxel", type=int, default=20000, help="liczba voxeli dodawanych pojedynczo do porównania")
+    opts = parser.parse_args()
+
+    n = opts.size
+    c = n // 2
+    world = VoxelEditor(n, 1.0)
+    operations = [
+        ("prostopadłościan", world.fill_box, ((0, 0, 0), (n - 1, n // 4, n - 1), 2)),
+        ("kula", world.fill_sphere, ((c, c, c), n * 0.35, 1)),
+        ("walec", world.fill_cylinder, ((c, 0, c), n * 0.1, n, 0)),
+        ("zamiana materiału", world.replace_material, ((0, 0, 0), (n - 1, n - 1, n - 1), 1, 4)),
+        ("usunięcie kuli", world.clear_sphere, ((c, c, c), n * 0.2)),
+        ("wypełnienie obszaru", world.flood_fill, ((c, c, c), 3)),
+        ("kopiowanie", world.copy_region, ((0, 0, 0), (n // 2 - 1, n // 2 - 1, n // 2 - 1))),
+        ("wklejenie z obrotem", world.paste, ((n // 2, n // 2, 0),), dict(quarter_turns=1, mirror=(0,))),
+        ("cofnięcie wklejenia", world.undo, ()),
+    ]
+
+    rate = per_voxel_rate(n, opts.per_voxel)
+    print(f"świat {n}³, voxel po voxelu: {rate * 1000.0:.1f} µs/voxel")
+    print(f"{'operacja':>22} {'czas [ms]':>10} {'voxele':>10} {'voxel po voxelu [ms]':>21} {'przysp.':>9}")
+    for entry in operations:
+        name, fn, args = entry[:3]
+        kwargs = entry[3] if len(entry) > 3 else {}
+        elapsed, result = timed(fn, *args, **kwargs)
+        if isinstance(result, bool) or not isinstance(result, int):
+            print(f"{name:>22} {elapsed:>10.1f} {'-':>10} {'-':>21} {'-':>9}")
+            continue
+        single = result * rate
+        print(f"{name:>22} {elapsed:>10.1f} {result:>10} {single:>21.0f} {single / max(elapsed, 1e-6):>8.0f}x")
+    print(f"pełne voxele: {world.chunk_map.filled_count()}, chunki: {len(world.chunks)}, dziennik: {world.journal.nbytes / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
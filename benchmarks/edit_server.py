@@ -0,0 +1,159 @@
+"""
+Serwer edycji bez okna: kilku klientów (EditClient w osobnych wątkach) wysyła zlecenia zapisu
+voxeli w formacie JSON albo binarnym, a pętla "klatek" w wątku głównym stosuje je co frame-ms
+(EditServer.apply, jak w pętli renderowania). Mierzony jest czas stosowania zleceń w klatce,
+opóźnienie od wysłania zlecenia do potwierdzenia, przepustowość i liczba wstrzymań kolejki,
+a na koniec stan świata jest porównywany z oczekiwanym (ostatni zapis każdego voxela).
+Dla porównania te same zapisy są stosowane voxel po voxelu, jak edycje z interfejsu.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/edit_server.py --size 128 --clients 4 --batch-voxels 256
+    python benchmarks/edit_server.py --formats binary --max-queued 20000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunks import pack_keys
+from edit_server import EditClient, EditServer, MAX_QUEUED_VOXELS
+from scenes import SCENES
+
+FORMATS = ("json", "binary")
+
+
+def client_edits(k, opts, rng):
+    """Zlecenia klienta k: losowe voxele w jego własnym pasie osi X (klienci nie nadpisują się nawzajem)."""
+    width = opts.size // opts.clients
+    batches = []
+    for _ in range(opts.batches):
+        # voxele zlecenia bez powtórzeń (zlecenie JSON grupuje je według materiału)
+        index = rng.choice(width * opts.size * opts.size, opts.batch_voxels, replace=False)
+        coords = np.stack(np.unravel_index(index, (width, opts.size, opts.size)), axis=1)
+        coords[:, 0] += k * width
+        values = rng.integers(0, 6, opts.batch_voxels).astype(np.uint8)
+        batches.append((coords, values))
+    return batches
+
+
+def run_client(address, batches, fmt, window, latencies):
+    """Wysyła zlecenia, utrzymując najwyżej window zleceń bez potwierdzenia."""
+    client = EditClient(address)
+    sent = {}
+    for coords, values in batches:
+        if len(sent) >= window:
+            oldest = min(sent)
+            client.wait(oldest)
+            latencies.append(time.perf_counter() - sent.pop(oldest))
+        if fmt == "binary":
+            request_id = client.send_cells(coords, values)
+        else:
+            ops = [{"op": "clear", "voxels": coords[values == 0].tolist()}]
+            for value in np.unique(values[values != 0]).tolist():
+                ops.append({"op": "set", "voxels": coords[values == value].tolist(), "material": value - 1})
+            request_id = client.send(ops)
+        sent[request_id] = time.perf_counter()
+    for request_id in sorted(sent):
+        client.wait(request_id)
+        latencies.append(time.perf_counter() - sent[request_id])
+    client.close()
+
+
+def run_subscriber(client, counts):
+    """Odbiera powiadomienia o zmianach do czasu zamknięcia serwera."""
+    try:
+        while True:
+            event = client.next_event()
+            counts[0] += 1
+            counts[1] += event["count"]
+    except ConnectionError:
+        pass
+    client.close()
+
+
+def expected_cells(edits):
+    """Oczekiwany stan zapisanych voxeli: ostatnia wartość każdego voxela."""
+    coords = np.concatenate([c for batches in edits for c, _ in batches])
+    values = np.concatenate([v for batches in edits for _, v in batches])
+    _, last = np.unique(pack_keys(coords)[::-1], return_index=True)
+    keep = len(coords) - 1 - last
+    return coords[keep], values[keep]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scene", choices=list(SCENES), default="terrain")
+    parser.add_argument("--size", type=int, default=128)
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--batches", type=int, default=200, help="liczba zleceń na klienta")
+    parser.add_argument("--batch-voxels", type=int, default=256, help="liczba voxeli w zleceniu")
+    parser.add_argument("--window", type=int, default=8, help="zlecenia klienta wysłane bez czekania na potwierdzenie")
+    parser.add_argument("--frame-ms", type=float, default=16.0, help="odstęp między klatkami stosującymi zlecenia")
+    parser.add_argument("--max-queued", type=int, default=MAX_QUEUED_VOXELS)
+    parser.add_argument("--seed", type=int, default=0)
+    opts = parser.parse_args()
+
+    rng = np.random.default_rng(opts.seed)
+    edits = [client_edits(k, opts, rng) for k in range(opts.clients)]
+    total = opts.clients * opts.batches * opts.batch_voxels
+
+    # odniesienie: te same zapisy voxel po voxelu, każdy z osobnym wpisem w dzienniku
+    world = SCENES[opts.scene](opts.size, opts.seed)
+    start = time.perf_counter()
+    for batches in edits:
+        for coords, values in batches:
+            for (x, y, z), value in zip(coords.tolist(), values.tolist()):
+                old = world.chunk_map.get_cell(x, y, z)
+                if value == 0:
+                    world.chunk_map.clear(x, y, z)
+                else:
+                    world.chunk_map.set(x, y, z, value - 1)
+                world.journal.record((x, y, z), old, value)
+    single_ms = (time.perf_counter() - start) * 1000.0
+    print(f"{opts.scene} {opts.size}³, {total} zapisów voxeli: voxel po voxelu {single_ms:.0f} ms\n")
+
+    print(f"{'format':>7} {'czas [s]':>9} {'voxele/s':>10} {'klatki':>7} {'apply p50 [ms]':>15} {'apply max [ms]':>15} "
+          f"{'suma apply [ms]':>16} {'opóźn. p50 [ms]':>16} {'opóźn. p95 [ms]':>16} {'wstrz.':>7} {'powiad.':>8} {'zgodne':>7}")
+    for fmt in opts.formats:
+        world = SCENES[opts.scene](opts.size, opts.seed)
+        server = EditServer(world, "127.0.0.1:0", max_queued=opts.max_queued)
+        address = server.address
+        counts = [0, 0]
+        listener = EditClient(address)
+        listener.subscribe()
+        subscriber = threading.Thread(target=run_subscriber, args=(listener, counts))
+        subscriber.start()
+        latencies = []
+        clients = [threading.Thread(target=run_client, args=(address, batches, fmt, opts.window, latencies)) for batches in edits]
+
+        apply_ms = []
+        start = time.perf_counter()
+        for thread in clients:
+            thread.start()
+        while any(thread.is_alive() for thread in clients) or server.pending():
+            frame_start = time.perf_counter()
+            if server.apply():
+                apply_ms.append((time.perf_counter() - frame_start) * 1000.0)
+            time.sleep(max(opts.frame_ms / 1000.0 - (time.perf_counter() - frame_start), 0.0))
+        wall = time.perf_counter() - start
+        for thread in clients:
+            thread.join()
+        server.close()
+        subscriber.join()
+
+        coords, values = expected_cells(edits)
+        agree = np.array_equal(world.chunk_map.read_cells(coords), values)
+        p50, p95 = np.percentile(np.array(latencies) * 1000.0, (50, 95))
+        print(f"{fmt:>7} {wall:>9.2f} {total / wall:>10.0f} {len(apply_ms):>7} {np.median(apply_ms):>15.2f} "
+              f"{max(apply_ms):>15.2f} {sum(apply_ms):>16.0f} {p50:>16.1f} {p95:>16.1f} {server.stalls:>7} "
+              f"{counts[0]:>8} {'tak' if agree else 'NIE':>7}")
+
+
+if __name__ == "__main__":
+    main()
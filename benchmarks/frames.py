@@ -0,0 +1,202 @@
+"""
+Powtarzalny pomiar wydajności rysowania klatek bez wyświetlacza. Każda scena (pełny sześcian,
+teren z szumu, rozrzucone voxele) jest rysowana w obu trybach renderera do bufora ramki
+w niewidocznym oknie, wzdłuż skryptowanych ścieżek kamery. Zapisywane są czasy klatek
+(p50/p95/p99), liczba wywołań rysowania, liczba trójkątów i liczba bajtów wysłanych na GPU.
+
+Wynik można porównać z zapisanym wzorcem; kod wyjścia 1 oznacza regresję.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/frames.py --sizes 32 64 --out wyniki.json
+    python benchmarks/frames.py --context osmesa --baseline wzorzec.json --tolerance 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from constants import LOD_DISTANCE
+from scenes import CAMERA_PATHS, SCENES
+
+MODES = ("instanced", "meshed")
+CONTEXTS = ("native", "egl", "osmesa")
+WIDTH, HEIGHT = 1000, 800
+
+
+def frame_stats(times_ms):
+    """
+    Zwraca statystyki czasów klatek.
+
+    :param list times_ms: Czasy klatek w milisekundach.
+    :return: Słownik mean/p50/p95/p99/max.
+    """
+    t = np.asarray(times_ms)
+    p50, p95, p99 = np.percentile(t, (50, 95, 99))
+    return {"mean": float(t.mean()), "p50": float(p50), "p95": float(p95), "p99": float(p99), "max": float(t.max())}
+
+
+def result_key(result):
+    """Klucz pomiaru używany przy porównaniu ze wzorcem."""
+    return f"{result['scene']}/{result['size']}/{result['mode']}/{result['path']}"
+
+
+def compare(results, baseline, tolerance):
+    """
+    Porównuje wyniki ze wzorcem. Czasy p50 i p95 mogą wzrosnąć najwyżej o tolerance,
+    a liczba wywołań rysowania i trójkątów (wartości deterministyczne) nie może wzrosnąć wcale.
+
+    :param list results: Wyniki bieżącego pomiaru.
+    :param dict baseline: Zawartość pliku wzorca.
+    :param float tolerance: Dopuszczalny względny wzrost czasu (np. 0.1 = 10%).
+    :return: Lista opisów regresji.
+    """
+    reference = {result_key(r): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        ref = reference.get(result_key(result))
+        if ref is None:
+            continue
+        for stat in ("p50", "p95"):
+            now, before = result["frame_ms"][stat], ref["frame_ms"][stat]
+            if now > before * (1.0 + tolerance):
+                regressions.append(f"{result_key(result)}: czas klatki {stat} {before:.2f} -> {now:.2f} ms")
+        for field in ("draw_calls", "triangles"):
+            if result[field] > ref[field]:
+                regressions.append(f"{result_key(result)}: {field} {ref[field]} -> {result[field]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=list(SCENES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 64, 128])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--paths", nargs="+", choices=list(CAMERA_PATHS), default=list(CAMERA_PATHS))
+    parser.add_argument("--frames", type=int, default=120, help="liczba mierzonych klatek na ścieżkę")
+    parser.add_argument("--warmup", type=int, default=5, help="liczba klatek rozgrzewających (bez pomiaru)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lod-distance", type=float, default=LOD_DISTANCE,
+                        help="odległość (w voxelach), od której chunki są rysowane z piramidy LOD (0 wyłącza LOD)")
+    parser.add_argument("--context", choices=CONTEXTS, default="native",
+                        help="native: niewidoczne okno, egl/osmesa: kontekst bez wyświetlacza (osmesa także bez GPU)")
+    parser.add_argument("--out", help="plik JSON z wynikami")
+    parser.add_argument("--baseline", help="plik JSON wzorca do porównania")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="dopuszczalny względny wzrost czasu klatki")
+    opts = parser.parse_args()
+
+    # platforma PyOpenGL musi być ustawiona przed pierwszym importem OpenGL
+    if opts.context != "native":
+        os.environ["PYOPENGL_PLATFORM"] = opts.context
+
+    import glfw
+    import OpenGL.GL as GL
+
+    from camera import Camera
+    from materials import load_material_layers, material_table
+    from offscreen import OffscreenTarget
+    from opengl_helpers import (init_geometry, init_shaders, init_window, create_texture_array, create_material_ubo,
+                                bind_material_texture, set_matrices, set_selection_uniforms)
+    from renderer import ChunkRenderer
+
+    window = init_window(visible=False, width=WIDTH, height=HEIGHT, context_api=opts.context)
+    target = OffscreenTarget(WIDTH, HEIGHT)
+    programs = {
+        "instanced": init_shaders("shaders/voxel.vert", "shaders/voxel.frag"),
+        "meshed": init_shaders("shaders/voxel_mesh.vert", "shaders/voxel.frag"),
+    }
+    levels, _ = load_material_layers()
+    material_texture = create_texture_array(levels)
+    create_material_ubo(material_table())
+    vbo_cube, num_cube_vertices = init_geometry()
+    GL.glEnable(GL.GL_DEPTH_TEST)
+    gl_renderer = GL.glGetString(GL.GL_RENDERER).decode(errors="replace")
+
+    results = []
+    print(f"{'pomiar':>32} {'p50 [ms]':>9} {'p95 [ms]':>9} {'wywołania':>10} {'trójkąty':>11} {'wysłane [KiB]':>14}")
+    for scene in opts.scenes:
+        for size in opts.sizes:
+            world = SCENES[scene](size, opts.seed)
+            for mode in opts.modes:
+                for path in opts.paths:
+                    # siatki są budowane synchronicznie, więc każda klatka rysuje pełną scenę
+                    # (poziom LOD zmieniony w klatce jest wysyłany przy sync następnej)
+                    renderer = ChunkRenderer(vbo_cube, num_cube_vertices, mode=mode, lod_distance=opts.lod_distance)
+                    camera = Camera(0.0, 0.0, size, far=size * 10.0)
+                    program, loc_view, loc_proj, loc_selected, loc_highlight, loc_light, loc_viewpos, loc_chunk_origin, loc_voxel_size, loc_cell_scale = programs[mode]
+                    times, draw_calls, triangles = [], [], []
+                    uploaded = 0
+                    poses = CAMERA_PATHS[path](size, opts.frames)
+                    for i, pose in enumerate(poses[:opts.warmup] + poses):
+                        start = time.perf_counter()
+                        camera.set_orbit(*pose)
+                        camera.update_matrices(world.get_center(), WIDTH / float(HEIGHT))
+                        uploaded += renderer.sync(world)
+
+                        target.bind()
+                        GL.glClearColor(0.05, 0.05, 0.08, 1.0)
+                        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+                        GL.glUseProgram(program)
+                        GL.glUniform1f(loc_voxel_size, world.voxel_size)
+                        set_matrices(loc_view, loc_proj, camera.view, camera.proj)
+                        set_selection_uniforms(loc_selected, loc_highlight, None)
+                        GL.glUniform3f(loc_light, size * 1.25, size * 2.25, size * 1.25)
+                        GL.glUniform3f(loc_viewpos, *camera.pos)
+                        bind_material_texture(material_texture)
+                        renderer.draw(world, loc_chunk_origin, camera.view_proj, camera.pos, loc_cell_scale)
+                        # glFinish wlicza w czas klatki pracę GPU (bez okna nie ma swap_buffers)
+                        GL.glFinish()
+                        if i >= opts.warmup:
+                            times.append((time.perf_counter() - start) * 1000.0)
+                            draw_calls.append(renderer.draw_calls)
+                            triangles.append(renderer.triangles)
+                    target.unbind()
+                    renderer.release()
+
+                    result = {
+                        "scene": scene, "size": size, "mode": mode, "path": path, "frames": len(times),
+                        "frame_ms": frame_stats(times),
+                        "draw_calls": int(max(draw_calls)),
+                        "triangles": int(max(triangles)),
+                        "upload_bytes": int(uploaded),
+                    }
+                    results.append(result)
+                    print(f"{result_key(result):>32} {result['frame_ms']['p50']:>9.2f} {result['frame_ms']['p95']:>9.2f} "
+                          f"{result['draw_calls']:>10} {result['triangles']:>11} {uploaded / 1024:>14.0f}")
+
+    target.release()
+    glfw.terminate()
+
+    report = {
+        "meta": {
+            "context": opts.context,
+            "renderer": gl_renderer,
+            "python": platform.python_version(),
+            "frames": opts.frames,
+            "seed": opts.seed,
+            "resolution": [WIDTH, HEIGHT],
+        },
+        "results": results,
+    }
+    if opts.out:
+        with open(opts.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if opts.baseline:
+        with open(opts.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, opts.tolerance)
+        for line in regressions:
+            print(f"REGRESJA {line}")
+        if regressions:
+            sys.exit(1)
+        print("Brak regresji względem wzorca.")
+
+
+if __name__ == "__main__":
+    main()
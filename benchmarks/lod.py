@@ -0,0 +1,172 @@
+"""
+Piramida LOD: czas budowy i pamięć poziomów, liczba instancji i trójkątów siatek w kadrze przy oddalaniu kamery - w pełnej rozdzielczości
+i z poziomami LOD wybranymi według odległości chunków (bez GPU, liczone na CPU jak w rendererze),
+a na koniec czas aktualizacji piramidy po zmianie pojedynczego voxela.
+Przed pomiarem sprawdzane jest, czy edycja voxela (ChunkMap.set/clear) zwiększa wersję każdego sąsiedniego
+chunka, którego obramowanie z grubych komórek (padded_cells na poziomach LOD) się zmieniło - inaczej sąsiad
+zachowałby nieaktualną siatkę LOD; przy niezgodności skrypt kończy się kodem 1.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/lod.py --sizes 128 256 --radii 0.5 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera import Camera
+from chunks import ChunkMap
+from constants import LOD_DISTANCE
+from lod import lod_level_for, max_lod_level, update_pyramid
+from meshing import build_chunk_mesh
+from scenes import SCENES
+from utils import boxes_in_frustum, frustum_planes
+
+ASPECT = 1000 / 800.0
+
+
+def neighbour_borders(chunk_map, key):
+    """Obramowania (padded_cells na poziomach 1..) i wersje istniejących sąsiadów chunka."""
+    levels = range(1, max_lod_level(chunk_map.chunk_size) + 1)
+    borders = {}
+    for axis in range(3):
+        for sign in (-1, 1):
+            n_key = list(key)
+            n_key[axis] += sign
+            n_key = tuple(n_key)
+            if n_key in chunk_map.chunks:
+                borders[n_key] = (chunk_map.chunks[n_key].version, [chunk_map.padded_cells(n_key, level) for level in levels])
+    return borders
+
+
+def check_neighbour_versions(seed, edits):
+    """
+    Sprawdza, czy edycja voxela zwiększa wersję sąsiadów, których obramowanie LOD się zmieniło:
+    najpierw przypadek z voxelami drugiej warstwy od ściany chunka, potem losowe edycje
+    w świecie 3x3x3 chunków z utworzonymi piramidami.
+
+    :return: Liczba sąsiadów ze zmienionym obramowaniem i niezmienioną wersją.
+    """
+    def edit(chunk_map, coords, fill):
+        key = chunk_map.chunk_key(*coords[0])
+        before = neighbour_borders(chunk_map, key)
+        for x, y, z in coords:
+            if fill:
+                chunk_map.set(x, y, z, 0)
+            else:
+                chunk_map.clear(x, y, z)
+        after = neighbour_borders(chunk_map, key)
+        stale = 0
+        for n_key, (version, borders) in before.items():
+            if n_key in after and after[n_key][0] == version:
+                stale += any(not np.array_equal(a, b) for a, b in zip(borders, after[n_key][1]))
+        return stale
+
+    # blok 32x16x16: gruba komórka przy ścianie x = 16 obejmuje voxele x = 14 i 15
+    chunk_map = ChunkMap(16, 1.0)
+    chunk_map.write_cells(np.argwhere(np.ones((32, 16, 16), dtype=bool)), np.ones(32 * 16 * 16, dtype=np.uint8))
+    for chunk in chunk_map.chunks.values():
+        chunk.lod(1)
+    stale = edit(chunk_map, [(15, 0, 0)], False)
+    stale += edit(chunk_map, [(14, y, z) for y in (0, 1) for z in (0, 1)], False)
+
+    rng = np.random.default_rng(seed)
+    chunk_map = ChunkMap(16, 1.0)
+    coords = np.argwhere(rng.random((48, 48, 48)) < 0.5)
+    chunk_map.write_cells(coords, np.ones(len(coords), dtype=np.uint8))
+    for chunk in chunk_map.chunks.values():
+        chunk.lod(1)
+    for x, y, z in rng.integers(16, 32, (edits, 3)).tolist():
+        stale += edit(chunk_map, [(x, y, z)], rng.random() < 0.5)
+    return stale
+
+
+def frame_counts(world, camera, lod_distance, mesh_cache):
+    """
+    Zlicza instancje i trójkąty siatek chunków w kadrze.
+
+    :return: (instancje, trójkąty, chunki w kadrze, chunki z LOD)
+    """
+    chunk_map = world.chunk_map
+    c = chunk_map.chunk_size
+    keys = list(world.chunks)
+    origins = np.array([world.chunks[k].origin for k in keys], dtype=np.float64) * world.voxel_size
+    visible = boxes_in_frustum(frustum_planes(camera.view_proj), origins, origins + c * world.voxel_size)
+    idx = np.flatnonzero(visible)
+    if lod_distance:
+        gap = np.maximum(np.maximum(origins[idx] - camera.pos, camera.pos - (origins[idx] + c * world.voxel_size)), 0.0)
+        levels = lod_level_for(np.linalg.norm(gap, axis=1) / world.voxel_size, max_lod_level(c), lod_distance)
+    else:
+        levels = np.zeros(len(idx), dtype=np.int64)
+
+    instances = triangles = 0
+    for i, level in zip(idx.tolist(), levels.tolist()):
+        key = keys[i]
+        instances += int(np.count_nonzero(world.chunks[key].lod(level)))
+        if (key, level) not in mesh_cache:
+            mesh_cache[key, level] = len(build_chunk_mesh(chunk_map.padded_cells(key, level))) // 3
+        triangles += mesh_cache[key, level]
+    return instances, triangles, len(idx), int(np.count_nonzero(levels))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=["terrain", "scatter"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[128, 256])
+    parser.add_argument("--radii", type=float, nargs="+", default=[0.5, 1.0, 2.0, 4.0, 8.0],
+                        help="odległości kamery od środka świata jako wielokrotności rozmiaru świata")
+    parser.add_argument("--lod-distance", type=float, default=LOD_DISTANCE)
+    parser.add_argument("--edits", type=int, default=2000, help="liczba edycji przy pomiarze aktualizacji")
+    parser.add_argument("--seed", type=int, default=0)
+    opts = parser.parse_args()
+
+    stale = check_neighbour_versions(opts.seed, opts.edits // 4)
+    print(f"sąsiedzi ze zmienionym obramowaniem LOD bez nowej wersji: {stale}\n")
+
+    for scene in opts.scenes:
+        for size in opts.sizes:
+            world = SCENES[scene](size, opts.seed)
+            chunks = list(world.chunks.values())
+            start = time.perf_counter()
+            for chunk in chunks:
+                chunk.lod(1)
+            build_ms = (time.perf_counter() - start) * 1000.0
+            pyramid = sum(level.nbytes for chunk in chunks for level in chunk.lod_cells) / 2**20
+
+            print(f"{scene} {size}³: budowa piramidy {build_ms:.1f} ms, pamięć {pyramid:.2f} MiB "
+                  f"(komórki {world.chunk_map.nbytes() / 2**20:.2f} MiB)")
+            print(f"{'promień':>9} {'chunki':>7} {'z LOD':>6} {'instancje':>11} {'instancje LOD':>14} "
+                  f"{'trójkąty':>11} {'trójkąty LOD':>13}")
+            camera = Camera(45.0, 30.0, size, far=size * 20.0)
+            mesh_cache = {}
+            for r in opts.radii:
+                camera.set_orbit(45.0, 30.0, size * r)
+                camera.update_matrices(world.get_center(), ASPECT)
+                full_inst, full_tri, n, _ = frame_counts(world, camera, 0, mesh_cache)
+                lod_inst, lod_tri, _, n_lod = frame_counts(world, camera, opts.lod_distance, mesh_cache)
+                print(f"{size * r:>9.0f} {n:>7} {n_lod:>6} {full_inst:>11} {lod_inst:>14} {full_tri:>11} {lod_tri:>13}")
+
+            # sama aktualizacja piramidy (komórki są zmieniane bezpośrednio, z pominięciem puli instancji)
+            rng = np.random.default_rng(opts.seed)
+            update_s, edits = 0.0, 0
+            for x, y, z in rng.integers(0, size, (opts.edits, 3)).tolist():
+                chunk = world.chunks.get(world.chunk_map.chunk_key(x, y, z))
+                if chunk is None:
+                    continue
+                local = (x - chunk.origin[0], y - chunk.origin[1], z - chunk.origin[2])
+                chunk.cells[local] = 0 if chunk.cells[local] else 1
+                start = time.perf_counter()
+                update_pyramid(chunk.lod_cells, chunk.cells, local)
+                update_s += time.perf_counter() - start
+                edits += 1
+            print(f"aktualizacja piramidy po zmianie voxela: {update_s * 1e6 / max(edits, 1):.1f} µs\n")
+    if stale:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Porównanie liczby trójkątów i czasu budowy siatek: pełne sześciany (instancjonowanie),
+same odsłonięte ściany oraz greedy meshing.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/meshing.py --size 64 --fill 1.0
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunks import pack_cells
+from meshing import build_chunk_mesh
+from voxel_editor import VoxelEditor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=64)
+    parser.add_argument("--fill", type=float, default=1.0, help="ułamek zapełnionych voxeli (1.0 = pełny sześcian)")
+    parser.add_argument("--materials", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    opts = parser.parse_args()
+
+    rng = np.random.default_rng(opts.seed)
+    world = VoxelEditor(opts.size, 1.0)
+    occupancy = (rng.random((opts.size,) * 3) < opts.fill).astype(np.uint8)
+    materials = rng.integers(0, opts.materials, (opts.size,) * 3).astype(np.uint8)
+    world.chunk_map.write_dense((0, 0, 0), pack_cells(occupancy, materials))
+
+    instanced = world.chunk_map.filled_count() * 12
+    print(f"{'tryb':>14} {'trójkąty':>12} {'czas [ms]':>10}")
+    print(f"{'instancje':>14} {instanced:>12} {'-':>10}")
+    for name, greedy in (("odsłonięte", False), ("greedy", True)):
+        start = time.perf_counter()
+        vertices = 0
+        for key in world.chunks:
+            vertices += len(build_chunk_mesh(world.chunk_map.padded_cells(key), greedy))
+        elapsed = (time.perf_counter() - start) * 1000.0
+        print(f"{name:>14} {vertices // 3:>12} {elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
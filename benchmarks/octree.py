@@ -0,0 +1,85 @@
+"""
+Hierarchiczny indeks zajętości (octree): pamięć indeksu w porównaniu z gęstymi komórkami chunków,
+czas budowy, wybór voxela promieniem (drzewo kontra przejście po płaskiej siatce chunków)
+oraz zapytania "czy w obszarze jest voxel" (drzewo kontra odczyt gęstego obszaru).
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/octree.py --sizes 256 512
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scenes import SCENES
+from octree import OccupancyTree
+
+
+def random_rays(world, count, rng):
+    """Promienie z losowych punktów wokół świata skierowane w okolice jego środka."""
+    size = world.grid_size
+    center = world.get_center()
+    rays = []
+    for _ in range(count):
+        origin = center + rng.normal(size=3) * size
+        direction = center + rng.normal(size=3) * size * 0.3 - origin
+        rays.append((origin, direction / np.linalg.norm(direction)))
+    return rays
+
+
+def per_call_ms(fn, args_list):
+    """Średni czas wywołania w ms (po jednym przebiegu rozgrzewającym)."""
+    results = [fn(*args) for args in args_list]
+    start = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - start) * 1000.0 / len(args_list), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=["terrain", "scatter"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[128, 256])
+    parser.add_argument("--fill", type=float, default=0.001, help="zapełnienie sceny scatter")
+    parser.add_argument("--rays", type=int, default=200)
+    parser.add_argument("--boxes", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    opts = parser.parse_args()
+
+    print(f"{'scena':>14} {'gęste [MiB]':>12} {'indeks [MiB]':>13} {'budowa [ms]':>12} {'promień drzewo [ms]':>20} "
+          f"{'promień chunki [ms]':>20} {'zg.':>8} {'obszar drzewo [ms]':>19} {'obszar gęsto [ms]':>18}")
+    for scene in opts.scenes:
+        for size in opts.sizes:
+            rng = np.random.default_rng(opts.seed)
+            world = SCENES[scene](size, opts.seed, opts.fill) if scene == "scatter" else SCENES[scene](size, opts.seed)
+            chunk_map = world.chunk_map
+            dense = chunk_map.nbytes() / 2**20
+
+            start = time.perf_counter()
+            chunk_map._tree = OccupancyTree(chunk_map)
+            for chunk in world.chunks.values():
+                chunk.occupancy()
+            build_ms = (time.perf_counter() - start) * 1000.0
+            index = chunk_map.tree.nbytes() / 2**20
+
+            rays = random_rays(world, opts.rays, rng)
+            tree_ms, tree_hits = per_call_ms(world.raycast, rays)
+            flat_ms, flat_hits = per_call_ms(world.raycast_chunks, rays)
+            agree = sum(a[0] == b[0] for a, b in zip(tree_hits, flat_hits))
+
+            lo = rng.integers(0, size, (opts.boxes, 3))
+            boxes = [(a, a + rng.integers(1, size // 4 + 2, 3)) for a in lo]
+            box_ms, box_hits = per_call_ms(chunk_map.tree.any_in_box, boxes)
+            read_ms, read_hits = per_call_ms(lambda a, b: bool(chunk_map.read_dense(a, tuple(b - a)).any()), boxes)
+            assert box_hits == read_hits
+
+            print(f"{f'{scene} {size}³':>14} {dense:>12.2f} {index:>13.3f} {build_ms:>12.1f} {tree_ms:>20.3f} "
+                  f"{flat_ms:>20.3f} {agree:>4}/{len(rays)} {box_ms:>19.3f} {read_ms:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Porównanie wyboru voxela przez przejście DDA, wektorowy test wszystkich voxeli
+oraz referencyjny przegląd voxel po voxelu. Kolumny zgodności porównują wyniki z metodą referencyjną.
+Przed pomiarem wynik utils.ray_boxes_intersection (hit, t_near, t_far) jest porównywany element po elemencie
+z utils.ray_box_intersection dla losowych promieni (także równoległych do osi) i pudełek; przy niezgodności
+skrypt kończy się kodem 1.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/pick.py --sizes 16 32 64 128 256 512 --brute-max 64
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from camera import Camera
+from utils import look_at, perspective, ray_box_intersection, ray_boxes_intersection
+from chunks import pack_cells
+from voxel_editor import VoxelEditor
+from constants import YAW, PITCH, WIDTH, HEIGHT
+
+
+def make_world(size, fill, seed):
+    """
+    Tworzy świat o zadanym rozmiarze z losowo zapełnionym środkiem.
+
+    :param int size: Liczba voxelów w każdej osi.
+    :param float fill: Ułamek zapełnionych voxeli w środkowym sześcianie.
+    :param int seed: Ziarno generatora liczb losowych.
+    :return: Obiekt VoxelEditor.
+    """
+    world = VoxelEditor(size, 1.0)
+    rng = np.random.default_rng(seed)
+    lo, hi = size // 4, size - size // 4
+    block = (rng.random((hi - lo,) * 3) < fill).astype(np.uint8)
+    world.chunk_map.write_dense((lo, lo, lo), pack_cells(block, np.ones_like(block)))
+    world.version += 1
+    return world
+
+
+def check_ray_boxes(rng, rays, boxes):
+    """
+    Porównuje wektorowy test promieni z pudełkami (ray_boxes_intersection) z testem pojedynczym
+    (ray_box_intersection) dla każdej pary promień - pudełko. Co trzeci promień jest równoległy do jednej
+    lub dwóch osi (zerowe składowe kierunku).
+
+    :param np.random.Generator rng: Generator liczb losowych.
+    :param int rays: Liczba promieni.
+    :param int boxes: Liczba pudełek.
+    :return: Liczba niezgodnych par.
+    """
+    box_mins = rng.uniform(-8.0, 8.0, (boxes, 3)).astype(np.float32)
+    box_maxs = box_mins + rng.uniform(0.1, 4.0, (boxes, 3)).astype(np.float32)
+    origins = rng.uniform(-12.0, 12.0, (rays, 3)).astype(np.float32)
+    dirs = rng.normal(size=(rays, 3))
+    for i in range(0, rays, 3):
+        dirs[i, rng.choice(3, rng.integers(1, 3), replace=False)] = 0.0
+    dirs = (dirs / np.linalg.norm(dirs, axis=1, keepdims=True)).astype(np.float32)
+
+    hit, t_near, t_far = ray_boxes_intersection(origins, dirs, box_mins, box_maxs)
+    mismatches = 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for r in range(rays):
+            for b in range(boxes):
+                near, far = ray_box_intersection(origins[r], dirs[r], box_mins[b], box_maxs[b])
+                if near is None:
+                    agree = not hit[r, b]
+                else:
+                    agree = bool(hit[r, b]) and np.isclose(t_near[r, b], near) and np.isclose(t_far[r, b], far)
+                mismatches += not agree
+    return mismatches
+
+
+def time_picker(picker, mouse, args):
+    """
+    Mierzy średni czas wywołania funkcji wybierającej.
+
+    :param picker: Funkcja pick lub pick_brute_force.
+    :param list mouse: Lista pozycji myszy.
+    :param tuple args: Pozostałe argumenty (width, height, view, proj, cam_pos).
+    :return: (średni czas w ms, lista wyników)
+    """
+    results = []
+    start = time.perf_counter()
+    for mx, my in mouse:
+        results.append(picker(mx, my, *args))
+    return (time.perf_counter() - start) * 1000.0 / len(mouse), results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 32, 64, 128, 256, 512])
+    parser.add_argument("--brute-max", type=int, default=64, help="największy rozmiar mierzony metodą referencyjną")
+    parser.add_argument("--rays", type=int, default=20)
+    parser.add_argument("--fill", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--check-rays", type=int, default=300, help="promienie sprawdzania ray_boxes_intersection")
+    parser.add_argument("--check-boxes", type=int, default=200, help="pudełka sprawdzania ray_boxes_intersection")
+    opts = parser.parse_args()
+
+    rng = np.random.default_rng(opts.seed)
+    mismatches = check_ray_boxes(rng, opts.check_rays, opts.check_boxes)
+    print(f"ray_boxes_intersection a ray_box_intersection: {opts.check_rays * opts.check_boxes - mismatches}"
+          f"/{opts.check_rays * opts.check_boxes} zgodnych par promień-pudełko\n")
+    mouse = [(rng.uniform(0, WIDTH), rng.uniform(0, HEIGHT)) for _ in range(opts.rays)]
+
+    print(f"{'rozmiar':>8} {'DDA [ms]':>10} {'wekt. [ms]':>11} {'brute [ms]':>12} {'przysp.':>9} {'zg. DDA':>8} {'zg. wekt.':>9}")
+    for size in opts.sizes:
+        world = make_world(size, opts.fill, opts.seed)
+        camera = Camera(YAW, PITCH, size * 2.5)
+        center = world.get_center()
+        cam_pos = camera.get_pos(center)
+        view = look_at(cam_pos, center, np.array([0.0, 1.0, 0.0], dtype=np.float32))
+        proj = perspective(45.0, WIDTH / float(HEIGHT), 0.1, size * 10.0)
+        args = (WIDTH, HEIGHT, view, proj, cam_pos)
+
+        dda_ms, dda_hits = time_picker(world.pick, mouse, args)
+        batched_ms, batched_hits = time_picker(world.pick_batched, mouse, args)
+        if size <= opts.brute_max:
+            brute_ms, brute_hits = time_picker(world.pick_brute_force, mouse, args)
+            agree = sum(h[0] == b for h, b in zip(dda_hits, brute_hits))
+            agree_batched = sum(h[0] == b for h, b in zip(batched_hits, brute_hits))
+            print(f"{size:>8} {dda_ms:>10.3f} {batched_ms:>11.3f} {brute_ms:>12.3f} {brute_ms / dda_ms:>8.0f}x "
+                  f"{agree:>4}/{len(mouse)} {agree_batched:>5}/{len(mouse)}")
+        else:
+            print(f"{size:>8} {dda_ms:>10.3f} {batched_ms:>11.3f} {'-':>12} {'-':>9} {'-':>8} {'-':>9}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Rozmiar pliku sceny oraz czasy zapisu, otwarcia (tylko indeks), odczytu pojedynczego voxela
+i zdekodowania wszystkich chunków, razem z pamięcią zajętą po otwarciu i po pełnym zdekodowaniu.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/scene_file.py --sizes 128 256 512
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scenes import SCENES
+from scene_file import open_scene, save_scene
+
+MATERIALS = [("drewno", "Textures/wood_texture.jpg", (1.0, 1.0, 1.0), (0.6, 0.75))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=["terrain", "cube"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[128, 256])
+    parser.add_argument("--seed", type=int, default=0)
+    opts = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="scene_"), "scena.vxs")
+    print(f"{'scena':>14} {'surowe [MiB]':>13} {'plik [MiB]':>11} {'zapis [ms]':>11} {'otwarcie [ms]':>14} "
+          f"{'voxel [ms]':>11} {'wszystko [ms]':>14} {'pamięć po otw. [MiB]':>21} {'po dekod. [MiB]':>16}")
+    try:
+        for scene in opts.scenes:
+            for size in opts.sizes:
+                world = SCENES[scene](size, opts.seed)
+                raw = world.chunk_map.nbytes() / 2**20
+                start = time.perf_counter()
+                file_size = save_scene(world, path, MATERIALS) / 2**20
+                save_ms = (time.perf_counter() - start) * 1000.0
+                del world
+
+                tracemalloc.start()
+                start = time.perf_counter()
+                loaded, _ = open_scene(path)
+                open_ms = (time.perf_counter() - start) * 1000.0
+                open_mem = tracemalloc.get_traced_memory()[0] / 2**20
+
+                start = time.perf_counter()
+                loaded.get_voxel((size // 2, size // 4, size // 2))
+                voxel_ms = (time.perf_counter() - start) * 1000.0
+
+                start = time.perf_counter()
+                for chunk in loaded.chunks.values():
+                    chunk.cells
+                all_ms = (time.perf_counter() - start) * 1000.0
+                full_mem = tracemalloc.get_traced_memory()[0] / 2**20
+                tracemalloc.stop()
+
+                print(f"{f'{scene} {size}³':>14} {raw:>13.1f} {file_size:>11.2f} {save_ms:>11.1f} {open_ms:>14.1f} "
+                      f"{voxel_ms:>11.2f} {all_ms:>14.1f} {open_mem:>21.1f} {full_mem:>16.1f}")
+                del loaded
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
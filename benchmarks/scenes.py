@@ -0,0 +1,129 @@
+"""
+Generatory scen i ścieżek kamery używane przez skrypty pomiarowe.
+Sceny są deterministyczne dla danego rozmiaru i ziarna, więc wyniki kolejnych pomiarów
+można porównywać z zapisanym wzorcem.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chunks import pack_cells
+from voxel_editor import VoxelEditor
+
+N_MATERIALS = 5                            # liczba materiałów używanych w scenach
+
+
+def _world(size, cells):
+    """Tworzy świat o zadanym rozmiarze i zapisuje do niego gęstą tablicę komórek."""
+    world = VoxelEditor(size, 1.0)
+    world.chunk_map.write_dense((0, 0, 0), cells)
+    world.version += 1
+    return world
+
+
+def solid_cube(size, seed=0):
+    """
+    Pełny sześcian z losowymi materiałami (najgorszy przypadek dla instancjonowania,
+    najlepszy dla usuwania zasłoniętych ścian).
+
+    :param int size: Liczba voxelów w każdej osi.
+    :param int seed: Ziarno generatora liczb losowych.
+    :return: Obiekt VoxelEditor.
+    """
+    rng = np.random.default_rng(seed)
+    materials = rng.integers(0, N_MATERIALS, (size,) * 3)
+    return _world(size, pack_cells(np.ones((size,) * 3), materials))
+
+
+def value_noise_2d(size, seed=0, octaves=4, base_cells=4):
+    """
+    Szum wartości 2D: suma oktaw losowych siatek interpolowanych dwuliniowo.
+
+    :param int size: Rozmiar mapy w każdej osi.
+    :param int seed: Ziarno generatora liczb losowych.
+    :param int octaves: Liczba oktaw.
+    :param int base_cells: Liczba komórek siatki najniższej oktawy w każdej osi.
+    :return: Tablica float64 (size, size) o wartościach w [0, 1].
+    """
+    rng = np.random.default_rng(seed)
+    result = np.zeros((size, size))
+    amplitude, total = 1.0, 0.0
+    for octave in range(octaves):
+        cells = base_cells * 2 ** octave
+        grid = rng.random((cells + 1, cells + 1))
+        t = np.linspace(0.0, cells, size, endpoint=False)
+        i = t.astype(np.int64)
+        f = t - i
+        f = f * f * (3.0 - 2.0 * f)
+        a = grid[i][:, i] * (1 - f)[None, :] + grid[i][:, i + 1] * f[None, :]
+        b = grid[i + 1][:, i] * (1 - f)[None, :] + grid[i + 1][:, i + 1] * f[None, :]
+        result += amplitude * (a * (1 - f)[:, None] + b * f[:, None])
+        total += amplitude
+        amplitude *= 0.5
+    return result / total
+
+
+def noise_terrain(size, seed=0):
+    """
+    Teren z mapy wysokości szumu wartości: kamień pod spodem, piasek i trawa na powierzchni.
+
+    :param int size: Liczba voxelów w każdej osi.
+    :param int seed: Ziarno generatora liczb losowych.
+    :return: Obiekt VoxelEditor.
+    """
+    heights = (value_noise_2d(size, seed) * size * 0.75).astype(np.int64) + 1
+    y = np.arange(size)[None, :, None]
+    h = heights[:, None, :]
+    occupancy = y < h
+    materials = np.where(y < h - 3, 2, np.where(h < size // 3, 3, 1))
+    return _world(size, pack_cells(occupancy, materials))
+
+
+def sparse_scatter(size, seed=0, fill=0.02):
+    """
+    Pojedyncze voxele rozrzucone losowo w całym świecie (dużo odsłoniętych ścian, mało sąsiadów).
+
+    :param int size: Liczba voxelów w każdej osi.
+    :param int seed: Ziarno generatora liczb losowych.
+    :param float fill: Ułamek zapełnionych voxeli.
+    :return: Obiekt VoxelEditor.
+    """
+    rng = np.random.default_rng(seed)
+    occupancy = rng.random((size,) * 3) < fill
+    materials = rng.integers(0, N_MATERIALS, (size,) * 3)
+    return _world(size, pack_cells(occupancy, materials))
+
+
+SCENES = {
+    "cube": solid_cube,
+    "terrain": noise_terrain,
+    "scatter": sparse_scatter,
+}
+
+
+def orbit_path(size, frames):
+    """Pełny obrót kamery wokół środka świata na stałej wysokości."""
+    yaw = np.linspace(0.0, 360.0, frames, endpoint=False)
+    return [(float(y), 30.0, size * 2.0) for y in yaw]
+
+
+def dolly_path(size, frames):
+    """Najazd kamery od dalekiego planu do wnętrza sceny (zmienna liczba chunków w kadrze)."""
+    radius = np.linspace(size * 3.0, size * 0.4, frames)
+    return [(45.0, 20.0, float(r)) for r in radius]
+
+
+def sweep_path(size, frames):
+    """Przejście kamery od widoku z dołu do widoku z góry."""
+    pitch = np.linspace(-60.0, 85.0, frames)
+    return [(45.0 + float(p) * 0.5, float(p), size * 1.5) for p in pitch]
+
+
+CAMERA_PATHS = {
+    "orbit": orbit_path,
+    "dolly": dolly_path,
+    "sweep": sweep_path,
+}
@@ -0,0 +1,123 @@
+"""
+Przepustowość wysyłania danych chunków na GPU: zwykłe glBufferData/glBufferSubData (direct)
+kontra zmapowany pierścień segmentów z fence (stream, patrz streaming.py). W każdej klatce
+scena jest edytowana (pojedyncze voxele i co kilka klatek operacja zbiorcza), renderer
+synchronizuje bufory, a klatka jest rysowana bez glFinish, więc GPU może jeszcze czytać
+bufory poprzednich klatek. Mierzony jest czas CPU synchronizacji (p50/p95), liczba
+wysłanych bajtów, przepustowość i liczba zatrzymań na fence.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/streaming.py --sizes 64 128
+    python benchmarks/streaming.py --context egl --modes meshed
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scenes import SCENES
+
+UPLOADS = ("direct", "stream")
+MODES = ("instanced", "meshed")
+CONTEXTS = ("native", "egl", "osmesa")
+WIDTH, HEIGHT = 1000, 800
+
+
+def edit_frame(world, rng, frame, edits, bulk_every):
+    """Edytuje scenę przed klatką: pojedyncze voxele, a co bulk_every klatek kula materiału."""
+    size = world.grid_size
+    for x, y, z in rng.integers(0, size, (edits, 3)).tolist():
+        if world.chunk_map.get_cell(x, y, z):
+            world.chunk_map.clear(x, y, z)
+        else:
+            world.chunk_map.set(x, y, z, int(rng.integers(0, 5)))
+    world.version += 1
+    if bulk_every and frame % bulk_every == 0:
+        center = rng.integers(0, size, 3)
+        world.fill_sphere(tuple(center.tolist()), size // 8, int(rng.integers(0, 5)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenes", nargs="+", choices=list(SCENES), default=["terrain"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--edits", type=int, default=64, help="liczba edycji pojedynczych voxeli na klatkę")
+    parser.add_argument("--bulk-every", type=int, default=10, help="co ile klatek operacja zbiorcza (0 wyłącza)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--context", choices=CONTEXTS, default="native")
+    opts = parser.parse_args()
+
+    if opts.context != "native":
+        os.environ["PYOPENGL_PLATFORM"] = opts.context
+
+    import glfw
+    import OpenGL.GL as GL
+
+    from camera import Camera
+    from offscreen import OffscreenTarget
+    from opengl_helpers import init_geometry, init_shaders, init_window, set_matrices
+    from renderer import ChunkRenderer
+    from streaming import StreamBuffer
+
+    init_window(visible=False, width=WIDTH, height=HEIGHT, context_api=opts.context)
+    target = OffscreenTarget(WIDTH, HEIGHT)
+    programs = {
+        "instanced": init_shaders("shaders/voxel.vert", "shaders/voxel.frag"),
+        "meshed": init_shaders("shaders/voxel_mesh.vert", "shaders/voxel.frag"),
+    }
+    vbo_cube, num_cube_vertices = init_geometry()
+    GL.glEnable(GL.GL_DEPTH_TEST)
+
+    print(f"{'pomiar':>28} {'sync p50 [ms]':>14} {'sync p95 [ms]':>14} {'wysłane [MiB]':>14} {'MiB/s':>8} {'zatrzymania':>12}")
+    for scene in opts.scenes:
+        for size in opts.sizes:
+            for mode in opts.modes:
+                for upload in UPLOADS:
+                    world = SCENES[scene](size, opts.seed)
+                    rng = np.random.default_rng(opts.seed)
+                    stream = StreamBuffer() if upload == "stream" else None
+                    renderer = ChunkRenderer(vbo_cube, num_cube_vertices, mode=mode, stream=stream)
+                    camera = Camera(45.0, 30.0, size * 1.5, far=size * 10.0)
+                    camera.update_matrices(world.get_center(), WIDTH / float(HEIGHT))
+                    program, loc_view, loc_proj, _, _, _, _, loc_chunk_origin, loc_voxel_size, loc_cell_scale = programs[mode]
+                    renderer.sync(world)
+                    renderer.uploaded_bytes, renderer.upload_seconds = 0, 0.0
+
+                    times = []
+                    for frame in range(opts.frames):
+                        edit_frame(world, rng, frame, opts.edits, opts.bulk_every)
+                        start = time.perf_counter()
+                        renderer.sync(world)
+                        times.append((time.perf_counter() - start) * 1000.0)
+
+                        target.bind()
+                        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+                        GL.glUseProgram(program)
+                        GL.glUniform1f(loc_voxel_size, world.voxel_size)
+                        set_matrices(loc_view, loc_proj, camera.view, camera.proj)
+                        renderer.draw(world, loc_chunk_origin, camera.view_proj, camera.pos, loc_cell_scale)
+                        GL.glFlush()
+                    GL.glFinish()
+                    target.unbind()
+
+                    p50, p95 = np.percentile(times, (50, 95))
+                    stalls = stream.stalls if stream is not None else 0
+                    name = f"{scene}/{size}/{mode}/{upload}"
+                    print(f"{name:>28} {p50:>14.2f} {p95:>14.2f} {renderer.uploaded_bytes / 2**20:>14.1f} "
+                          f"{renderer.upload_rate():>8.0f} {stalls:>12}")
+                    renderer.release()
+                    if stream is not None:
+                        stream.release()
+
+    target.release()
+    glfw.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Czas proceduralnego generowania terenu (terrain.py) dla różnych liczb procesów i rodzajów szumu:
+samo wypełnienie bufora komórek, zbudowanie świata (VoxelEditor) oraz zapis pliku sceny
+z chunkami kodowanymi w procesach roboczych. Dla porównania mierzony jest też jeden proces
+bez puli i bez pamięci współdzielonej.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/terrain.py --size 512 --height 128 --workers 1 2 4
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from terrain import generate, generate_scene_file, generate_world, NOISES, NOISE_SIMPLEX, TERRAIN_HEIGHT, TERRAIN_SIZE
+
+
+def timed(fn, *args, **kwargs):
+    """
+    Mierzy czas pojedynczego wywołania.
+
+    :return: (czas w ms, wynik)
+    """
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000.0, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=TERRAIN_SIZE)
+    parser.add_argument("--height", type=int, default=TERRAIN_HEIGHT)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count()])
+    parser.add_argument("--noise", nargs="+", choices=list(NOISES), default=[NOISE_SIMPLEX])
+    parser.add_argument("--seed", type=int, default=0)
+    opts = parser.parse_args()
+
+    reference = {noise: generate(opts.size, opts.height, opts.seed, noise, workers=1) for noise in opts.noise}
+    print(f"teren {opts.size}x{opts.height}x{opts.size}, {os.cpu_count()} rdzeni")
+    print(f"{'szum':>8} {'procesy':>8} {'komórki [ms]':>13} {'świat [ms]':>11} {'plik [ms]':>10} {'plik [MiB]':>11} "
+          f"{'zajęte':>10} {'zgodne':>7}")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "teren.vxs")
+        for noise in opts.noise:
+            for workers in dict.fromkeys(opts.workers):
+                cells_ms, cells = timed(generate, opts.size, opts.height, opts.seed, noise, workers=workers)
+                world_ms, _ = timed(generate_world, opts.size, opts.height, opts.seed, noise, workers=workers)
+                file_ms, (nbytes, _) = timed(generate_scene_file, path, [], opts.size, opts.height, opts.seed, noise,
+                                             workers=workers)
+                agree = np.array_equal(cells, reference[noise])
+                print(f"{noise:>8} {workers:>8} {cells_ms:>13.0f} {world_ms:>11.0f} {file_ms:>10.0f} "
+                      f"{nbytes / 2**20:>11.1f} {np.count_nonzero(cells):>10} {'tak' if agree else 'NIE':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Porównanie czasu wczytywania tekstur materiałów: szeregowo bez pamięci podręcznej,
+równolegle bez pamięci podręcznej oraz równolegle z wypełnioną pamięcią podręczną.
+
+Uruchomienie z katalogu głównego projektu:
+    python benchmarks/textures.py --size 256 --repeat 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from materials import MATERIALS, TEXTURE_SIZE, load_material_layers
+
+
+def measure(repeat, **kwargs):
+    """
+    Mierzy najkrótszy czas wczytania tekstur.
+
+    :param int repeat: Liczba powtórzeń.
+    :return: (czas w ms, liczba trafień w pamięć podręczną w ostatnim powtórzeniu)
+    """
+    best = float("inf")
+    hits = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _, hits = load_material_layers(MATERIALS, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000.0, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=TEXTURE_SIZE, help="rozmiar warstwy tablicy tekstur")
+    parser.add_argument("--repeat", type=int, default=3, help="liczba powtórzeń każdego pomiaru")
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="texture_cache_")
+    try:
+        print(f"{'wariant':>24} {'czas [ms]':>10} {'trafienia':>10}")
+        for name, kwargs in (
+            ("szeregowo", dict(cache_dir=None, max_workers=1)),
+            ("równolegle", dict(cache_dir=None)),
+        ):
+            elapsed, hits = measure(args.repeat, size=args.size, **kwargs)
+            print(f"{name:>24} {elapsed:>10.1f} {hits:>10}")
+
+        load_material_layers(MATERIALS, size=args.size, cache_dir=cache_dir)
+        elapsed, hits = measure(args.repeat, size=args.size, cache_dir=cache_dir)
+        print(f"{'pamięć podręczna':>24} {elapsed:>10.1f} {hits:>10}")
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import numpy as np
+
+"""
+Maski kształtów i przekształcenia bloków używane przez operacje zbiorcze VoxelEditor.
+Wszystkie funkcje działają na gęstych tablicach NumPy obszaru świata, bez pętli po voxelach.
+"""
+
+
+def box_bounds(corner_a, corner_b):
+    """
+    Zwraca prostopadłościan rozpięty na dwóch narożnych voxelach (oba włącznie).
+
+    :param corner_a: Współrzędne pierwszego narożnika.
+    :param corner_b: Współrzędne przeciwległego narożnika.
+    :return: (lo, hi) - dolny narożnik włącznie i górny wyłącznie.
+    """
+    lo = tuple(min(int(a), int(b)) for a, b in zip(corner_a, corner_b))
+    hi = tuple(max(int(a), int(b)) + 1 for a, b in zip(corner_a, corner_b))
+    return lo, hi
+
+
+def _grid(lo, hi):
+    """Zwraca współrzędne środków voxeli obszaru jako trzy tablice do rozgłaszania."""
+    return np.ogrid[lo[0]:hi[0], lo[1]:hi[1], lo[2]:hi[2]]
+
+
+def sphere_mask(lo, hi, center, radius):
+    """
+    Maska voxeli obszaru, których środek leży w kuli.
+
+    :param tuple lo: Dolny narożnik obszaru (włącznie).
+    :param tuple hi: Górny narożnik obszaru (wyłącznie).
+    :param center: Środek kuli we współrzędnych voxelowych.
+    :param float radius: Promień kuli w voxelach.
+    :return: Tablica bool o kształcie obszaru.
+    """
+    x, y, z = _grid(lo, hi)
+    cx, cy, cz = center
+    return (x - cx) ** 2 + (y - cy) ** 2 + (z - cz) ** 2 <= radius * radius
+
+
+def cylinder_mask(lo, hi, center, radius, axis=1):
+    """
+    Maska voxeli obszaru, których środek leży w nieskończonym walcu o osi równoległej do osi układu
+    (wysokość walca wyznacza obszar).
+
+    :param tuple lo: Dolny narożnik obszaru (włącznie).
+    :param tuple hi: Górny narożnik obszaru (wyłącznie).
+    :param center: Punkt na osi walca we współrzędnych voxelowych.
+    :param float radius: Promień walca w voxelach.
+    :param int axis: Oś walca (0 = X, 1 = Y, 2 = Z).
+    :return: Tablica bool o kształcie obszaru.
+    """
+    coords = _grid(lo, hi)
+    d2 = sum((coords[a] - center[a]) ** 2 for a in range(3) if a != axis)
+    return np.broadcast_to(d2 <= radius * radius, tuple(h - l for l, h in zip(lo, hi))).copy()
+
+
+def flood_mask(cells, start):
+    """
+    Wyznacza spójny (przez ściany) obszar komórek o tej samej wartości co komórka startowa.
+    Przeszukiwanie wszerz operuje na całych frontach indeksów, więc koszt zależy od rozmiaru
+    obszaru, a nie od liczby kroków.
+
+    :param np.array cells: Gęsta tablica komórek (X, Y, Z).
+    :param tuple start: Komórka startowa (indeks w tablicy).
+    :return: Tablica bool o kształcie cells.
+    """
+    shape = cells.shape
+    target = cells == cells[tuple(start)]
+    visited = np.zeros(cells.size, dtype=bool)
+    flat_target = target.reshape(-1)
+    strides = (shape[1] * shape[2], shape[2], 1)
+
+    frontier = np.array([np.ravel_multi_index(tuple(start), shape)], dtype=np.int64)
+    visited[frontier] = True
+    while len(frontier):
+        coords = np.unravel_index(frontier, shape)
+        candidates = []
+        for axis in range(3):
+            for sign in (-1, 1):
+                c = coords[axis] + sign
+                ok = (c >= 0) & (c < shape[axis])
+                candidates.append(frontier[ok] + sign * strides[axis])
+        candidates = np.concatenate(candidates)
+        candidates = candidates[flat_target[candidates] & ~visited[candidates]]
+        frontier = np.unique(candidates)
+        visited[frontier] = True
+    return visited.reshape(shape)
+
+
+def transform_block(cells, quarter_turns=0, axis=1, mirror=()):
+    """
+    Obraca i odbija blok komórek (np. schowek przed wklejeniem).
+
+    :param np.array cells: Blok komórek (X, Y, Z).
+    :param int quarter_turns: Liczba obrotów o 90 stopni wokół osi axis.
+    :param int axis: Oś obrotu (0 = X, 1 = Y, 2 = Z).
+    :param tuple mirror: Osie, względem których blok jest odbijany (po obrocie).
+    :return: Nowa tablica komórek.
+    """
+    plane = tuple(a for a in range(3) if a != axis)
+    out = np.rot90(cells, quarter_turns % 4, axes=plane)
+    for a in mirror:
+        out = np.flip(out, axis=a)
+    return np.ascontiguousarray(out)
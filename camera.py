@@ -1,12 +1,28 @@
 import numpy as np
 import math
 
-"""Klasa reprezentująca kamerę w scenie 3D."""
+from utils import look_at, look_at_inverse, perspective, perspective_inverse
+
+"""
+Klasa reprezentująca kamerę w scenie 3D. Macierze widoku i projekcji, ich iloczyn
+oraz odwrotności są przechowywane i przeliczane tylko po zmianie kamery, punktu centralnego
+lub proporcji widoku.
+"""
 class Camera:
-    def __init__(self, yaw, pitch, radius):
+    def __init__(self, yaw, pitch, radius, fov_y=45.0, near=0.1, far=500.0, max_radius=100.0):
         self.yaw = yaw
         self.pitch = pitch
         self.radius = radius
+        self.max_radius = max_radius       # największa odległość od punktu centralnego przy przybliżaniu
+        self.fov_y = fov_y
+        self.near = near
+        self.far = far
+        self.version = 0                   # zwiększana przy każdej zmianie położenia kamery
+        self.matrices_key = None           # (wersja, punkt centralny, proporcje) przeliczonych macierzy
+        self.matrices_version = 0          # zwiększana przy każdym przeliczeniu macierzy
+        self.pos = None
+        self.view = self.proj = self.view_proj = None
+        self.inv_view = self.inv_proj = None
 
     def update_from_mouse(self, dx, dy):
         """
@@ -16,9 +32,12 @@ class Camera:
         :param float dy: Różnica pozycji myszy w osi Y.
         """
 
+        if dx == 0 and dy == 0:
+            return
         self.yaw   += dx * 0.2
         self.pitch += dy * 0.2
         self.pitch = max(-89.0, min(89.0, self.pitch))
+        self.version += 1
 
     def zoom(self, scroll_delta):
         """
@@ -27,8 +46,23 @@ class Camera:
         :param float scroll_delta: Wartość przewijania myszy.
         """
 
-        self.radius *= (1.0 - scroll_delta * 0.1)
-        self.radius = max(5.0, min(100.0, self.radius))
+        radius = max(5.0, min(self.max_radius, self.radius * (1.0 - scroll_delta * 0.1)))
+        if radius != self.radius:
+            self.radius = radius
+            self.version += 1
+
+    def set_orbit(self, yaw, pitch, radius):
+        """
+        Ustawia kamerę w zadanym położeniu na orbicie (np. w skryptowanych ścieżkach kamery).
+
+        :param float yaw: Kąt obrotu wokół osi Y w stopniach.
+        :param float pitch: Kąt nachylenia w stopniach.
+        :param float radius: Odległość od punktu centralnego.
+        """
+
+        if (yaw, pitch, radius) != (self.yaw, self.pitch, self.radius):
+            self.yaw, self.pitch, self.radius = yaw, pitch, radius
+            self.version += 1
 
     def get_pos(self, grid_center):
         """
@@ -44,4 +78,27 @@ class Camera:
         cam_x = grid_center[0] + self.radius * math.cos(pitch_rad) * math.cos(yaw_rad)
         cam_y = grid_center[1] + self.radius * math.sin(pitch_rad)
         cam_z = grid_center[2] + self.radius * math.cos(pitch_rad) * math.sin(yaw_rad)
-        return np.array([cam_x, cam_y, cam_z], dtype=np.float32)
\ No newline at end of file
+        return np.array([cam_x, cam_y, cam_z], dtype=np.float32)
+
+    def update_matrices(self, grid_center, aspect):
+        """
+        Przelicza macierze kamery, jeśli od ostatniego wywołania zmieniła się kamera,
+        punkt centralny lub proporcje widoku. Odwrotności są liczone w postaci jawnej.
+
+        :param np.array grid_center: 3-elementowy wektor pozycji środka świata.
+        :param float aspect: Stosunek szerokości do wysokości widoku.
+        :return: True jeśli macierze zostały przeliczone.
+        """
+        key = (self.version, tuple(float(v) for v in grid_center), aspect)
+        if key == self.matrices_key:
+            return False
+
+        self.pos = self.get_pos(grid_center)
+        self.view = look_at(self.pos, grid_center, np.array([0.0, 1.0, 0.0], dtype=np.float32))
+        self.proj = perspective(self.fov_y, aspect, self.near, self.far)
+        self.view_proj = self.proj @ self.view
+        self.inv_view = look_at_inverse(self.view)
+        self.inv_proj = perspective_inverse(self.fov_y, aspect, self.near, self.far)
+        self.matrices_key = key
+        self.matrices_version += 1
+        return True
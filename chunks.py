@@ -0,0 +1,470 @@
+import numpy as np
+from instance_pool import InstancePool
+from lod import build_pyramid, update_pyramid
+from octree import BRICK, OccupancyTree, brick_masks, child_bit
+
+MAX_MATERIALS = 255                        # komórka to uint8, a 0 oznacza pusty voxel
+INCREMENTAL_WRITE_LIMIT = 256              # powyżej tylu zmian w chunku write_cells przebudowuje pulę instancji
+COORD_OFFSET = 1 << 20                     # przesunięcie współrzędnych przy pakowaniu w klucz
+
+
+def pack_cells(occupancy, material_ids):
+    """
+    Koduje zajętość i materiały w jednej tablicy komórek (0 = pusto, w przeciwnym razie materiał + 1).
+
+    :param np.array occupancy: Tablica zajętości (0/1).
+    :param np.array material_ids: Tablica materiałów tego samego kształtu.
+    :return: Tablica uint8 komórek.
+    """
+    return np.where(occupancy != 0, np.asarray(material_ids, dtype=np.uint8) + 1, 0).astype(np.uint8)
+
+
+def pack_keys(coords):
+    """
+    Pakuje współrzędne voxeli (w zakresie +-2^20) w klucze int64 (po 21 bitów na oś).
+
+    :param np.array coords: Współrzędne (N, 3).
+    :return: Tablica int64 (N,).
+    """
+    keys = coords.astype(np.int64) + COORD_OFFSET
+    return (keys[:, 0] << 42) | (keys[:, 1] << 21) | keys[:, 2]
+
+
+def unpack_keys(keys):
+    """
+    Odtwarza współrzędne voxeli z kluczy pack_keys.
+
+    :param np.array keys: Tablica int64 (N,).
+    :return: Tablica int32 (N, 3).
+    """
+    mask = (1 << 21) - 1
+    coords = np.stack([keys >> 42, (keys >> 21) & mask, keys & mask], axis=1) - COORD_OFFSET
+    return coords.astype(np.int32)
+
+
+"""
+Fragment świata o stałym rozmiarze. Przechowuje komórki swoich voxeli w jednej tablicy uint8
+(0 = pusto, w przeciwnym razie materiał + 1) oraz własną pulę instancji używaną przy renderowaniu.
+Chunk wczytany z pliku sceny (source) dekoduje komórki dopiero przy pierwszym użyciu.
+"""
+class Chunk:
+    def __init__(self, key, size, source=None, count=0):
+        self.key = key
+        self.size = size
+        self.origin = (key[0] * size, key[1] * size, key[2] * size)
+        self.source = source               # (SceneFile, indeks wpisu) niezdekodowanego chunka lub None
+        self.count = count
+        self.version = 0
+        self.occupancy_bricks = None       # maski zajętości bricków 4³ (uint64), tworzone przy pierwszym użyciu
+        self.lod_cells = None              # poziomy 1.. piramidy LOD (patrz lod), tworzone przy pierwszym użyciu
+        if source is None:
+            self._cells = np.zeros((size, size, size), dtype=np.uint8)
+            self._instances = InstancePool(self.origin, capacity=64)
+        else:
+            self._cells = self._instances = None
+
+    @property
+    def loaded(self):
+        """Czy komórki chunka są już zdekodowane."""
+        return self._cells is not None
+
+    @property
+    def cells(self):
+        """Komórki chunka (C x C x C uint8), dekodowane z pliku sceny przy pierwszym użyciu."""
+        if self._cells is None:
+            self._load()
+        return self._cells
+
+    @property
+    def instances(self):
+        """Pula instancji chunka, budowana przy pierwszym użyciu wczytanego chunka."""
+        if self._instances is None:
+            self._load()
+        return self._instances
+
+    def _load(self):
+        """Dekoduje komórki z pliku sceny i buduje pulę instancji."""
+        scene, entry = self.source
+        self._cells = scene.decode_chunk(entry)
+        self._instances = InstancePool(self.origin, capacity=64)
+        self.source = None
+        self.rebuild_instances()
+
+    def bounds(self, voxel_size):
+        """
+        Zwraca prostopadłościan otaczający chunk w jednostkach świata.
+
+        :param float voxel_size: Rozmiar voxela.
+        :return: (box_min, box_max) jako 3-elementowe wektory.
+        """
+        box_min = np.array(self.origin, dtype=np.float32) * voxel_size
+        return box_min, box_min + self.size * voxel_size
+
+    def occupancy(self):
+        """
+        Zwraca maski zajętości bricków chunka (po jednej liczbie uint64 na brick 4³ voxeli, patrz octree).
+        Maski są budowane przy pierwszym wywołaniu, a potem aktualizowane przy każdej edycji.
+
+        :return: Tablica uint64 (C/4, C/4, C/4).
+        """
+        if self.occupancy_bricks is None:
+            self.occupancy_bricks = brick_masks(self.cells)
+        return self.occupancy_bricks
+
+    def _set_bit(self, lx, ly, lz, filled):
+        """Aktualizuje bit zajętości voxela, jeśli maski zostały utworzone."""
+        if self.occupancy_bricks is None:
+            return
+        brick = (lx // BRICK, ly // BRICK, lz // BRICK)
+        bit = np.uint64(1 << child_bit(lx % BRICK, ly % BRICK, lz % BRICK))
+        if filled:
+            self.occupancy_bricks[brick] |= bit
+        else:
+            self.occupancy_bricks[brick] &= ~bit
+
+    def lod(self, level):
+        """
+        Zwraca komórki chunka na danym poziomie piramidy LOD. Piramida jest budowana przy pierwszym
+        wywołaniu, a potem aktualizowana przy każdej edycji.
+
+        :param int level: Poziom (0 = komórki chunka).
+        :return: Tablica uint8 (C / 2^level)³.
+        """
+        if level == 0:
+            return self.cells
+        if self.lod_cells is None:
+            self.lod_cells = build_pyramid(self.cells)
+        return self.lod_cells[level - 1]
+
+    def _set_lod(self, lx, ly, lz):
+        """
+        Przelicza komórki piramidy LOD nad zmienionym voxelem, jeśli piramida została utworzona.
+
+        :return: Liczba zmienionych poziomów piramidy (0, gdy piramidy nie ma).
+        """
+        if self.lod_cells is None:
+            return 0
+        return update_pyramid(self.lod_cells, self.cells, (lx, ly, lz))
+
+    def rebuild_instances(self):
+        """Buduje od nowa pulę instancji chunka na podstawie jego komórek."""
+        local = np.argwhere(self.cells != 0)
+        coords = local + np.array(self.origin, dtype=np.int64)
+        self.instances.rebuild(coords, self.cells[local[:, 0], local[:, 1], local[:, 2]] - 1)
+        self.count = len(local)
+        self.occupancy_bricks = None
+        self.lod_cells = None
+        self.version += 1
+
+
+"""
+Rzadka mapa chunków indeksowana współrzędnymi chunka. Chunki są alokowane przy
+pierwszym zapisie i zwalniane, gdy staną się puste, więc zużycie pamięci zależy
+od zajętej objętości, a nie od rozmiaru świata.
+"""
+class ChunkMap:
+    def __init__(self, chunk_size, voxel_size):
+        if chunk_size % BRICK:
+            raise ValueError(f"Rozmiar chunka musi być wielokrotnością {BRICK}: {chunk_size}")
+        self.chunk_size = chunk_size
+        self.voxel_size = voxel_size
+        self.chunks = {}
+        self._tree = None
+
+    @property
+    def tree(self):
+        """Hierarchiczny indeks zajętości (OccupancyTree), budowany przy pierwszym użyciu i aktualizowany przy edycjach."""
+        if self._tree is None:
+            self._tree = OccupancyTree(self)
+        return self._tree
+
+    def _update_tree(self, key):
+        """Przekazuje zmianę liczby pełnych voxeli chunka do indeksu, jeśli został zbudowany."""
+        if self._tree is not None:
+            self._tree.update_chunk(key)
+
+    def chunk_key(self, x, y, z):
+        """
+        Zwraca klucz chunka zawierającego voxel.
+
+        :return: Krotka (cx, cy, cz).
+        """
+        c = self.chunk_size
+        return (x // c, y // c, z // c)
+
+    def get(self, x, y, z):
+        """
+        Zwraca materiał voxela lub None, jeśli voxel jest pusty.
+
+        :return: Identyfikator materiału lub None.
+        """
+        chunk = self.chunks.get(self.chunk_key(x, y, z))
+        if chunk is None:
+            return None
+        ox, oy, oz = chunk.origin
+        cell = chunk.cells[x - ox, y - oy, z - oz]
+        if cell == 0:
+            return None
+        return int(cell) - 1
+
+    def get_cell(self, x, y, z):
+        """
+        Zwraca surową wartość komórki voxela.
+
+        :return: 0 dla pustego voxela, w przeciwnym razie materiał + 1.
+        """
+        chunk = self.chunks.get(self.chunk_key(x, y, z))
+        if chunk is None:
+            return 0
+        ox, oy, oz = chunk.origin
+        return int(chunk.cells[x - ox, y - oy, z - oz])
+
+    def is_filled(self, x, y, z):
+        """
+        Sprawdza zajętość voxela na podstawie maski bitowej chunka.
+
+        :return: True jeśli voxel jest pełny.
+        """
+        chunk = self.chunks.get(self.chunk_key(x, y, z))
+        if chunk is None:
+            return False
+        ox, oy, oz = chunk.origin
+        lx, ly, lz = x - ox, y - oy, z - oz
+        mask = int(chunk.occupancy()[lx // BRICK, ly // BRICK, lz // BRICK])
+        return bool(mask >> child_bit(lx % BRICK, ly % BRICK, lz % BRICK) & 1)
+
+    def set(self, x, y, z, material_id):
+        """
+        Wypełnia voxel materiałem, alokując chunk w razie potrzeby.
+
+        :param int material_id: Identyfikator materiału (0 .. MAX_MATERIALS - 1).
+        """
+        if not 0 <= material_id < MAX_MATERIALS:
+            raise ValueError(f"Identyfikator materiału poza zakresem: {material_id}")
+        key = self.chunk_key(x, y, z)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = Chunk(key, self.chunk_size)
+            self.chunks[key] = chunk
+        ox, oy, oz = chunk.origin
+        lx, ly, lz = x - ox, y - oy, z - oz
+        if chunk.cells[lx, ly, lz] == 0:
+            chunk.count += 1
+            chunk._set_bit(lx, ly, lz, True)
+            self._update_tree(key)
+        chunk.cells[lx, ly, lz] = material_id + 1
+        levels = chunk._set_lod(lx, ly, lz)
+        chunk.instances.set((x, y, z), material_id)
+        chunk.version += 1
+        self._touch_neighbours(key, (lx, ly, lz), levels)
+
+    def clear(self, x, y, z):
+        """
+        Opróżnia voxel. Pusty chunk jest usuwany z mapy.
+
+        :return: True jeśli voxel był pełny.
+        """
+        key = self.chunk_key(x, y, z)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            return False
+        ox, oy, oz = chunk.origin
+        lx, ly, lz = x - ox, y - oy, z - oz
+        if chunk.cells[lx, ly, lz] == 0:
+            return False
+        chunk.cells[lx, ly, lz] = 0
+        chunk._set_bit(lx, ly, lz, False)
+        levels = chunk._set_lod(lx, ly, lz)
+        chunk.count -= 1
+        chunk.instances.remove((x, y, z))
+        chunk.version += 1
+        self._touch_neighbours(key, (lx, ly, lz), levels)
+        if chunk.count == 0:
+            del self.chunks[key]
+        self._update_tree(key)
+        return True
+
+    def write_cells(self, coords, values):
+        """
+        Zapisuje wartości pojedynczych komórek, grupując je po chunkach. Chunki z niewielką liczbą
+        zmian i zbudowanym słownikiem slotów puli są aktualizowane przyrostowo (set/clear),
+        a pozostałe jednym zapisem NumPy i jedną przebudową puli instancji.
+
+        :param np.array coords: Współrzędne voxeli (N, 3).
+        :param np.array values: Wartości komórek (N,) (0 = pusto, materiał + 1).
+        """
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+        values = np.asarray(values, dtype=np.uint8).reshape(-1)
+        if len(coords) == 0:
+            return
+        c = self.chunk_size
+        packed = pack_keys(coords // c)
+        order = np.argsort(packed, kind="stable")
+        packed = packed[order]
+        starts = np.flatnonzero(np.r_[True, packed[1:] != packed[:-1]])
+        bounds = np.r_[starts, len(packed)]
+        chunk_keys = unpack_keys(packed[starts])
+        for i, key in enumerate(map(tuple, chunk_keys.tolist())):
+            idx = order[bounds[i]:bounds[i + 1]]
+            chunk = self.chunks.get(key)
+            # przyrostowo tylko przy zbudowanym słowniku slotów: jego odbudowa kosztuje więcej niż przebudowa puli
+            if len(idx) <= INCREMENTAL_WRITE_LIMIT and (chunk is None or chunk.instances.indexed):
+                for (x, y, z), value in zip(coords[idx].tolist(), values[idx].tolist()):
+                    if value == 0:
+                        self.clear(x, y, z)
+                    else:
+                        self.set(x, y, z, value - 1)
+                continue
+            if chunk is None:
+                chunk = Chunk(key, c)
+                self.chunks[key] = chunk
+            local = coords[idx] - np.array(chunk.origin, dtype=np.int64)
+            chunk.cells[local[:, 0], local[:, 1], local[:, 2]] = values[idx]
+            chunk.rebuild_instances()
+            self._touch_neighbours(key, None)
+            if chunk.count == 0:
+                del self.chunks[key]
+            self._update_tree(key)
+
+    def write_dense(self, origin, cells):
+        """
+        Zapisuje gęstą tablicę komórek do świata, chunk po chunku, wycinkami NumPy.
+        Chunki, których komórki się zmieniły, mają przebudowywaną pulę instancji jeden raz,
+        a pozostałe nie są dotykane.
+
+        :param origin: Współrzędne voxela odpowiadającego elementowi [0, 0, 0].
+        :param np.array cells: Tablica (X, Y, Z) komórek (0 = pusto, materiał + 1).
+        """
+        c = self.chunk_size
+        lo = [int(v) for v in origin]
+        hi = [lo[a] + cells.shape[a] for a in range(3)]
+        for cx in range(lo[0] // c, (hi[0] - 1) // c + 1):
+            for cy in range(lo[1] // c, (hi[1] - 1) // c + 1):
+                for cz in range(lo[2] // c, (hi[2] - 1) // c + 1):
+                    key = (cx, cy, cz)
+                    o = (cx * c, cy * c, cz * c)
+                    src = tuple(slice(max(lo[a], o[a]) - lo[a], min(hi[a], o[a] + c) - lo[a]) for a in range(3))
+                    dst = tuple(slice(max(lo[a], o[a]) - o[a], min(hi[a], o[a] + c) - o[a]) for a in range(3))
+
+                    chunk = self.chunks.get(key)
+                    if chunk is None:
+                        if not cells[src].any():
+                            continue
+                        chunk = Chunk(key, c)
+                        self.chunks[key] = chunk
+                    elif np.array_equal(chunk.cells[dst], cells[src]):
+                        continue
+                    chunk.cells[dst] = cells[src]
+                    chunk.rebuild_instances()
+                    self._touch_neighbours(key, None)
+                    if chunk.count == 0:
+                        del self.chunks[key]
+                    self._update_tree(key)
+
+    def read_cells(self, coords):
+        """
+        Odczytuje wartości pojedynczych komórek, grupując je po chunkach.
+
+        :param np.array coords: Współrzędne voxeli (N, 3).
+        :return: Tablica uint8 (N,) wartości komórek (0 = pusto, materiał + 1).
+        """
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+        values = np.zeros(len(coords), dtype=np.uint8)
+        if len(coords) == 0:
+            return values
+        c = self.chunk_size
+        packed = pack_keys(coords // c)
+        order = np.argsort(packed, kind="stable")
+        packed = packed[order]
+        starts = np.flatnonzero(np.r_[True, packed[1:] != packed[:-1]])
+        bounds = np.r_[starts, len(packed)]
+        for i, key in enumerate(map(tuple, unpack_keys(packed[starts]).tolist())):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                continue
+            idx = order[bounds[i]:bounds[i + 1]]
+            local = coords[idx] - np.array(chunk.origin, dtype=np.int64)
+            values[idx] = chunk.cells[local[:, 0], local[:, 1], local[:, 2]]
+        return values
+
+    def read_dense(self, origin, shape):
+        """
+        Odczytuje komórki prostopadłościennego obszaru świata do gęstej tablicy, chunk po chunku.
+
+        :param origin: Współrzędne voxela odpowiadającego elementowi [0, 0, 0].
+        :param tuple shape: Rozmiar obszaru (X, Y, Z).
+        :return: Tablica uint8 komórek (0 = pusto, materiał + 1).
+        """
+        c = self.chunk_size
+        lo = [int(v) for v in origin]
+        hi = [lo[a] + shape[a] for a in range(3)]
+        out = np.zeros(tuple(shape), dtype=np.uint8)
+        if min(shape) <= 0:
+            return out
+        for key, chunk in self.chunks.items():
+            o = chunk.origin
+            if any(o[a] >= hi[a] or o[a] + c <= lo[a] for a in range(3)):
+                continue
+            dst = tuple(slice(max(lo[a], o[a]) - lo[a], min(hi[a], o[a] + c) - lo[a]) for a in range(3))
+            src = tuple(slice(max(lo[a], o[a]) - o[a], min(hi[a], o[a] + c) - o[a]) for a in range(3))
+            out[dst] = chunk.cells[src]
+        return out
+
+    def padded_cells(self, key, level=0):
+        """
+        Zwraca komórki chunka otoczone warstwą komórek sąsiednich chunków
+        (tylko sąsiedzi przez ściany), potrzebne do usuwania zasłoniętych ścian na granicy.
+
+        :param tuple key: Klucz chunka.
+        :param int level: Poziom piramidy LOD (komórki chunka i sąsiadów z tego samego poziomu).
+        :return: Tablica uint8 ((C+2)³) dla C = rozmiar chunka / 2^level.
+        """
+        c = self.chunk_size >> level
+        out = np.zeros((c + 2, c + 2, c + 2), dtype=np.uint8)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            out[1:-1, 1:-1, 1:-1] = chunk.lod(level)
+        for axis in range(3):
+            for sign in (-1, 1):
+                n_key = list(key)
+                n_key[axis] += sign
+                neighbour = self.chunks.get(tuple(n_key))
+                if neighbour is None:
+                    continue
+                src = [slice(None)] * 3
+                src[axis] = 0 if sign > 0 else c - 1
+                dst = [slice(1, -1)] * 3
+                dst[axis] = c + 1 if sign > 0 else 0
+                out[tuple(dst)] = neighbour.lod(level)[tuple(src)]
+        return out
+
+    def _touch_neighbours(self, key, local, levels=0):
+        """
+        Zwiększa wersję sąsiednich chunków, gdy zmieniony voxel leży na granicy chunka,
+        bo widoczność ich ścian zależy od tego voxela. Sąsiad rysowany z piramidy LOD obramowuje się
+        grubymi komórkami tego chunka (padded_cells), a komórka poziomu l obejmuje 2^l voxeli od ściany,
+        więc przy zmianie poziomów 1 .. levels granicą jest pas o grubości 2^levels.
+
+        :param tuple key: Klucz zmienionego chunka.
+        :param local: Lokalne współrzędne voxela w chunku lub None (wszyscy sąsiedzi).
+        :param int levels: Liczba zmienionych poziomów piramidy LOD chunka (wynik Chunk._set_lod).
+        """
+        c = self.chunk_size
+        band = 1 << levels
+        for axis in range(3):
+            for sign in (-1, 1):
+                if local is not None and not (local[axis] >= c - band if sign > 0 else local[axis] < band):
+                    continue
+                n_key = list(key)
+                n_key[axis] += sign
+                neighbour = self.chunks.get(tuple(n_key))
+                if neighbour is not None:
+                    neighbour.version += 1
+
+    def filled_count(self):
+        """Liczba pełnych voxeli w świecie."""
+        return sum(chunk.count for chunk in self.chunks.values())
+
+    def nbytes(self):
+        """Pamięć zajmowana przez dane voxeli wszystkich chunków (w bajtach)."""
+        return sum(chunk.cells.nbytes for chunk in self.chunks.values())
@@ -1,4 +1,10 @@
 GRID_SIZE = 16 # liczba voxelów w każdej osi
 VOXEL_SIZE = 1.0 # rozmiar pojedynczego voxela w jednostkach świata
 YAW, PITCH, RADIUS = 45.0, 30.0, 40.0 # ustawienia początkowe kamery
-WIDTH, HEIGHT = 1000, 800 # rozmiar okna aplikacji
\ No newline at end of file
+WIDTH, HEIGHT = 1000, 800 # rozmiar okna aplikacji
+CHUNK_SIZE = 16 # liczba voxelów w każdej osi pojedynczego chunka
+
+MESH_UPLOAD_BUDGET = 4 * 1024 * 1024 # maksymalna liczba bajtów siatek wysyłanych na GPU w jednej klatce
+IDLE_WAIT_TIMEOUT = 0.25 # maksymalny czas oczekiwania na zdarzenia w trybie bezczynności (s)
+LOD_DISTANCE = 96.0 # odległość od kamery (w voxelach), od której chunki są rysowane z piramidy LOD
+LOD_HYSTERESIS = 0.15 # względna szerokość pasa wokół granic poziomów LOD, w którym poziom chunka się nie zmienia
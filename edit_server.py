@@ -0,0 +1,605 @@
+import asyncio
+import json
+import os
+import socket
+import stat
+import threading
+from collections import deque
+
+import numpy as np
+
+from autosave import chunk_keys_of
+from chunks import MAX_MATERIALS
+
+"""
+Lokalny serwer edycji: inne procesy (skrypty, generatory, narzędzia) wysyłają przez gniazdo
+(TCP na 127.0.0.1 albo gniazdo uniksowe) zlecenia edycji świata i dostają z powrotem potwierdzenia
+oraz powiadomienia o zmianach. Serwer działa w osobnym wątku z pętlą asyncio; zlecenia są tylko
+sprawdzane i kolejkowane, a stosuje je pętla renderowania na granicy klatki (apply): zapisy
+pojedynczych voxeli ze wszystkich zleceń klatki są łączone w jeden zapis write_cells, cała klatka
+trafia do dziennika jako jeden wpis, a renderer przebudowuje zmienione chunki raz.
+
+Protokół: każda wiadomość to jedna linia JSON zakończona znakiem nowej linii.
+    {"id": 1, "op": "set", "voxels": [[x, y, z], ...], "material": 2}     ("materials": [...] - materiał na voxel)
+    {"id": 2, "op": "clear", "voxels": [[x, y, z], ...]}
+    {"id": 3, "op": "material", "voxels": [[x, y, z], ...], "material": 1}    (zmienia materiał tylko pełnych voxeli)
+    {"id": 4, "op": "fill", "shape": "box", "a": [x, y, z], "b": [x, y, z], "material": 0}
+    {"id": 5, "op": "clear", "shape": "sphere", "center": [x, y, z], "radius": 5}
+    {"id": 6, "ops": [{"op": "set", ...}, {"op": "fill", "shape": "cylinder", "base": [...], "radius": 3, "height": 8, "axis": 1, ...}]}
+    {"id": 7, "op": "cells", "count": N}, a zaraz po linii N rekordów binarnych CELL_RECORD
+        (x, y, z int32 little-endian i wartość komórki uint8: 0 = pusto, materiał + 1)
+    {"id": 8, "op": "subscribe", "cells": true}     (powiadomienia o zmianach; "unsubscribe" je wyłącza)
+    {"id": 9, "op": "status"}
+Odpowiedź na zlecenie edycji przychodzi po jego zastosowaniu: {"id": 1, "ok": true, "version": v},
+a na błędne zlecenie od razu: {"id": 1, "ok": false, "error": "..."}. Powiadomienie o zmianie:
+{"event": "changed", "version": v, "count": n, "lo": [...], "hi": [...], "chunks": [[cx, cy, cz], ...]}
+(z "cells": [[x, y, z, wartość], ...] dla subskrybentów, którzy o to prosili, gdy zmian jest niewiele).
+
+Gdy w kolejce czeka więcej niż max_queued voxeli, serwer przestaje czytać od klientów do czasu,
+aż pętla renderowania opróżni kolejkę - klient zapisujący do gniazda zostaje wstrzymany przez TCP.
+Powiadomienia dla subskrybenta, który nie nadąża z odbiorem, są pomijane (liczba pominiętych
+trafia do kolejnego powiadomienia jako "dropped").
+
+Serwer nie uwierzytelnia klientów - powinien nasłuchiwać tylko na adresie lokalnym.
+"""
+
+EDIT_SERVER_HOST = "127.0.0.1"
+EDIT_SERVER_PORT = 7878
+MAX_QUEUED_VOXELS = 1024 * 1024            # voxele w kolejce, powyżej których serwer wstrzymuje odczyt od klientów
+APPLY_BUDGET = 64 * 1024                   # voxele stosowane w jednej klatce (reszta czeka na kolejną)
+MAX_LINE = 64 * 1024 * 1024                # maksymalna długość linii JSON w bajtach
+MAX_BINARY_CELLS = 16 * 1024 * 1024        # maksymalna liczba rekordów w jednym zleceniu binarnym
+NOTIFY_BUFFER_LIMIT = 4 * 1024 * 1024      # niewysłane bajty subskrybenta, powyżej których powiadomienia są pomijane
+NOTIFY_CELLS_LIMIT = 4096                  # maksymalna liczba komórek wypisywanych w powiadomieniu
+JOURNAL_LABEL = "edycja z serwera"
+COORD_LIMIT = 2 ** 31                      # współrzędne, promienie i wysokości zleceń mieszczą się w int32, jak w CELL_RECORD
+CELL_RECORD = np.dtype([("x", "<i4"), ("y", "<i4"), ("z", "<i4"), ("value", "u1")])
+SHAPES = ("box", "sphere", "cylinder")
+CONTROL_OPS = ("subscribe", "unsubscribe", "status")
+
+
+def parse_address(address):
+    """
+    Rozpoznaje adres serwera.
+
+    :param address: None (adres domyślny), numer portu, krotka (host, port) (np. EditServer.address), "host:port", "port"
+        lub ścieżka gniazda uniksowego (z "/").
+    :return: ("tcp", (host, port)) lub ("unix", ścieżka).
+    """
+    if address is None:
+        return "tcp", (EDIT_SERVER_HOST, EDIT_SERVER_PORT)
+    if isinstance(address, int):
+        return "tcp", (EDIT_SERVER_HOST, address)
+    if isinstance(address, tuple):
+        host, port = address
+        return "tcp", (host, int(port))
+    if os.sep in address or address.startswith("unix:"):
+        return "unix", address[5:] if address.startswith("unix:") else address
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or EDIT_SERVER_HOST, int(port))
+
+
+def _integers(value, name):
+    """Sprawdza, czy tablica zlecenia zawiera wyłącznie liczby całkowite w zakresie COORD_LIMIT, i zwraca ją jako int64."""
+    array = np.asarray(value)
+    if array.size == 0:
+        return array.astype(np.int64)
+    # liczby ułamkowe, logiczne, napisy i liczby spoza int64 (dtype object) są odrzucane, nie obcinane
+    if array.dtype.kind not in "iu":
+        raise ValueError(f"{name}: oczekiwano liczb całkowitych")
+    if array.min() < -COORD_LIMIT or array.max() >= COORD_LIMIT:
+        raise ValueError(f"{name}: wartość poza zakresem int32")
+    return array.astype(np.int64)
+
+
+def _coords(op):
+    """Współrzędne voxeli zlecenia jako tablica int64 (N, 3)."""
+    coords = _integers(op.get("voxels", []), "voxels")
+    if coords.size == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    if coords.ndim != 2 or coords.shape[1] != 3:
+        raise ValueError("voxels: oczekiwano listy [x, y, z]")
+    return coords
+
+
+def _material(value):
+    """Sprawdza identyfikator materiału i zwraca wartość komórki (materiał + 1)."""
+    if isinstance(value, bool) or not isinstance(value, int) or not 0 <= value < MAX_MATERIALS:
+        raise ValueError(f"Identyfikator materiału poza zakresem: {value!r}")
+    return value + 1
+
+
+def _integer(value, name):
+    """Sprawdza liczbę całkowitą zlecenia (w zakresie COORD_LIMIT)."""
+    if isinstance(value, bool) or not isinstance(value, int) or not -COORD_LIMIT <= value < COORD_LIMIT:
+        raise ValueError(f"{name}: oczekiwano liczby całkowitej w zakresie int32, otrzymano {value!r}")
+    return value
+
+
+def _radius(value):
+    """Sprawdza promień zlecenia: skończona liczba nieujemna w zakresie COORD_LIMIT."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value < COORD_LIMIT:
+        raise ValueError(f"radius: oczekiwano liczby nieujemnej w zakresie int32, otrzymano {value!r}")
+    return float(value)
+
+
+def _point(value, name):
+    """Sprawdza punkt [x, y, z] zlecenia."""
+    if not isinstance(value, (list, tuple)) or len(value) != 3:
+        raise ValueError(f"{name}: oczekiwano [x, y, z]")
+    return tuple(_integer(v, name) for v in value)
+
+
+def parse_op(op):
+    """
+    Sprawdza zlecenie edycji i zamienia je na postać stosowaną przez EditServer.apply.
+
+    :param dict op: Zlecenie z protokołu (patrz opis modułu).
+    :return: ("cells", coords, values), ("material", coords, wartość) lub ("fill", kształt, parametry, materiał lub None).
+    """
+    if not isinstance(op, dict):
+        raise ValueError("zlecenie musi być obiektem JSON")
+    kind = op.get("op")
+    if kind in ("fill", "clear") and "shape" in op:
+        shape = op["shape"]
+        if shape == "box":
+            params = (_point(op.get("a"), "a"), _point(op.get("b"), "b"))
+        elif shape == "sphere":
+            params = (_point(op.get("center"), "center"), _radius(op.get("radius")))
+        elif shape == "cylinder":
+            axis = op.get("axis", 1)
+            if isinstance(axis, bool) or axis not in (0, 1, 2):
+                raise ValueError(f"axis: oczekiwano 0, 1 lub 2, otrzymano {axis!r}")
+            params = (_point(op.get("base"), "base"), _radius(op.get("radius")), _integer(op.get("height"), "height"), int(axis))
+        else:
+            raise ValueError(f"Nieznany kształt: {shape!r} (dostępne: {', '.join(SHAPES)})")
+        material = _material(op.get("material")) - 1 if kind == "fill" else None
+        return "fill", shape, params, material
+    if kind == "set":
+        coords = _coords(op)
+        if "materials" in op:
+            values = _integers(op["materials"], "materials").reshape(-1)
+            if len(values) != len(coords):
+                raise ValueError("materials: liczba materiałów różni się od liczby voxeli")
+            if len(values) and not (0 <= values.min() and values.max() < MAX_MATERIALS):
+                raise ValueError("materials: identyfikator materiału poza zakresem")
+            return "cells", coords, (values + 1).astype(np.uint8)
+        return "cells", coords, np.full(len(coords), _material(op.get("material")), dtype=np.uint8)
+    if kind == "clear":
+        coords = _coords(op)
+        return "cells", coords, np.zeros(len(coords), dtype=np.uint8)
+    if kind == "material":
+        return "material", _coords(op), _material(op.get("material"))
+    if kind == "fill":
+        raise ValueError("fill: brak kształtu (shape)")
+    raise ValueError(f"Nieznana operacja: {kind!r}")
+
+
+def parse_cells(payload):
+    """
+    Dekoduje rekordy binarne CELL_RECORD zlecenia "cells".
+
+    :param bytes payload: N * CELL_RECORD.itemsize bajtów.
+    :return: ("cells", coords, values)
+    """
+    records = np.frombuffer(payload, dtype=CELL_RECORD)
+    coords = np.stack([records["x"], records["y"], records["z"]], axis=1).astype(np.int64)
+    return "cells", coords, records["value"].copy()
+
+
+def op_cost(op):
+    """Szacunkowa liczba voxeli, których dotyczy zlecenie (do ograniczania kolejki)."""
+    if op[0] != "fill":
+        return len(op[1])
+    shape, params = op[1], op[2]
+    if shape == "box":
+        return int(np.prod([abs(b - a) + 1 for a, b in zip(*params)], dtype=np.float64))
+    side = 2 * int(np.ceil(params[1])) + 1
+    return side ** 3 if shape == "sphere" else side * side * max(params[2], 0)
+
+
+"""Połączenie jednego klienta (używane tylko w wątku serwera)."""
+class _Session:
+    def __init__(self, writer):
+        self.writer = writer
+        self.closed = False
+        self.subscribed = False
+        self.cells = False                 # czy powiadomienia mają zawierać zmienione komórki
+        self.dropped = 0                   # powiadomienia pominięte od ostatniego wysłanego
+
+    def send(self, message):
+        """Wysyła jedną wiadomość JSON."""
+        if not self.closed:
+            self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+
+    def notify(self, event, cells):
+        """Wysyła powiadomienie, chyba że klient nie odbiera poprzednich."""
+        if self.closed or not self.subscribed:
+            return
+        if self.writer.transport.get_write_buffer_size() > NOTIFY_BUFFER_LIMIT:
+            self.dropped += 1
+            return
+        message = dict(event)
+        if self.cells and cells is not None:
+            message["cells"] = cells
+        if self.dropped:
+            message["dropped"], self.dropped = self.dropped, 0
+        self.send(message)
+
+
+"""
+Serwer edycji jednego świata. Wątek serwera tylko czyta i sprawdza zlecenia; świat jest zmieniany
+wyłącznie w apply, wywoływanej przez pętlę renderowania. Serwer ustawia on_change świata
+(przekazując zmiany dotychczasowemu obserwatorowi, np. autozapisowi), aby powiadamiać
+subskrybentów także o edycjach z interfejsu i cofnięciach.
+"""
+class EditServer:
+    def __init__(self, world, address=None, on_queued=None, max_queued=MAX_QUEUED_VOXELS, apply_budget=APPLY_BUDGET):
+        """
+        :param VoxelEditor world: Obiekt świata voxelowego.
+        :param address: Adres nasłuchu (patrz parse_address); port 0 wybiera wolny port.
+        :param on_queued: Funkcja wywoływana (z wątku serwera) po dodaniu zlecenia do kolejki, np. do wybudzenia pętli.
+        :param int max_queued: Liczba voxeli w kolejce, powyżej której odczyt od klientów jest wstrzymywany.
+        :param int apply_budget: Liczba voxeli stosowanych w jednej klatce.
+        """
+        self.world = world
+        self.kind, self.address = parse_address(address)
+        self.on_queued = on_queued
+        self.max_queued = max_queued
+        self.apply_budget = apply_budget
+        self.lock = threading.Lock()       # chroni batches i queued
+        self.batches = deque()             # (sesja, id, zlecenia, koszt) czekające na apply
+        self.queued = 0                    # voxele zleceń w kolejce
+        self.sessions = set()
+        self.subscribers = set()
+        self.error = None
+        self.closing = False               # serwer jest zatrzymywany
+
+        self.received = 0                  # przyjęte zlecenia (linie lub zlecenia binarne)
+        self.rejected = 0                  # zlecenia odrzucone jako błędne
+        self.applied = 0                   # zastosowane zlecenia
+        self.changed = 0                   # voxele zmienione przez zlecenia
+        self.stalls = 0                    # wstrzymania odczytu z powodu pełnej kolejki
+
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(ready,), name="edit-server", daemon=True)
+        self.thread.start()
+        ready.wait()
+        if self.error is not None:
+            self.thread.join()
+            raise self.error
+        self._forward = world.on_change
+        world.on_change = self._on_change
+
+    def pending(self):
+        """Sprawdza, czy w kolejce czekają zlecenia."""
+        return bool(self.batches)
+
+    def apply(self):
+        """
+        Stosuje zlecenia z kolejki (najwyżej apply_budget voxeli). Wywoływana na granicy klatki
+        przed synchronizacją renderera. Sąsiednie zapisy pojedynczych voxeli są łączone w jeden
+        write_cells, a wszystkie zmiany trafiają do dziennika jako jeden wpis.
+
+        :return: Liczba zastosowanych zleceń.
+        """
+        with self.lock:
+            taken, cost = [], 0
+            while self.batches and (not taken or cost + self.batches[0][3] <= self.apply_budget):
+                batch = self.batches.popleft()
+                taken.append(batch)
+                cost += batch[3]
+            self.queued -= cost
+        if not taken:
+            return 0
+        self.loop.call_soon_threadsafe(self.drained.set)
+
+        world = self.world
+        points = []                        # (coords, values) czekające na wspólny zapis
+        replies = []
+        with world.journal.group(JOURNAL_LABEL):
+            for session, request_id, ops, _ in taken:
+                for op in ops:
+                    if op[0] == "cells":
+                        points.append(op[1:])
+                        continue
+                    self._write_points(points)
+                    if op[0] == "material":
+                        coords = op[1]
+                        coords = coords[world.chunk_map.read_cells(coords) != 0]
+                        points.append((coords, np.full(len(coords), op[2], dtype=np.uint8)))
+                    else:
+                        self.changed += self._fill(op[1], op[2], op[3])
+                replies.append((session, request_id))
+            self._write_points(points)
+        self.applied += len(taken)
+        self.loop.call_soon_threadsafe(self._reply, replies, world.version)
+        return len(taken)
+
+    def _write_points(self, points):
+        """Zapisuje zebrane zapisy pojedynczych voxeli jednym write_cells i czyści listę."""
+        if points:
+            coords, values = (np.concatenate(a) for a in zip(*points))
+            self.changed += self.world.write_cells(coords, values, JOURNAL_LABEL)
+            points.clear()
+
+    def _fill(self, shape, params, material):
+        """Wypełnia (lub opróżnia, gdy material jest None) bryłę zlecenia."""
+        if shape == "box":
+            return self.world.fill_box(params[0], params[1], material)
+        if shape == "sphere":
+            return self.world.fill_sphere(params[0], params[1], material)
+        base, radius, height, axis = params
+        return self.world.fill_cylinder(base, radius, height, material, axis)
+
+    def _on_change(self, coords, values):
+        """Obserwator zmian świata: przekazuje zmianę dalej i zleca powiadomienie subskrybentów."""
+        if self._forward is not None:
+            self._forward(coords, values)
+        if not self.subscribers or len(coords) == 0:
+            return
+        event = {
+            "event": "changed",
+            "version": self.world.version,
+            "count": len(coords),
+            "lo": coords.min(axis=0).tolist(),
+            "hi": coords.max(axis=0).tolist(),
+            "chunks": [list(key) for key in chunk_keys_of(coords, self.world.chunk_map.chunk_size)],
+        }
+        cells = None
+        if len(coords) <= NOTIFY_CELLS_LIMIT and any(s.cells for s in list(self.subscribers)):
+            cells = np.column_stack([coords, values]).tolist()
+        self.loop.call_soon_threadsafe(self._broadcast, event, cells)
+
+    def status(self):
+        """Zwraca krótki opis stanu serwera do HUD."""
+        return (f"{self.describe()}, klienci: {len(self.sessions)}, w kolejce: {self.queued} voxeli, "
+                f"zlecenia: {self.applied}, wstrzymania: {self.stalls}")
+
+    def describe(self):
+        """Zwraca adres, na którym serwer nasłuchuje."""
+        if self.kind == "unix":
+            return self.address
+        return f"{self.address[0]}:{self.address[1]}"
+
+    def close(self):
+        """
+        Zatrzymuje serwer, zamyka połączenia i przywraca poprzedniego obserwatora zmian świata.
+        Zlecenia, które nie zostały jeszcze zastosowane, są odrzucane (klienci nie dostali potwierdzeń).
+        """
+        if self.world.on_change == self._on_change:
+            self.world.on_change = self._forward
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        if self.kind == "unix" and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def _run(self, ready):
+        """Wątek serwera: pętla asyncio obsługująca połączenia."""
+        loop = self.loop
+        asyncio.set_event_loop(loop)
+        try:
+            self.drained = asyncio.Event()     # ustawiane po opróżnieniu kolejki przez apply
+            server = loop.run_until_complete(self._listen())
+        except Exception as e:
+            self.error = e
+            ready.set()
+            loop.close()
+            return
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            # zamknięte połączenia kończą obsługę klientów (odczyt zwraca koniec danych)
+            self.closing = True
+            server.close()
+            for session in list(self.sessions):
+                session.closed = True
+                session.writer.close()
+            self.drained.set()
+            loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop), return_exceptions=True))
+            loop.run_until_complete(server.wait_closed())
+            loop.close()
+
+    async def _listen(self):
+        """Otwiera gniazdo nasłuchu."""
+        if self.kind == "unix":
+            if os.path.exists(self.address) and stat.S_ISSOCK(os.stat(self.address).st_mode):
+                os.unlink(self.address)    # gniazdo pozostałe po poprzednim uruchomieniu
+            return await asyncio.start_unix_server(self._serve, self.address, limit=MAX_LINE)
+        server = await asyncio.start_server(self._serve, *self.address, limit=MAX_LINE)
+        self.address = server.sockets[0].getsockname()[:2]
+        return server
+
+    async def _serve(self, reader, writer):
+        """Obsługuje jedno połączenie: czyta zlecenia, odpowiada na błędne i sterujące, resztę kolejkuje."""
+        session = _Session(writer)
+        self.sessions.add(session)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("wiadomość musi być obiektem JSON")
+                    request_id = request.get("id")
+                    kind = request.get("op")
+                    if kind == "cells":
+                        count = request.get("count")
+                        if not isinstance(count, int) or not 0 <= count <= MAX_BINARY_CELLS:
+                            # bez poprawnej liczby rekordów nie da się odnaleźć następnej linii
+                            session.send({"id": request_id, "ok": False, "error": f"count: niepoprawna liczba rekordów {count!r}"})
+                            break
+                        ops = [parse_cells(await reader.readexactly(count * CELL_RECORD.itemsize))]
+                    elif kind in CONTROL_OPS:
+                        self._control(session, request_id, kind, request)
+                        continue
+                    else:
+                        ops = [parse_op(op) for op in request.get("ops", [request])]
+                    cost = sum(op_cost(op) for op in ops)
+                except (ValueError, TypeError, KeyError, OverflowError) as e:
+                    self.rejected += 1
+                    session.send({"id": request_id, "ok": False, "error": str(e)})
+                    continue
+                await self._enqueue(session, request_id, ops, cost)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # zerwane połączenie, niepełne dane binarne albo linia dłuższa niż MAX_LINE
+            pass
+        finally:
+            session.closed = True
+            self.sessions.discard(session)
+            self.subscribers.discard(session)
+            writer.close()
+
+    def _control(self, session, request_id, kind, request):
+        """Obsługuje zlecenia sterujące od razu, bez kolejki."""
+        if kind == "subscribe":
+            session.subscribed, session.cells = True, bool(request.get("cells", False))
+            self.subscribers.add(session)
+        elif kind == "unsubscribe":
+            session.subscribed = False
+            self.subscribers.discard(session)
+        reply = {"id": request_id, "ok": True, "version": self.world.version}
+        if kind == "status":
+            reply.update(queued=self.queued, received=self.received, applied=self.applied, changed=self.changed,
+                         rejected=self.rejected, stalls=self.stalls, clients=len(self.sessions))
+        session.send(reply)
+
+    async def _enqueue(self, session, request_id, ops, cost):
+        """Dodaje zlecenie do kolejki, czekając, gdy kolejka jest pełna (zlecenie większe niż limit przechodzi przy pustej kolejce)."""
+        while not self.closing:
+            with self.lock:
+                if self.queued == 0 or self.queued + cost <= self.max_queued:
+                    self.batches.append((session, request_id, ops, cost))
+                    self.queued += cost
+                    break
+                self.drained.clear()
+            self.stalls += 1
+            await self.drained.wait()
+        else:
+            return
+        self.received += 1
+        if self.on_queued is not None:
+            self.on_queued()
+
+    def _reply(self, replies, version):
+        """Wysyła potwierdzenia zastosowanych zleceń."""
+        for session, request_id in replies:
+            session.send({"id": request_id, "ok": True, "version": version})
+
+    def _broadcast(self, event, cells):
+        """Wysyła powiadomienie o zmianie do subskrybentów."""
+        for session in list(self.subscribers):
+            session.notify(event, cells)
+
+
+"""
+Prosty blokujący klient serwera edycji do skryptów i testów. Powiadomienia odebrane
+w trakcie czekania na odpowiedź są odkładane i zwracane przez next_event.
+"""
+class EditClient:
+    def __init__(self, address=None, timeout=None):
+        """
+        :param address: Adres serwera (patrz parse_address).
+        :param float timeout: Limit czasu operacji na gnieździe w sekundach lub None.
+        """
+        kind, address = parse_address(address)
+        if kind == "unix":
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(address)
+        else:
+            self.sock = socket.create_connection(address, timeout=timeout)
+            self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.sock.makefile("rb")
+        self.next_id = 0
+        self.replies = {}                  # id -> odpowiedź odebrana przed wywołaniem wait
+        self.events = deque()              # powiadomienia czekające na next_event
+
+    def send(self, ops):
+        """
+        Wysyła zlecenie bez czekania na odpowiedź.
+
+        :param ops: Zlecenie (dict) lub lista zleceń tworzących jedno zlecenie zbiorcze.
+        :return: Identyfikator zlecenia (do wait).
+        """
+        self.next_id += 1
+        message = dict(ops) if isinstance(ops, dict) else {"ops": list(ops)}
+        message["id"] = self.next_id
+        self.sock.sendall(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        return self.next_id
+
+    def send_cells(self, coords, values):
+        """
+        Wysyła zapis komórek w postaci binarnej bez czekania na odpowiedź.
+
+        :param np.array coords: Współrzędne voxeli (N, 3).
+        :param np.array values: Wartości komórek (N,) (0 = pusto, materiał + 1).
+        :return: Identyfikator zlecenia.
+        """
+        coords = np.asarray(coords).reshape(-1, 3)
+        records = np.empty(len(coords), dtype=CELL_RECORD)
+        records["x"], records["y"], records["z"] = coords[:, 0], coords[:, 1], coords[:, 2]
+        records["value"] = values
+        self.next_id += 1
+        header = json.dumps({"id": self.next_id, "op": "cells", "count": len(records)}).encode() + b"\n"
+        self.sock.sendall(header + records.tobytes())
+        return self.next_id
+
+    def read(self):
+        """Odbiera następną wiadomość serwera (odpowiedź lub powiadomienie)."""
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Serwer edycji zamknął połączenie")
+        return json.loads(line)
+
+    def wait(self, request_id):
+        """
+        Czeka na odpowiedź na zlecenie.
+
+        :param int request_id: Identyfikator zlecenia (z send lub send_cells).
+        :return: Odpowiedź serwera (dict z "ok" i "version" albo "error").
+        """
+        while request_id not in self.replies:
+            message = self.read()
+            if "event" in message:
+                self.events.append(message)
+            else:
+                self.replies[message.get("id")] = message
+        return self.replies.pop(request_id)
+
+    def request(self, ops):
+        """
+        Wysyła zlecenie i czeka na jego zastosowanie.
+
+        :return: Odpowiedź serwera.
+        :raises ValueError: Gdy serwer odrzucił zlecenie.
+        """
+        reply = self.wait(self.send(ops))
+        if not reply.get("ok"):
+            raise ValueError(reply.get("error"))
+        return reply
+
+    def subscribe(self, cells=False):
+        """Włącza powiadomienia o zmianach świata (z listą komórek, gdy cells jest True)."""
+        return self.request({"op": "subscribe", "cells": cells})
+
+    def next_event(self):
+        """Zwraca następne powiadomienie o zmianie (czeka, jeśli żadne nie zostało jeszcze odebrane)."""
+        while not self.events:
+            message = self.read()
+            if "event" in message:
+                return message
+            self.replies[message.get("id")] = message
+        return self.events.popleft()
+
+    def close(self):
+        """Zamyka połączenie."""
+        self.file.close()
+        self.sock.close()
@@ -0,0 +1,209 @@
+import ctypes
+
+import OpenGL.GL as GL
+import numpy as np
+
+from meshing import FACE_DIRECTIONS
+from opengl_helpers import init_shaders, set_matrices
+from renderer import MODE_INSTANCED, MODE_MESHED
+
+"""
+Wybór voxeli na GPU. Osobny przebieg renderuje do pozaekranowego bufora całkowitoliczbowego
+(GL_RGBA32I) współrzędne voxela i indeks ściany każdego piksela. Odczyt odbywa się przez
+bufory PBO i jest odbierany w kolejnej klatce, gdy GPU zakończy kopiowanie, więc potok
+nie czeka na GPU. Koszt wyboru nie zależy od liczby voxeli, a ten sam bufor pozwala
+zaznaczyć wszystkie widoczne voxele w prostokącie ekranu.
+"""
+
+PICK_POINT = "point"                       # pojedynczy piksel pod kursorem
+PICK_RECT = "rect"                         # prostokąt zaznaczenia
+
+
+def decode_point(pixel):
+    """
+    Dekoduje piksel bufora wyboru.
+
+    :param np.array pixel: 4 liczby całkowite (x, y, z, indeks ściany + 1).
+    :return: (voxel, normal) lub (None, None), jeśli pod pikselem nie ma voxela.
+    """
+    x, y, z, face = (int(v) for v in pixel)
+    if face == 0:
+        return None, None
+    axis, sign, _, _ = FACE_DIRECTIONS[face - 1]
+    normal = [0, 0, 0]
+    normal[axis] = sign
+    return (x, y, z), tuple(normal)
+
+
+def decode_region(pixels):
+    """
+    Zwraca różne voxele widoczne w obszarze bufora wyboru.
+
+    :param np.array pixels: Tablica (H, W, 4) pikseli bufora wyboru.
+    :return: Tablica int64 (N, 3) współrzędnych voxeli.
+    """
+    ids = pixels.reshape(-1, 4)
+    ids = ids[ids[:, 3] != 0, :3].astype(np.int64)
+    if len(ids) == 0:
+        return np.zeros((0, 3), dtype=np.int64)
+    return np.unique(ids, axis=0)
+
+
+"""
+Przebieg wyboru: bufor ramki z teksturą identyfikatorów i buforem głębokości, programy
+dla obu trybów renderowania oraz kolejka asynchronicznych odczytów przez PBO.
+"""
+class GpuPicker:
+    def __init__(self, width, height):
+        self.programs = {
+            MODE_INSTANCED: init_shaders("shaders/pick.vert", "shaders/pick.frag"),
+            MODE_MESHED: init_shaders("shaders/pick_mesh.vert", "shaders/pick.frag"),
+        }
+        self.fbo = GL.glGenFramebuffers(1)
+        self.id_texture = GL.glGenTextures(1)
+        self.depth_rbo = GL.glGenRenderbuffers(1)
+        self.width = self.height = 0
+        self.resize(width, height)
+
+        self.free_pbos = []                # (pbo, pojemność w bajtach)
+        self.pending = []                  # [rodzaj, znacznik, fence, pbo, pojemność, szerokość, wysokość]
+
+    def resize(self, width, height):
+        """
+        Dopasowuje rozmiar bufora wyboru do rozmiaru okna.
+
+        :param int width: Szerokość w pikselach.
+        :param int height: Wysokość w pikselach.
+        """
+        width, height = max(width, 1), max(height, 1)
+        if (width, height) == (self.width, self.height):
+            return
+        self.width, self.height = width, height
+
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.id_texture)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA32I, width, height, 0, GL.GL_RGBA_INTEGER, GL.GL_INT, None)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.depth_rbo)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_DEPTH_COMPONENT24, width, height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.fbo)
+        GL.glFramebufferTexture2D(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_TEXTURE_2D, self.id_texture, 0)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_DEPTH_ATTACHMENT, GL.GL_RENDERBUFFER, self.depth_rbo)
+        status = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Niekompletny bufor ramki wyboru: {status}")
+
+    def render(self, renderer, world, camera):
+        """
+        Renderuje identyfikatory widocznych voxeli do bufora wyboru,
+        korzystając z buforów chunków bieżącego trybu renderera. W chunkach rysowanych z piramidy LOD
+        wynik jest przybliżony: wskazuje voxel narożny (instancje) lub voxel przy ścianie (siatki) grubej komórki,
+        który w rzeczywistej siatce może być pusty - wywołujący powinien to sprawdzić (read_cells) przed użyciem wyniku.
+
+        :param ChunkRenderer renderer: Renderer z zsynchronizowanymi buforami chunków.
+        :param VoxelEditor world: Obiekt świata voxelowego.
+        :param Camera camera: Kamera z aktualnymi macierzami.
+        """
+        program, loc_view, loc_proj, _, _, _, _, loc_chunk_origin, loc_voxel_size, loc_cell_scale = self.programs[renderer.mode]
+
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.fbo)
+        GL.glViewport(0, 0, self.width, self.height)
+        GL.glClearBufferiv(GL.GL_COLOR, 0, np.zeros(4, dtype=np.int32))
+        GL.glClear(GL.GL_DEPTH_BUFFER_BIT)
+
+        GL.glUseProgram(program)
+        set_matrices(loc_view, loc_proj, camera.view, camera.proj)
+        GL.glUniform1f(loc_voxel_size, world.voxel_size)
+        renderer.draw(world, loc_chunk_origin, camera.view_proj, camera.pos, loc_cell_scale)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+
+    def request_point(self, mouse_x, mouse_y, tag=None):
+        """
+        Zleca odczyt piksela pod kursorem. Wynik zwróci poll w jednej z kolejnych klatek.
+
+        :param float mouse_x: Pozycja myszy w pikselach (oś X).
+        :param float mouse_y: Pozycja myszy w pikselach (oś Y, od góry okna).
+        :param tag: Dowolny znacznik zwracany razem z wynikiem (np. do odrzucenia nieaktualnych wyników).
+        """
+        x = min(max(int(mouse_x), 0), self.width - 1)
+        y = min(max(self.height - 1 - int(mouse_y), 0), self.height - 1)
+        self._read_async(PICK_POINT, tag, x, y, 1, 1)
+
+    def request_rect(self, x0, y0, x1, y1, tag=None):
+        """
+        Zleca odczyt prostokąta ekranu (zaznaczenie). Wynik zwróci poll w jednej z kolejnych klatek.
+
+        :param float x0: Narożnik prostokąta (oś X).
+        :param float y0: Narożnik prostokąta (oś Y, od góry okna).
+        :param float x1: Przeciwległy narożnik (oś X).
+        :param float y1: Przeciwległy narożnik (oś Y, od góry okna).
+        :param tag: Dowolny znacznik zwracany razem z wynikiem.
+        """
+        left = min(max(int(min(x0, x1)), 0), self.width - 1)
+        right = min(max(int(max(x0, x1)), 0), self.width - 1)
+        top = min(max(self.height - 1 - int(min(y0, y1)), 0), self.height - 1)
+        bottom = min(max(self.height - 1 - int(max(y0, y1)), 0), self.height - 1)
+        self._read_async(PICK_RECT, tag, left, bottom, right - left + 1, top - bottom + 1)
+
+    def _read_async(self, kind, tag, x, y, width, height):
+        """Kopiuje obszar bufora wyboru do PBO i wstawia fence oznaczający koniec kopiowania."""
+        nbytes = width * height * 16
+        pbo, capacity = self.free_pbos.pop() if self.free_pbos else (GL.glGenBuffers(1), 0)
+
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self.fbo)
+        GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        if capacity < nbytes:
+            GL.glBufferData(GL.GL_PIXEL_PACK_BUFFER, nbytes, None, GL.GL_STREAM_READ)
+            capacity = nbytes
+        GL.glReadPixels(x, y, width, height, GL.GL_RGBA_INTEGER, GL.GL_INT, ctypes.c_void_p(0))
+        fence = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, 0)
+        self.pending.append([kind, tag, fence, pbo, capacity, width, height])
+
+    def busy(self):
+        """Sprawdza, czy są odczyty czekające na zakończenie."""
+        return bool(self.pending)
+
+    def poll(self):
+        """
+        Odbiera zakończone odczyty bez czekania na GPU.
+
+        :return: Lista krotek (rodzaj, znacznik, piksele (H, W, 4) int32) w kolejności zlecenia.
+        """
+        done = []
+        while self.pending:
+            kind, tag, fence, pbo, capacity, width, height = self.pending[0]
+            status = GL.glClientWaitSync(fence, 0, 0)
+            if status not in (GL.GL_ALREADY_SIGNALED, GL.GL_CONDITION_SATISFIED):
+                break
+            self.pending.pop(0)
+            GL.glDeleteSync(fence)
+
+            pixels = np.empty((height, width, 4), dtype=np.int32)
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+            GL.glGetBufferSubData(GL.GL_PIXEL_PACK_BUFFER, 0, pixels.nbytes, pixels)
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+            self.free_pbos.append((pbo, capacity))
+            done.append((kind, tag, pixels))
+        return done
+
+    def release(self):
+        """Zwalnia zasoby GPU przebiegu wyboru."""
+        for _, _, fence, pbo, _, _, _ in self.pending:
+            GL.glDeleteSync(fence)
+            GL.glDeleteBuffers(1, [pbo])
+        for pbo, _ in self.free_pbos:
+            GL.glDeleteBuffers(1, [pbo])
+        self.pending, self.free_pbos = [], []
+        GL.glDeleteFramebuffers(1, [self.fbo])
+        GL.glDeleteTextures(1, [self.id_texture])
+        GL.glDeleteRenderbuffers(1, [self.depth_rbo])
+        for program in self.programs.values():
+            GL.glDeleteProgram(program[0])
@@ -0,0 +1,166 @@
+import numpy as np
+
+"""
+Pula instancji voxeli. Każdy voxel ma stały slot w tablicy instancji,
+dzięki czemu edycja zmienia tylko pojedyncze sloty, a nie całą tablicę.
+
+Instancja to jedno słowo uint32: współrzędne voxela względem narożnika chunka
+(po 8 bitów na oś) i identyfikator materiału (8 bitów), rozpakowywane w voxel.vert.
+"""
+class InstancePool:
+    def __init__(self, origin, capacity=1024):
+        self.origin = origin
+        self.capacity = capacity
+        self.packed_buf = np.zeros((capacity,), dtype=np.uint32)
+        self._slot_of = {}                 # voxel -> slot (None = do odbudowania z packed_buf)
+        self._voxel_at = []                # slot -> voxel (None = do odbudowania z packed_buf)
+        self.count = 0
+        self.dirty = []                    # lista zakresów slotów [start, end) do wysłania na GPU
+        self.resized = True                # bufor GPU wymaga ponownej alokacji
+
+    @property
+    def packed(self):
+        """Widok na zajęte sloty (spakowane instancje uint32)."""
+        return self.packed_buf[:self.count]
+
+    @property
+    def slot_of(self):
+        """Słownik voxel -> slot, odbudowywany przy pierwszym użyciu po rebuild."""
+        if self._slot_of is None:
+            self._build_index()
+        return self._slot_of
+
+    @property
+    def indexed(self):
+        """Czy słownik slotów jest zbudowany (po rebuild jest tworzony dopiero przy pierwszej edycji)."""
+        return self._slot_of is not None
+
+    @property
+    def voxel_at(self):
+        """Lista voxeli kolejnych slotów, odbudowywana przy pierwszym użyciu po rebuild."""
+        if self._voxel_at is None:
+            self._build_index()
+        return self._voxel_at
+
+    def _build_index(self):
+        """Odbudowuje słownik slotów i listę voxeli na podstawie spakowanych instancji."""
+        self._voxel_at = list(map(tuple, self.coords.tolist()))
+        self._slot_of = dict(zip(self._voxel_at, range(self.count)))
+
+    @property
+    def coords(self):
+        """Współrzędne voxelowe zajętych slotów (count x 3)."""
+        packed = self.packed
+        local = np.stack([packed & 0xFF, (packed >> 8) & 0xFF, (packed >> 16) & 0xFF], axis=1)
+        return local.astype(np.int64) + np.array(self.origin, dtype=np.int64)
+
+    @property
+    def material_ids(self):
+        """Identyfikatory materiałów zajętych slotów."""
+        return (self.packed >> 24).astype(np.uint8)
+
+    def _pack(self, voxel, material_id):
+        """Pakuje voxel i materiał w jedno słowo uint32."""
+        ox, oy, oz = self.origin
+        return (voxel[0] - ox) | ((voxel[1] - oy) << 8) | ((voxel[2] - oz) << 16) | (int(material_id) << 24)
+
+    def _grow(self, needed):
+        """
+        Powiększa tablicę (podwajając pojemność), zachowując istniejące sloty.
+
+        :param int needed: Minimalna wymagana pojemność.
+        """
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        packed = np.zeros((capacity,), dtype=np.uint32)
+        packed[:self.count] = self.packed_buf[:self.count]
+        self.packed_buf = packed
+        self.capacity = capacity
+        self.resized = True
+
+    def _mark(self, slot):
+        """Oznacza slot jako zmieniony."""
+        if self.dirty and self.dirty[-1][1] == slot:
+            self.dirty[-1] = (self.dirty[-1][0], slot + 1)
+        else:
+            self.dirty.append((slot, slot + 1))
+
+    def set(self, voxel, material_id):
+        """
+        Dodaje voxel do puli lub zmienia materiał istniejącego voxela.
+
+        :param tuple voxel: Współrzędne voxela (x, y, z).
+        :param int material_id: Identyfikator materiału.
+        :return: Numer slotu voxela.
+        """
+        slot = self.slot_of.get(voxel)
+        if slot is None:
+            if self.count == self.capacity:
+                self._grow(self.count + 1)
+            slot = self.count
+            self.count += 1
+            self.slot_of[voxel] = slot
+            self.voxel_at.append(voxel)
+        self.packed_buf[slot] = self._pack(voxel, material_id)
+        self._mark(slot)
+        return slot
+
+    def remove(self, voxel):
+        """
+        Usuwa voxel z puli. Zwolniony slot jest wypełniany ostatnim slotem (swap-with-last),
+        więc zajęte sloty zawsze tworzą ciągły zakres [0, count).
+
+        :param tuple voxel: Współrzędne voxela (x, y, z).
+        :return: True jeśli voxel był w puli.
+        """
+        slot = self.slot_of.pop(voxel, None)
+        if slot is None:
+            return False
+
+        last = self.count - 1
+        moved = self.voxel_at.pop()
+        if slot != last:
+            self.packed_buf[slot] = self.packed_buf[last]
+            self.voxel_at[slot] = moved
+            self.slot_of[moved] = slot
+            self._mark(slot)
+        self.count = last
+        return True
+
+    def rebuild(self, coords, material_ids):
+        """
+        Wypełnia pulę od nowa (np. po wczytaniu świata lub operacji zbiorczej).
+        Słownik slotów jest odbudowywany dopiero przy kolejnej pojedynczej edycji,
+        więc przebudowa to wyłącznie operacje NumPy.
+
+        :param np.array coords: Tablica (N, 3) współrzędnych voxeli.
+        :param np.array material_ids: Tablica N identyfikatorów materiałów.
+        """
+        n = len(coords)
+        self.count = 0
+        if n > self.capacity:
+            self._grow(n)
+        local = (np.asarray(coords, dtype=np.int64) - np.array(self.origin, dtype=np.int64)).astype(np.uint32).reshape(-1, 3)
+        self.packed_buf[:n] = local[:, 0] | (local[:, 1] << 8) | (local[:, 2] << 16) | (np.asarray(material_ids, dtype=np.uint32) << 24)
+        self._voxel_at = self._slot_of = None
+        self.count = n
+        self.dirty = [(0, n)] if n > 0 else []
+
+    def take_dirty(self):
+        """
+        Zwraca scalone zakresy zmienionych slotów (obcięte do count) i czyści listę.
+
+        :return: Lista krotek (start, end).
+        """
+        ranges = []
+        for start, end in sorted(self.dirty):
+            end = min(end, self.count)
+            if start >= end:
+                continue
+            if ranges and start <= ranges[-1][1]:
+                ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+            else:
+                ranges.append((start, end))
+        self.dirty = []
+        return ranges
@@ -0,0 +1,224 @@
+import zlib
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from chunks import pack_keys, unpack_keys
+
+"""
+Dziennik edycji do cofania i ponawiania zmian. Każdy wpis przechowuje tylko zmienione komórki:
+współrzędne voxeli oraz starą i nową wartość komórki (0 = pusto, materiał + 1), a nie kopię świata.
+Operacje na wielu voxelach grupowane są w jeden wpis. Po przekroczeniu limitu pamięci najstarsze
+wpisy są najpierw kompresowane (zlib), a gdy to nie wystarcza - usuwane.
+"""
+
+JOURNAL_MAX_BYTES = 64 * 1024 * 1024      # domyślny limit pamięci dziennika
+COMPRESS_LEVEL = 1                         # poziom kompresji zlib starych wpisów (szybki)
+
+
+"""Wpis dziennika: zmienione komórki jednej operacji (jawnie lub w postaci skompresowanej)."""
+class JournalEntry:
+    __slots__ = ("label", "count", "coords", "old", "new", "packed")
+
+    def __init__(self, label, coords, old, new):
+        self.label = label
+        self.count = len(coords)
+        self.coords = coords               # (N, 3) int32 lub None po kompresji
+        self.old = old                     # (N,) uint8 lub None po kompresji
+        self.new = new                     # (N,) uint8 lub None po kompresji
+        self.packed = None                 # skompresowane tablice lub None
+
+    @property
+    def nbytes(self):
+        """Pamięć zajmowana przez dane wpisu (w bajtach)."""
+        if self.packed is not None:
+            return len(self.packed)
+        return self.coords.nbytes + self.old.nbytes + self.new.nbytes
+
+    def compress(self):
+        """
+        Kompresuje dane wpisu. Współrzędne są zamieniane na posortowane klucze zapisane różnicowo
+        (dla spójnych obszarów są to prawie same jedynki), co zlib kompresuje szybko i bardzo dobrze.
+
+        :return: Liczba zwolnionych bajtów.
+        """
+        if self.packed is not None:
+            return 0
+        before = self.nbytes
+        keys = pack_keys(self.coords)
+        order = np.argsort(keys, kind="stable")
+        deltas = np.diff(keys[order], prepend=np.int64(0))
+        raw = deltas.tobytes() + self.old[order].tobytes() + self.new[order].tobytes()
+        packed = zlib.compress(raw, COMPRESS_LEVEL)
+        if len(packed) >= before:
+            return 0
+        self.packed = packed
+        self.coords = self.old = self.new = None
+        return before - len(packed)
+
+    def arrays(self):
+        """
+        Zwraca dane wpisu, dekompresując je w razie potrzeby (wpis pozostaje skompresowany).
+
+        :return: (coords, old, new)
+        """
+        if self.packed is None:
+            return self.coords, self.old, self.new
+        raw = zlib.decompress(self.packed)
+        n = self.count
+        keys = np.cumsum(np.frombuffer(raw, dtype=np.int64, count=n))
+        old = np.frombuffer(raw, dtype=np.uint8, count=n, offset=n * 8)
+        new = np.frombuffer(raw, dtype=np.uint8, count=n, offset=n * 9)
+        return unpack_keys(keys), old, new
+
+
+def coalesce(coords, old, new):
+    """
+    Łączy zmiany tych samych voxeli: zostaje pierwsza stara i ostatnia nowa wartość,
+    a voxele, których wartość się nie zmieniła, są pomijane.
+
+    :param np.array coords: Współrzędne voxeli (N, 3).
+    :param np.array old: Stare wartości komórek (N,).
+    :param np.array new: Nowe wartości komórek (N,).
+    :return: (coords, old, new) bez powtórzeń.
+    """
+    # jeden klucz int64 na voxel: sortowanie 1D zamiast porównywania wierszy
+    keys = pack_keys(coords)
+    unique, first = np.unique(keys, return_index=True)
+    if len(unique) < len(coords):
+        _, last = np.unique(keys[::-1], return_index=True)
+        coords, old, new = coords[first], old[first], new[len(coords) - 1 - last]
+    changed = old != new
+    return coords[changed], old[changed], new[changed]
+
+
+"""
+Dziennik edycji z ograniczeniem pamięci. Zmiany rejestrowane poza grupą tworzą osobne wpisy,
+a zmiany w grupie (group) - jeden wpis. Nowa zmiana czyści listę ponowień.
+"""
+class EditJournal:
+    def __init__(self, max_bytes=JOURNAL_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.undo_stack = deque()          # wpisy od najstarszego
+        self.redo_stack = []
+        self.nbytes = 0                    # pamięć wszystkich wpisów obu stosów
+        self.group_depth = 0
+        self.group_label = None
+        self.group_parts = []              # (coords, old, new) zmian bieżącej grupy
+        self.evicted = 0                   # liczba wpisów usuniętych z powodu limitu pamięci
+
+    @contextmanager
+    def group(self, label):
+        """
+        Grupuje wszystkie zmiany zarejestrowane w bloku with w jeden wpis (grupy mogą być zagnieżdżone).
+
+        :param str label: Opis operacji.
+        """
+        if self.group_depth == 0:
+            self.group_label = label
+        self.group_depth += 1
+        try:
+            yield self
+        finally:
+            self.group_depth -= 1
+            if self.group_depth == 0:
+                parts, self.group_parts = self.group_parts, []
+                if parts:
+                    coords, old, new = (np.concatenate(a) for a in zip(*parts))
+                    self._push(self.group_label, coords, old, new)
+
+    def record(self, voxel, old, new, label="edycja"):
+        """
+        Rejestruje zmianę jednej komórki.
+
+        :param voxel: Współrzędne voxela (x, y, z).
+        :param int old: Stara wartość komórki (0 = pusto, materiał + 1).
+        :param int new: Nowa wartość komórki.
+        :param str label: Opis operacji (używany poza grupą).
+        """
+        if old == new:
+            return
+        self.record_many(np.array([voxel], dtype=np.int32), np.array([old], dtype=np.uint8), np.array([new], dtype=np.uint8), label)
+
+    def record_many(self, coords, old, new, label="edycja"):
+        """
+        Rejestruje zmiany wielu komórek.
+
+        :param np.array coords: Współrzędne voxeli (N, 3).
+        :param np.array old: Stare wartości komórek (N,).
+        :param np.array new: Nowe wartości komórek (N,).
+        :param str label: Opis operacji (używany poza grupą).
+        """
+        coords = np.asarray(coords, dtype=np.int32).reshape(-1, 3)
+        old = np.asarray(old, dtype=np.uint8).reshape(-1)
+        new = np.asarray(new, dtype=np.uint8).reshape(-1)
+        if len(coords) == 0:
+            return
+        if self.group_depth > 0:
+            self.group_parts.append((coords, old, new))
+        else:
+            self._push(label, coords, old, new)
+
+    def _push(self, label, coords, old, new):
+        """Dodaje wpis na stos cofnięć, czyści stos ponowień i pilnuje limitu pamięci."""
+        coords, old, new = coalesce(coords, old, new)
+        if len(coords) == 0:
+            return
+        for entry in self.redo_stack:
+            self.nbytes -= entry.nbytes
+        self.redo_stack = []
+        entry = JournalEntry(label, np.ascontiguousarray(coords), np.ascontiguousarray(old), np.ascontiguousarray(new))
+        self.undo_stack.append(entry)
+        self.nbytes += entry.nbytes
+        self._enforce_limit()
+
+    def _enforce_limit(self):
+        """Kompresuje najstarsze wpisy, a jeśli to nie wystarcza, usuwa je (najnowszy wpis zostaje zawsze)."""
+        for entry in self.undo_stack:
+            if self.nbytes <= self.max_bytes:
+                return
+            self.nbytes -= entry.compress()
+        while self.nbytes > self.max_bytes and len(self.undo_stack) > 1:
+            self.nbytes -= self.undo_stack.popleft().nbytes
+            self.evicted += 1
+
+    def can_undo(self):
+        """Sprawdza, czy jest wpis do cofnięcia."""
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        """Sprawdza, czy jest wpis do ponowienia."""
+        return bool(self.redo_stack)
+
+    def take_undo(self):
+        """
+        Zdejmuje najnowszy wpis do cofnięcia i przenosi go na stos ponowień.
+
+        :return: (coords, wartości do zapisania) lub None, jeśli nie ma czego cofać.
+        """
+        if not self.undo_stack or self.group_depth > 0:
+            return None
+        entry = self.undo_stack.pop()
+        self.redo_stack.append(entry)
+        coords, old, _ = entry.arrays()
+        return coords, old
+
+    def take_redo(self):
+        """
+        Zdejmuje ostatnio cofnięty wpis i przenosi go z powrotem na stos cofnięć.
+
+        :return: (coords, wartości do zapisania) lub None, jeśli nie ma czego ponawiać.
+        """
+        if not self.redo_stack or self.group_depth > 0:
+            return None
+        entry = self.redo_stack.pop()
+        self.undo_stack.append(entry)
+        coords, _, new = entry.arrays()
+        return coords, new
+
+    def clear(self):
+        """Usuwa całą historię."""
+        self.undo_stack.clear()
+        self.redo_stack = []
+        self.nbytes = 0
@@ -0,0 +1,139 @@
+import numpy as np
+
+from constants import LOD_DISTANCE, LOD_HYSTERESIS
+
+"""
+Piramida poziomów szczegółowości (LOD) komórek chunka, na wzór mipmap tekstur.
+
+Poziom 0 to komórki chunka, a każda komórka poziomu l obejmuje blok 2 x 2 x 2 komórek poziomu l - 1.
+Gruba komórka jest pełna, gdy w bloku jest co najmniej LOD_FILL_THRESHOLD pełnych komórek, i ma wtedy
+materiał najczęstszy w bloku (przy remisie - pierwszy w kolejności komórek bloku). Chunk o boku 16
+ma poziomy 8³, 4³, 2³ i 1³. Piramida jest budowana przy pierwszym użyciu, a potem aktualizowana
+przy każdej edycji voxela wzdłuż jednej ścieżki bloków (patrz update_pyramid).
+
+Renderer wybiera poziom osobno dla każdego chunka na podstawie odległości od kamery: poziom l
+obejmuje odległości [LOD_DISTANCE * 2^(l-1), LOD_DISTANCE * 2^l) voxeli, więc gruba komórka
+zajmuje na ekranie mniej więcej tyle samo pikseli co voxel chunka rysowanego w pełnej rozdzielczości.
+"""
+
+LOD_FILL_THRESHOLD = 4                     # minimalna liczba pełnych komórek bloku 2³, przy której gruba komórka jest pełna
+
+
+def max_lod_level(size):
+    """
+    Zwraca najwyższy poziom piramidy chunka (liczbę kolejnych podziałów boku przez 2).
+
+    :param int size: Rozmiar chunka.
+    :return: Numer najwyższego poziomu.
+    """
+    level = 0
+    while size % 2 == 0 and size > 1:
+        size //= 2
+        level += 1
+    return level
+
+
+def downsample(cells, threshold=LOD_FILL_THRESHOLD):
+    """
+    Zmniejsza tablicę komórek dwukrotnie w każdej osi (2 x 2 x 2 -> 1).
+
+    :param np.array cells: Komórki (N, N, N) uint8 (0 = pusto, materiał + 1), N parzyste.
+    :param int threshold: Minimalna liczba pełnych komórek bloku (1..8), przy której wynik jest pełny.
+    :return: Tablica uint8 (N/2, N/2, N/2).
+    """
+    n = cells.shape[0] // 2
+    blocks = cells.reshape(n, 2, n, 2, n, 2).transpose(0, 2, 4, 1, 3, 5).reshape(-1, 8)
+    filled = np.count_nonzero(blocks, axis=1)
+    # głosy: ile komórek bloku ma tę samą wartość co dana komórka (puste nie głosują)
+    votes = (blocks[:, :, None] == blocks[:, None, :]).sum(axis=2)
+    votes[blocks == 0] = 0
+    dominant = blocks[np.arange(len(blocks)), votes.argmax(axis=1)]
+    return np.where(filled >= threshold, dominant, 0).astype(np.uint8).reshape(n, n, n)
+
+
+def build_pyramid(cells, threshold=LOD_FILL_THRESHOLD):
+    """
+    Buduje wszystkie poziomy piramidy nad komórkami chunka.
+
+    :param np.array cells: Komórki chunka (C, C, C) uint8.
+    :param int threshold: Próg zajętości bloku (patrz downsample).
+    :return: Lista tablic kolejnych poziomów (od 1 do max_lod_level(C)).
+    """
+    levels = []
+    for _ in range(max_lod_level(cells.shape[0])):
+        cells = downsample(cells, threshold)
+        levels.append(cells)
+    return levels
+
+
+def update_pyramid(levels, cells, local, threshold=LOD_FILL_THRESHOLD):
+    """
+    Przelicza komórki piramidy nad zmienionym voxelem, po jednej na poziom. Gdy komórka
+    poziomu się nie zmieni, wyższe poziomy też pozostają bez zmian i przeliczanie się kończy.
+
+    :param list levels: Poziomy piramidy (wynik build_pyramid), modyfikowane w miejscu.
+    :param np.array cells: Komórki chunka (już po zmianie).
+    :param tuple local: Lokalne współrzędne zmienionego voxela.
+    :param int threshold: Próg zajętości bloku (patrz downsample).
+    :return: Liczba zmienionych poziomów (zmienione są poziomy 1 .. wynik).
+    """
+    x, y, z = local
+    finer = cells
+    changed = 0
+    for level in levels:
+        x, y, z = x >> 1, y >> 1, z >> 1
+        value = downsample(finer[2 * x:2 * x + 2, 2 * y:2 * y + 2, 2 * z:2 * z + 2], threshold)[0, 0, 0]
+        if level[x, y, z] == value:
+            break
+        level[x, y, z] = value
+        finer = level
+        changed += 1
+    return changed
+
+
+def lod_instances(cells):
+    """
+    Pakuje pełne komórki poziomu piramidy w słowa instancji (jak InstancePool: x, y, z
+    względem narożnika chunka i materiał, po 8 bitów). Współrzędne są w komórkach poziomu,
+    a shader mnoży je przez bok komórki.
+
+    :param np.array cells: Komórki poziomu (N, N, N) uint8.
+    :return: Tablica uint32 (M,).
+    """
+    local = np.argwhere(cells != 0).astype(np.uint32)
+    materials = cells[cells != 0].astype(np.uint32) - 1
+    return local[:, 0] | (local[:, 1] << 8) | (local[:, 2] << 16) | (materials << 24)
+
+
+def lod_level_for(distances, max_level, base=LOD_DISTANCE):
+    """
+    Zwraca poziomy dla odległości bez histerezy: 0 poniżej base, a dalej o jeden więcej
+    przy każdym podwojeniu odległości.
+
+    :param np.array distances: Odległości w voxelach.
+    :param int max_level: Najwyższy dostępny poziom.
+    :param float base: Odległość, od której zaczyna się poziom 1.
+    :return: Tablica int poziomów.
+    """
+    d = np.asarray(distances, dtype=np.float64)
+    levels = np.where(d < base, 0, np.floor(np.log2(np.maximum(d, base) / base)) + 1)
+    return np.clip(levels, 0, max_level).astype(np.int64)
+
+
+def choose_lod_levels(distances, current, max_level, base=LOD_DISTANCE, hysteresis=LOD_HYSTERESIS):
+    """
+    Wybiera poziomy chunków z histerezą: poziom zmienia się dopiero, gdy odległość przekroczy
+    granicę poziomów o więcej niż ułamek hysteresis, więc kamera stojąca blisko granicy
+    nie przełącza chunka tam i z powrotem w kolejnych klatkach.
+
+    :param np.array distances: Odległości chunków od kamery w voxelach.
+    :param np.array current: Dotychczasowe poziomy chunków.
+    :param int max_level: Najwyższy dostępny poziom.
+    :param float base: Odległość, od której zaczyna się poziom 1.
+    :param float hysteresis: Względna szerokość pasa wokół granic poziomów (0..1).
+    :return: Tablica int nowych poziomów.
+    """
+    d = np.asarray(distances, dtype=np.float64)
+    coarsest = lod_level_for(d / (1.0 - hysteresis), max_level, base)
+    finest = lod_level_for(d / (1.0 + hysteresis), max_level, base)
+    return np.clip(np.asarray(current, dtype=np.int64), finest, coarsest)
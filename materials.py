@@ -0,0 +1,133 @@
+import hashlib
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from chunks import MAX_MATERIALS
+
+"""
+Materiały voxeli: tekstury wczytywane do jednej tablicy tekstur (jedna warstwa na materiał)
+oraz tabela właściwości materiałów wysyłana do bufora uniformów.
+
+Dekodowanie JPEG i budowa mipmap odbywa się równolegle w puli wątków, a wynik trafia
+do pamięci podręcznej na dysku (klucz: skrót zawartości pliku i rozmiar tekstury),
+dzięki czemu kolejne uruchomienia wczytują gotowe poziomy mipmap bez dekodowania.
+"""
+
+TEXTURE_SIZE = 256                         # rozmiar warstwy tablicy tekstur (potęga dwójki)
+CACHE_DIR = ".texture_cache"
+CACHE_VERSION = 1                          # zmiana formatu pamięci podręcznej unieważnia stare pliki
+
+# nazwa, plik tekstury, (r, g, b) odcień, (oświetlenie otoczenia, rozproszone)
+MATERIALS = [
+    ("drewno", "Textures/wood_texture.jpg", (1.0, 1.0, 1.0), (0.6, 0.75)),
+    ("trawa", "Textures/grass.jpg", (1.0, 1.0, 1.0), (0.6, 0.75)),
+    ("kamień", "Textures/stone.jpg", (1.0, 1.0, 1.0), (0.6, 0.75)),
+    ("piasek", "Textures/sand.jpg", (1.0, 1.0, 1.0), (0.6, 0.75)),
+    ("liście", "Textures/leaves.jpg", (1.0, 1.0, 1.0), (0.6, 0.75)),
+]
+
+
+def material_table(materials=MATERIALS):
+    """
+    Buduje tabelę właściwości materiałów w układzie std140 bloku Materials z voxel.frag:
+    tablica odcieni (vec4), a po niej tablica parametrów oświetlenia (vec4), po MAX_MATERIALS elementów.
+
+    :param list materials: Lista materiałów jak w MATERIALS.
+    :return: Tablica float32 (2 * MAX_MATERIALS, 4).
+    """
+    if len(materials) > MAX_MATERIALS:
+        raise ValueError(f"Zbyt wiele materiałów: {len(materials)} (maksymalnie {MAX_MATERIALS})")
+    table = np.zeros((2 * MAX_MATERIALS, 4), dtype=np.float32)
+    for i, (_, _, tint, (ambient, diffuse)) in enumerate(materials):
+        table[i] = (*tint, 1.0)
+        table[MAX_MATERIALS + i] = (ambient, diffuse, 0.0, 0.0)
+    return table
+
+
+def build_mipmaps(image):
+    """
+    Buduje łańcuch mipmap filtrem uśredniającym 2x2.
+
+    :param np.array image: Obraz RGBA (S, S, 4) uint8, S będące potęgą dwójki.
+    :return: Lista poziomów od największego do 1x1.
+    """
+    levels = [image]
+    while levels[-1].shape[0] > 1:
+        a = levels[-1].astype(np.uint16)
+        level = (a[0::2, 0::2] + a[1::2, 0::2] + a[0::2, 1::2] + a[1::2, 1::2] + 2) // 4
+        levels.append(level.astype(np.uint8))
+    return levels
+
+
+def _cache_path(data, size, cache_dir):
+    """Zwraca ścieżkę pliku pamięci podręcznej dla zawartości pliku tekstury."""
+    digest = hashlib.sha1(data).hexdigest()
+    return os.path.join(cache_dir, f"{digest}_{size}_v{CACHE_VERSION}.npz")
+
+
+def decode_texture(path, size=TEXTURE_SIZE, cache_dir=CACHE_DIR):
+    """
+    Wczytuje teksturę jako łańcuch mipmap, korzystając z pamięci podręcznej na dysku.
+
+    :param str path: Ścieżka do pliku tekstury.
+    :param int size: Rozmiar warstwy (obraz jest skalowany do size x size).
+    :param str cache_dir: Katalog pamięci podręcznej lub None (bez pamięci podręcznej).
+    :return: (lista poziomów mipmap, True jeśli wczytano z pamięci podręcznej)
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    cache_path = _cache_path(data, size, cache_dir) if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, "rb") as f, np.load(f) as cached:
+                return [cached[f"level{i}"] for i in range(len(cached.files))], True
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile):
+            pass                           # uszkodzony plik: tekstura jest dekodowana na nowo i plik nadpisywany
+
+    img = Image.open(path).convert("RGBA")
+    img = img.transpose(Image.FLIP_TOP_BOTTOM)
+    if img.size != (size, size):
+        img = img.resize((size, size), Image.LANCZOS)
+    levels = build_mipmaps(np.asarray(img, dtype=np.uint8))
+
+    if cache_path:
+        os.makedirs(cache_dir, exist_ok=True)
+        # zapis do unikalnego pliku tymczasowego i podmiana, aby przerwany lub równoległy zapis
+        # nie zostawił uszkodzonego pliku
+        fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **{f"level{i}": level for i, level in enumerate(levels)})
+            os.replace(tmp_path, cache_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return levels, False
+
+
+def load_material_layers(materials=MATERIALS, size=TEXTURE_SIZE, cache_dir=CACHE_DIR, max_workers=None):
+    """
+    Wczytuje tekstury wszystkich materiałów równolegle i składa je w poziomy tablicy tekstur.
+    Każdy plik tekstury jest dekodowany raz, także gdy korzysta z niego kilka materiałów (np. z różnymi odcieniami).
+
+    :param list materials: Lista materiałów jak w MATERIALS.
+    :param int size: Rozmiar warstwy.
+    :param str cache_dir: Katalog pamięci podręcznej lub None.
+    :param int max_workers: Liczba wątków (None = domyślna).
+    :return: (lista poziomów (warstwy, S, S, 4) uint8, liczba plików tekstur wczytanych z pamięci podręcznej)
+    """
+    paths = [path for _, path, _, _ in materials]
+    unique = list(dict.fromkeys(paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        decoded = dict(zip(unique, executor.map(lambda p: decode_texture(p, size, cache_dir), unique)))
+
+    hits = sum(1 for _, cached in decoded.values() if cached)
+    results = [decoded[path][0] for path in paths]
+    levels = [np.stack([layers[i] for layers in results]) for i in range(len(results[0]))]
+    return levels, hits
@@ -0,0 +1,80 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from meshing import build_chunk_mesh
+
+"""
+Planista budowy siatek chunków w tle. Zadania trafiają do puli wątków (lub procesów),
+a gotowe tablice wierzchołków są odbierane przez pętlę renderowania na granicy klatki.
+Na klucz chunka przypada co najwyżej jedno zadanie w toku; wynik jest oznaczony wersją
+chunka, z której powstał, dzięki czemu wyniki nieaktualne można odrzucić.
+"""
+class MeshScheduler:
+    def __init__(self, max_workers=None, use_processes=False, on_done=None):
+        executor = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        self.executor = executor(max_workers=max_workers)
+        self.on_done = on_done             # wywoływana (z wątku puli) po zakończeniu zadania, np. do wybudzenia pętli
+        self.in_flight = {}                # klucz chunka -> (wersja, future)
+        self.ready = {}                    # klucz chunka -> (wersja, wierzchołki)
+
+    def busy(self, key):
+        """Sprawdza, czy dla chunka trwa budowa siatki."""
+        return key in self.in_flight
+
+    def pending(self):
+        """Sprawdza, czy są zadania w toku lub wyniki czekające na odbiór."""
+        return bool(self.in_flight) or bool(self.ready)
+
+    def has_ready(self):
+        """Sprawdza, czy są zakończone zadania, których wyniki czekają na odbiór."""
+        self.collect()
+        return bool(self.ready)
+
+    def submit(self, key, version, cells):
+        """
+        Zleca budowę siatki chunka.
+
+        :param tuple key: Klucz chunka.
+        :param version: Wersja komórek (np. wersja chunka i poziom LOD), przekazywana do is_current przy odbiorze.
+        :param np.array cells: Kopia komórek chunka z obramowaniem ((C+2)³).
+        """
+        future = self.executor.submit(build_chunk_mesh, cells)
+        self.in_flight[key] = (version, future)
+        if self.on_done is not None:
+            future.add_done_callback(lambda _: self.on_done())
+
+    def collect(self):
+        """Przenosi zakończone zadania do wyników gotowych do wysłania (nowszy wynik zastępuje starszy)."""
+        for key in [k for k, (_, f) in self.in_flight.items() if f.done()]:
+            version, future = self.in_flight.pop(key)
+            self.ready[key] = (version, future.result())
+
+    def take_ready(self, is_current, budget_bytes):
+        """
+        Zwraca gotowe wyniki mieszczące się w budżecie bajtów na klatkę. Wyniki, dla których
+        is_current zwraca False (chunk zmienił się lub zniknął w trakcie budowy), są odrzucane.
+        Pierwszy wynik jest zwracany zawsze, aby duże siatki nie blokowały kolejki.
+
+        :param is_current: Funkcja (klucz, wersja) -> bool.
+        :param int budget_bytes: Limit bajtów do wysłania w tej klatce.
+        :return: Lista krotek (klucz, wersja, wierzchołki).
+        """
+        self.collect()
+        taken = []
+        used = 0
+        for key in list(self.ready):
+            version, vertices = self.ready[key]
+            if not is_current(key, version):
+                del self.ready[key]
+                continue
+            if taken and used + vertices.nbytes > budget_bytes:
+                break
+            del self.ready[key]
+            taken.append((key, version, vertices))
+            used += vertices.nbytes
+        return taken
+
+    def shutdown(self):
+        """Zatrzymuje pulę, porzucając zadania, które jeszcze się nie rozpoczęły."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.in_flight.clear()
+        self.ready.clear()
@@ -0,0 +1,136 @@
+import numpy as np
+
+"""
+Budowanie siatek chunków: usuwanie zasłoniętych ścian i łączenie współpłaszczyznowych
+ścian o tym samym materiale w większe prostokąty (greedy meshing).
+
+Wejściem jest tablica komórek chunka z obramowaniem o grubości 1 voxela
+((C+2)³, 0 = pusto, w przeciwnym razie materiał + 1), dzięki czemu ściany
+na granicy chunka są testowane względem sąsiednich chunków.
+
+Wierzchołek to jedno słowo uint32: pozycja względem narożnika chunka (po 5 bitów na oś),
+indeks ściany w FACE_DIRECTIONS (3 bity) i materiał (8 bitów). Normalną i współrzędne
+tekstury odtwarza voxel_mesh.vert.
+"""
+
+MAX_MESH_CHUNK_SIZE = 31                   # pozycje 0..C muszą się zmieścić w 5 bitach
+
+# (oś normalnej, znak, oś u, oś v) - u x v ma zwrot osi normalnej
+FACE_DIRECTIONS = [
+    (0, 1, 1, 2), (0, -1, 1, 2),
+    (1, 1, 2, 0), (1, -1, 2, 0),
+    (2, 1, 0, 1), (2, -1, 0, 1),
+]
+U_AXIS = np.array([1, 2, 0])
+V_AXIS = np.array([2, 0, 1])
+
+
+def exposed_faces(cells):
+    """
+    Wyznacza odsłonięte ściany pełnych voxeli wektorowym testem sąsiadów.
+
+    :param np.array cells: Tablica komórek z obramowaniem ((C+2)³).
+    :return: Lista 6 tablic (C³) materiałów odsłoniętych ścian (0 = brak ściany), w kolejności FACE_DIRECTIONS.
+    """
+    filled = cells != 0
+    inner = cells[1:-1, 1:-1, 1:-1]
+    faces = []
+    for axis, sign, _, _ in FACE_DIRECTIONS:
+        idx = [slice(1, -1)] * 3
+        idx[axis] = slice(1 + sign, cells.shape[axis] - 1 + sign)
+        neighbour = filled[tuple(idx)]
+        faces.append(np.where(neighbour, 0, inner))
+    return faces
+
+
+def _greedy_rects(mask):
+    """
+    Dzieli dwuwymiarową maskę materiałów na prostokąty o jednolitym materiale.
+
+    :param np.array mask: Tablica 2D materiałów (0 = brak ściany).
+    :return: Lista krotek (i, j, w, h, materiał), gdzie i, j to indeksy w osiach u, v.
+    """
+    mask = mask.copy()
+    rects = []
+    n_u, n_v = mask.shape
+    for j in range(n_v):
+        row = mask[:, j]
+        i = 0
+        while i < n_u:
+            mat = row[i]
+            if mat == 0:
+                i += 1
+                continue
+            w = 1
+            while i + w < n_u and row[i + w] == mat:
+                w += 1
+            h = 1
+            while j + h < n_v and (mask[i:i + w, j + h] == mat).all():
+                h += 1
+            mask[i:i + w, j:j + h] = 0
+            rects.append((i, j, w, h, mat))
+            i += w
+    return rects
+
+
+def build_chunk_mesh(cells, greedy=True):
+    """
+    Buduje siatkę trójkątów chunka złożoną wyłącznie z odsłoniętych ścian.
+
+    :param np.array cells: Tablica komórek z obramowaniem ((C+2)³).
+    :param bool greedy: Czy łączyć sąsiednie ściany w większe prostokąty.
+    :return: Tablica uint32 (N,) spakowanych wierzchołków, po 6 na prostokąt.
+    """
+    if cells.shape[0] - 2 > MAX_MESH_CHUNK_SIZE:
+        raise ValueError(f"Rozmiar chunka przekracza {MAX_MESH_CHUNK_SIZE} voxeli")
+
+    quads = []                             # (oś, znak, warstwa, i, j, w, h, materiał)
+    for face, (axis, sign, u_axis, v_axis) in zip(exposed_faces(cells), FACE_DIRECTIONS):
+        if not face.any():
+            continue
+        # przestawienie osi tak, by indeksy były kolejno: warstwa, u, v
+        layers = np.transpose(face, (axis, u_axis, v_axis))
+        if greedy:
+            for d in np.flatnonzero(layers.reshape(layers.shape[0], -1).any(axis=1)):
+                for i, j, w, h, mat in _greedy_rects(layers[d]):
+                    quads.append((axis, sign, d, i, j, w, h, mat))
+        else:
+            d, i, j = np.nonzero(layers)
+            for q in zip(d, i, j, layers[d, i, j]):
+                quads.append((axis, sign, q[0], q[1], q[2], 1, 1, q[3]))
+
+    if not quads:
+        return np.zeros((0,), dtype=np.uint32)
+    return _quads_to_vertices(np.array(quads, dtype=np.int64))
+
+
+def _quads_to_vertices(quads):
+    """
+    Zamienia prostokąty na spakowane wierzchołki trójkątów (wektorowo dla wszystkich prostokątów).
+
+    :param np.array quads: Tablica (Q, 8) prostokątów (oś, znak, warstwa, i, j, w, h, materiał).
+    :return: Tablica uint32 (Q * 6,).
+    """
+    axis, sign, d, i, j, w, h, mat = quads.T
+    n = len(quads)
+    u_axis = U_AXIS[axis]
+    v_axis = V_AXIS[axis]
+
+    # narożniki prostokąta w kolejności przeciwnej do ruchu wskazówek zegara patrząc od strony normalnej
+    corner_u = np.array([0, 1, 1, 0, 1, 0])
+    corner_v = np.array([0, 0, 1, 0, 1, 1])
+    flip = sign < 0
+    cu = np.where(flip[:, None], corner_v[None, :], corner_u[None, :])
+    cv = np.where(flip[:, None], corner_u[None, :], corner_v[None, :])
+
+    pos = np.zeros((n, 6, 3), dtype=np.uint32)
+    rows = np.arange(n)[:, None]
+    cols = np.arange(6)[None, :]
+    pos[rows, cols, axis[:, None]] = (d + (sign > 0))[:, None]
+    pos[rows, cols, u_axis[:, None]] = i[:, None] + cu * w[:, None]
+    pos[rows, cols, v_axis[:, None]] = j[:, None] + cv * h[:, None]
+
+    face = (axis * 2 + flip).astype(np.uint32)
+    attrs = (face << 15) | ((mat - 1).astype(np.uint32) << 18)
+    packed = pos[..., 0] | (pos[..., 1] << 5) | (pos[..., 2] << 10) | attrs[:, None]
+    return packed.reshape(-1)
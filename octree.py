@@ -0,0 +1,293 @@
+import math
+
+import numpy as np
+
+"""
+Hierarchiczny indeks zajętości świata (drzewo o 64 dzieciach w węźle, 4 x 4 x 4).
+
+Poniżej poziomu chunka zajętość jest zapisana w maskach bricków: każdy brick 4³ voxeli to jedna
+liczba uint64, w której bit lx | ly << 2 | lz << 4 oznacza pełny voxel (1 bit na voxel zamiast
+bajtu komórki). Powyżej chunka węzeł poziomu j obejmuje 4^j chunków na oś i przechowuje dwie
+maski 64-bitowe dzieci: zajęte (co najmniej jeden pełny voxel) i pełne (wszystkie voxele pełne).
+Węzłów bez pełnych voxeli nie ma wcale, więc pusta przestrzeń nic nie kosztuje, a promień
+i zapytania o obszar przeskakują ją krokami całych węzłów.
+
+Stan chunka w drzewie zależy tylko od liczby jego pełnych voxeli, dlatego drzewo można zbudować
+i aktualizować bez dekodowania chunków wczytanych z pliku sceny.
+"""
+
+BRICK = 4                                  # bok bricka w voxelach (64 voxele = jedna maska uint64)
+TREE_LEVELS = 3                            # poziomy nad chunkami; węzeł szczytowy obejmuje 4^3 chunków na oś
+FULL_MASK = (1 << 64) - 1
+
+
+def child_bit(x, y, z):
+    """Numer bitu dziecka (x, y, z) w masce węzła (współrzędne w zakresie 0..3)."""
+    return x | (y << 2) | (z << 4)
+
+
+def brick_masks(cells):
+    """
+    Buduje maski zajętości bricków chunka.
+
+    :param np.array cells: Komórki chunka (C, C, C), C podzielne przez BRICK.
+    :return: Tablica uint64 (C/4, C/4, C/4).
+    """
+    n = cells.shape[0] // BRICK
+    occupied = (cells != 0).reshape(n, BRICK, n, BRICK, n, BRICK)
+    # kolejność osi (lz, ly, lx) daje po spłaszczeniu numer bitu lx + 4 * ly + 16 * lz
+    bits = occupied.transpose(0, 2, 4, 5, 3, 1).reshape(n, n, n, 64)
+    return np.packbits(bits, axis=-1, bitorder="little").view("<u8")[..., 0]
+
+
+"""
+Węzły drzewa nad poziomem chunków, aktualizowane przyrostowo po każdej zmianie liczby pełnych voxeli
+chunka (update_chunk). Poziom 0 to same chunki mapy, poziom j (1..levels) to słownik klucz węzła -> [zajęte, pełne].
+"""
+class OccupancyTree:
+    def __init__(self, chunk_map, levels=TREE_LEVELS):
+        self.chunk_map = chunk_map
+        self.levels = levels
+        self.chunk_volume = chunk_map.chunk_size ** 3
+        self.nodes = [None] + [{} for _ in range(levels)]
+        for key in list(chunk_map.chunks):
+            self.update_chunk(key)
+
+    def node_size(self, level):
+        """Bok węzła poziomu level w voxelach (poziom 0 to chunk)."""
+        return self.chunk_map.chunk_size * BRICK ** level
+
+    def _chunk_state(self, key):
+        """Zwraca (zajęty, pełny) dla chunka."""
+        chunk = self.chunk_map.chunks.get(key)
+        if chunk is None or chunk.count == 0:
+            return False, False
+        return True, chunk.count == self.chunk_volume
+
+    def update_chunk(self, key):
+        """
+        Uaktualnia węzły nad chunkiem po zmianie jego liczby pełnych voxeli. Zmiana przechodzi
+        w górę tylko dopóki zmienia stan węzła (pusty / mieszany / pełny), więc zwykle kończy się na poziomie 1.
+
+        :param tuple key: Klucz chunka.
+        """
+        occupied, full = self._chunk_state(key)
+        for level in range(1, self.levels + 1):
+            shift = 2 * level
+            node_key = (key[0] >> shift, key[1] >> shift, key[2] >> shift)
+            s = shift - 2
+            bit = 1 << child_bit((key[0] >> s) & 3, (key[1] >> s) & 3, (key[2] >> s) & 3)
+            nodes = self.nodes[level]
+            node = nodes.get(node_key)
+            if node is None:
+                if not occupied:
+                    return
+                node = nodes[node_key] = [0, 0]
+            was_occupied, was_full = node[0] != 0, node[1] == FULL_MASK
+            node[0] = node[0] | bit if occupied else node[0] & ~bit
+            node[1] = node[1] | bit if full else node[1] & ~bit
+            if node[0] == 0:
+                del nodes[node_key]
+            occupied, full = node[0] != 0, node[1] == FULL_MASK
+            if (occupied, full) == (was_occupied, was_full):
+                return
+
+    def nbytes(self):
+        """Pamięć danych indeksu: maski węzłów i zbudowane maski bricków chunków (w bajtach)."""
+        nodes = 16 * sum(len(level) for level in self.nodes[1:])
+        bricks = sum(chunk.occupancy_bricks.nbytes for chunk in self.chunk_map.chunks.values() if chunk.occupancy_bricks is not None)
+        return nodes + bricks
+
+    def raycast(self, ray_origin, ray_dir):
+        """
+        Znajduje pierwszy pełny voxel na drodze promienia (hierarchiczne DDA). W każdym kroku wyznaczany
+        jest największy pusty element zawierający bieżący voxel (węzeł, chunk, brick lub voxel)
+        i promień przeskakuje od razu do jego ściany wyjściowej.
+
+        :param np.array ray_origin: Początek promienia (3-elementowy wektor).
+        :param np.array ray_dir: Kierunek promienia (3-elementowy wektor).
+        :return: (voxel, normal, t) lub (None, None, None). Voxel zawierający początek promienia jest pomijany.
+        """
+        top = self.nodes[self.levels]
+        if not top:
+            return None, None, None
+        # obliczenia w jednostkach voxeli; t pozostaje parametrem promienia w jednostkach świata
+        voxel_size = self.chunk_map.voxel_size
+        o = [float(v) / voxel_size for v in ray_origin]
+        d = [float(v) / voxel_size for v in ray_dir]
+        top_size = self.node_size(self.levels)
+        keys = np.array(list(top), dtype=np.int64)
+        lo = (keys.min(axis=0) * top_size).tolist()
+        hi = ((keys.max(axis=0) + 1) * top_size).tolist()
+
+        t, t_exit = 0.0, math.inf
+        enter_axis = -1
+        for a in range(3):
+            if d[a] == 0.0:
+                if o[a] < lo[a] or o[a] >= hi[a]:
+                    return None, None, None
+                continue
+            t0, t1 = (lo[a] - o[a]) / d[a], (hi[a] - o[a]) / d[a]
+            if t0 > t1:
+                t0, t1 = t1, t0
+            if t0 > t:
+                t, enter_axis = t0, a
+            t_exit = min(t_exit, t1)
+        if t > t_exit:
+            return None, None, None
+
+        step = [(d[a] > 0.0) - (d[a] < 0.0) for a in range(3)]
+        cell = [min(max(int(math.floor(o[a] + d[a] * t)), lo[a]), hi[a] - 1) for a in range(3)]
+        normal = [0, 0, 0]
+        if enter_axis >= 0:
+            cell[enter_axis] = lo[enter_axis] if step[enter_axis] > 0 else hi[enter_axis] - 1
+            normal[enter_axis] = -step[enter_axis]
+
+        c = self.chunk_map.chunk_size
+        node_key, node, empty = None, None, 0
+        chunk_key, bricks = None, None     # ostatni odwiedzony niepusty chunk i jego maski jako lista list
+        while True:
+            key = (cell[0] // c, cell[1] // c, cell[2] // c)
+            if key != chunk_key:
+                chunk_key = None
+                k1 = (key[0] >> 2, key[1] >> 2, key[2] >> 2)
+                if k1 != node_key:
+                    node_key = k1
+                    node, empty = self._find_node(k1)
+                filled = False
+                if node is None:
+                    size = empty
+                else:
+                    bit = child_bit(key[0] & 3, key[1] & 3, key[2] & 3)
+                    if not node[0] >> bit & 1:
+                        size = c
+                    elif node[1] >> bit & 1:
+                        size, filled = 1, True
+                    else:
+                        chunk_key, bricks = key, self.chunk_map.chunks[key].occupancy().tolist()
+            if chunk_key is not None:
+                lx, ly, lz = cell[0] - key[0] * c, cell[1] - key[1] * c, cell[2] - key[2] * c
+                mask = bricks[lx // BRICK][ly // BRICK][lz // BRICK]
+                size, filled = (1, mask >> child_bit(lx % BRICK, ly % BRICK, lz % BRICK) & 1) if mask else (BRICK, False)
+            if filled:
+                # voxel zawierający początek promienia (normalna zerowa) jest pomijany, jak w pick_brute_force
+                if normal != [0, 0, 0]:
+                    return (cell[0], cell[1], cell[2]), (normal[0], normal[1], normal[2]), t
+                size = 1
+
+            # wyjście z wyrównanego sześcianu o boku size zawierającego bieżący voxel
+            t_next, axis = math.inf, -1
+            for a in range(3):
+                if step[a] != 0:
+                    base = cell[a] // size * size
+                    boundary = base + size if step[a] > 0 else base
+                    t_a = (boundary - o[a]) / d[a]
+                    if t_a < t_next:
+                        t_next, axis = t_a, a
+            if t_next > t_exit:
+                return None, None, None
+            t = max(t, t_next)
+            for a in range(3):
+                base = cell[a] // size * size
+                if a == axis:
+                    cell[a] = base + size if step[a] > 0 else base - 1
+                elif step[a] > 0:
+                    cell[a] = max(cell[a], min(int(math.floor(o[a] + d[a] * t)), base + size - 1))
+                elif step[a] < 0:
+                    cell[a] = min(cell[a], max(int(math.floor(o[a] + d[a] * t)), base))
+            if not lo[axis] <= cell[axis] < hi[axis]:
+                return None, None, None
+            normal = [0, 0, 0]
+            normal[axis] = -step[axis]
+
+    def _find_node(self, key):
+        """
+        Schodzi od szczytu drzewa do węzła poziomu 1.
+
+        :param tuple key: Klucz węzła poziomu 1.
+        :return: (węzeł, 0) lub (None, bok największego pustego węzła zawierającego szukany, w voxelach).
+        """
+        shift = 2 * (self.levels - 1)
+        node = self.nodes[self.levels].get((key[0] >> shift, key[1] >> shift, key[2] >> shift))
+        if node is None:
+            return None, self.node_size(self.levels)
+        for level in range(self.levels, 1, -1):
+            shift = 2 * (level - 2)
+            bit = child_bit((key[0] >> shift) & 3, (key[1] >> shift) & 3, (key[2] >> shift) & 3)
+            if not node[0] >> bit & 1:
+                return None, self.node_size(level - 1)
+            node = self.nodes[level - 1][(key[0] >> shift, key[1] >> shift, key[2] >> shift)]
+        return node, 0
+
+    def any_in_box(self, lo, hi):
+        """
+        Sprawdza, czy w prostopadłościanie voxeli jest choć jeden pełny voxel. Węzły leżące w całości
+        w obszarze oraz pełne węzły, które go przecinają, rozstrzygają odpowiedź bez schodzenia niżej.
+
+        :param lo: Dolny narożnik obszaru (włącznie).
+        :param hi: Górny narożnik obszaru (wyłącznie).
+        :return: bool
+        """
+        lo = tuple(int(v) for v in lo)
+        hi = tuple(int(v) for v in hi)
+        if any(l >= h for l, h in zip(lo, hi)):
+            return False
+        for key, node in self.nodes[self.levels].items():
+            if self._any_in_node(self.levels, key, node, lo, hi):
+                return True
+        return False
+
+    def _any_in_node(self, level, key, node, lo, hi):
+        """Sprawdza zajętość części obszaru leżącej w węźle; node to [zajęte, pełne]."""
+        size = self.node_size(level)
+        n_lo = (key[0] * size, key[1] * size, key[2] * size)
+        if any(n_lo[a] >= hi[a] or n_lo[a] + size <= lo[a] for a in range(3)):
+            return False
+        if all(lo[a] <= n_lo[a] and n_lo[a] + size <= hi[a] for a in range(3)):
+            return True
+        occupied, full = node
+        c_size = size // BRICK
+        for bit in _set_bits(occupied):
+            ox, oy, oz = bit & 3, (bit >> 2) & 3, bit >> 4
+            child = (key[0] * BRICK + ox, key[1] * BRICK + oy, key[2] * BRICK + oz)
+            c_lo = (child[0] * c_size, child[1] * c_size, child[2] * c_size)
+            if any(c_lo[a] >= hi[a] or c_lo[a] + c_size <= lo[a] for a in range(3)):
+                continue
+            if full >> bit & 1:
+                # pełne dziecko przecinające obszar rozstrzyga odpowiedź
+                return True
+            if level == 1:
+                if self._any_in_chunk(self.chunk_map.chunks[child], lo, hi):
+                    return True
+            elif self._any_in_node(level - 1, child, self.nodes[level - 1][child], lo, hi):
+                return True
+        return False
+
+    def _any_in_chunk(self, chunk, lo, hi):
+        """Sprawdza zajętość części obszaru leżącej w chunku (chunk przecina obszar i nie jest pusty)."""
+        o, c = chunk.origin, chunk.size
+        if all(lo[a] <= o[a] and o[a] + c <= hi[a] for a in range(3)):
+            return True
+        region = tuple(slice(max(lo[a], o[a]) - o[a], min(hi[a], o[a] + c) - o[a]) for a in range(3))
+        return bool(chunk.cells[region].any())
+
+    def overlaps(self, box_min, box_max):
+        """
+        Sprawdza, czy prostopadłościan w jednostkach świata nachodzi na jakikolwiek pełny voxel.
+
+        :param np.array box_min: Minimalne współrzędne (3-elementowy wektor).
+        :param np.array box_max: Maksymalne współrzędne (3-elementowy wektor).
+        :return: bool
+        """
+        voxel_size = self.chunk_map.voxel_size
+        lo = np.floor(np.asarray(box_min, dtype=np.float64) / voxel_size).astype(np.int64)
+        hi = np.ceil(np.asarray(box_max, dtype=np.float64) / voxel_size).astype(np.int64)
+        return self.any_in_box(lo, np.maximum(hi, lo + 1))
+
+
+def _set_bits(mask):
+    """Zwraca numery ustawionych bitów maski."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
@@ -0,0 +1,59 @@
+import OpenGL.GL as GL
+import numpy as np
+
+"""
+Renderowanie poza ekranem: bufor ramki z buforem koloru RGBA8 i buforem głębokości.
+Razem z niewidocznym oknem (init_window(visible=False)) pozwala rysować klatki bez wyświetlacza,
+np. w testach wydajności uruchamianych na serwerach CI.
+"""
+
+
+"""Bufor ramki o stałym rozmiarze, do którego trafia rysowana klatka."""
+class OffscreenTarget:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.fbo = GL.glGenFramebuffers(1)
+        self.color_rbo = GL.glGenRenderbuffers(1)
+        self.depth_rbo = GL.glGenRenderbuffers(1)
+
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.color_rbo)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_RGBA8, width, height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.depth_rbo)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_DEPTH_COMPONENT24, width, height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.fbo)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_RENDERBUFFER, self.color_rbo)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_DEPTH_ATTACHMENT, GL.GL_RENDERBUFFER, self.depth_rbo)
+        status = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError(f"Niekompletny bufor ramki: {status}")
+
+    def bind(self):
+        """Ustawia bufor jako cel rysowania i dopasowuje do niego viewport."""
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.fbo)
+        GL.glViewport(0, 0, self.width, self.height)
+
+    def unbind(self):
+        """Przywraca domyślny bufor ramki."""
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+
+    def read_pixels(self):
+        """
+        Odczytuje zawartość bufora koloru (synchronicznie, np. do zapisania zrzutu klatki).
+
+        :return: Tablica uint8 (H, W, 4), wiersz 0 to górna krawędź obrazu.
+        """
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self.fbo)
+        GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0)
+        pixels = np.empty((self.height, self.width, 4), dtype=np.uint8)
+        GL.glReadPixels(0, 0, self.width, self.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, pixels)
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, 0)
+        return pixels[::-1]
+
+    def release(self):
+        """Zwalnia bufor ramki."""
+        GL.glDeleteFramebuffers(1, [self.fbo])
+        GL.glDeleteRenderbuffers(2, [self.color_rbo, self.depth_rbo])
@@ -1,41 +1,86 @@
-import OpenGL.GLUT as GLUT
 import OpenGL.GL as GL
 from OpenGL.GL.shaders import compileProgram, compileShader
 import glfw
 import ctypes
 import numpy as np
-from PIL import Image
 
 from utils import create_cube_geometry
 from constants import WIDTH, HEIGHT, VOXEL_SIZE
 
-def init_window():
-    """Inicjalizuje okno GLFW i kontekst OpenGL."""
+MATERIAL_TEXTURE_UNIT = 0                  # jednostka tekstury tablicy materiałów
+MATERIALS_UBO_BINDING = 0                  # punkt wiązania bloku uniformów Materials
 
+CONTEXT_NATIVE = "native"                  # kontekst systemu okien (wymaga wyświetlacza)
+CONTEXT_EGL = "egl"                        # kontekst EGL (np. serwer bez wyświetlacza z GPU)
+CONTEXT_OSMESA = "osmesa"                  # programowy kontekst OSMesa (bez wyświetlacza i GPU)
+
+def init_window(visible=True, width=WIDTH, height=HEIGHT, context_api=CONTEXT_NATIVE):
+    """
+    Inicjalizuje okno GLFW i kontekst OpenGL.
+
+    Okno niewidoczne (visible=False) służy do renderowania bez wyświetlania, np. do bufora ramki
+    w testach wydajności. Dla CONTEXT_OSMESA GLFW działa bez systemu okien (platforma "null",
+    GLFW 3.4+), a PyOpenGL musi zostać zaimportowany ze zmienną PYOPENGL_PLATFORM=osmesa
+    (dla CONTEXT_EGL: PYOPENGL_PLATFORM=egl).
+
+    :param bool visible: Czy okno ma być widoczne.
+    :param int width: Szerokość okna w pikselach.
+    :param int height: Wysokość okna w pikselach.
+    :param str context_api: CONTEXT_NATIVE, CONTEXT_EGL lub CONTEXT_OSMESA.
+    :return: Okno GLFW.
+    """
+
+    if context_api == CONTEXT_OSMESA:
+        glfw.init_hint(glfw.PLATFORM, glfw.PLATFORM_NULL)
     if not glfw.init():
         raise RuntimeError("Nie udało się zainicjalizować GLFW")
 
-    window = glfw.create_window(WIDTH, HEIGHT, "Voxel Editor 3D", None, None)
+    # kontekst w profilu core: cały interfejs (również tekst) jest rysowany shaderami
+    glfw.window_hint(glfw.CONTEXT_VERSION_MAJOR, 3)
+    glfw.window_hint(glfw.CONTEXT_VERSION_MINOR, 3)
+    glfw.window_hint(glfw.OPENGL_PROFILE, glfw.OPENGL_CORE_PROFILE)
+    glfw.window_hint(glfw.OPENGL_FORWARD_COMPAT, GL.GL_TRUE)
+    glfw.window_hint(glfw.VISIBLE, glfw.TRUE if visible else glfw.FALSE)
+    if context_api == CONTEXT_EGL:
+        glfw.window_hint(glfw.CONTEXT_CREATION_API, glfw.EGL_CONTEXT_API)
+    elif context_api == CONTEXT_OSMESA:
+        glfw.window_hint(glfw.CONTEXT_CREATION_API, glfw.OSMESA_CONTEXT_API)
+
+    window = glfw.create_window(width, height, "Voxel Editor 3D", None, None)
     if not window:
         glfw.terminate()
         raise RuntimeError("Nie udało się stworzyć okna")
 
     glfw.make_context_current(window)
-    glfw.swap_interval(1)
+    # w oknie niewidocznym synchronizacja z odświeżaniem ekranu zafałszowałaby pomiary
+    glfw.swap_interval(1 if visible else 0)
     return window
 
 
-def init_shaders():
+def create_program(vertex_path, fragment_path):
+    """
+    Kompiluje i linkuje program z plików shaderów.
+
+    :param str vertex_path: Ścieżka do vertex shadera.
+    :param str fragment_path: Ścieżka do fragment shadera.
+    :return: ID programu.
+    """
+
+    vertex_src = load_shader_source(vertex_path)
+    fragment_src = load_shader_source(fragment_path)
+    return compileProgram(compileShader(vertex_src, GL.GL_VERTEX_SHADER), compileShader(fragment_src, GL.GL_FRAGMENT_SHADER))
+
+
+def init_shaders(vertex_path="shaders/voxel.vert", fragment_path="shaders/voxel.frag"):
     """
     Inicjalizuje i kompiluje shadery, zwraca program i lokalizacje uniformów.
     
-    :return: tuple (program, loc_view, loc_proj, loc_selected, loc_highlight, loc_light, loc_viewpos)
+    :param str vertex_path: Ścieżka do vertex shadera.
+    :param str fragment_path: Ścieżka do fragment shadera.
+    :return: tuple (program, loc_view, loc_proj, loc_selected, loc_highlight, loc_light, loc_viewpos, loc_chunk_origin, loc_voxel_size, loc_cell_scale)
     """
 
-    vertex_src = load_shader_source("shaders/voxel.vert")
-    fragment_src = load_shader_source("shaders/voxel.frag")
-
-    program = compileProgram(compileShader(vertex_src, GL.GL_VERTEX_SHADER), compileShader(fragment_src, GL.GL_FRAGMENT_SHADER))
+    program = create_program(vertex_path, fragment_path)
     GL.glUseProgram(program)
 
     loc_view = GL.glGetUniformLocation(program, "u_view")
@@ -44,29 +89,51 @@ def init_shaders():
     loc_highlight = GL.glGetUniformLocation(program, "u_highlight_selected")
     loc_light = GL.glGetUniformLocation(program, "u_light_pos")
     loc_viewpos = GL.glGetUniformLocation(program, "u_view_pos")
-    loc_textures = GL.glGetUniformLocation(program, "u_textures")
-    GL.glUniform1iv(loc_textures, 5, (GL.GLint * 5)(0, 1, 2, 3, 4))
+    loc_chunk_origin = GL.glGetUniformLocation(program, "u_chunk_origin")
+    loc_voxel_size = GL.glGetUniformLocation(program, "u_voxel_size")
+    loc_cell_scale = GL.glGetUniformLocation(program, "u_cell_scale")
+    GL.glUniform1f(loc_cell_scale, 1.0)
+    GL.glUniform1i(GL.glGetUniformLocation(program, "u_material_tex"), MATERIAL_TEXTURE_UNIT)
+    block = GL.glGetUniformBlockIndex(program, "Materials")
+    if block != GL.GL_INVALID_INDEX:
+        GL.glUniformBlockBinding(program, block, MATERIALS_UBO_BINDING)
 
-    return program, loc_view, loc_proj, loc_selected, loc_highlight, loc_light, loc_viewpos
+    return program, loc_view, loc_proj, loc_selected, loc_highlight, loc_light, loc_viewpos, loc_chunk_origin, loc_voxel_size, loc_cell_scale
 
 
 def init_geometry():
     """
-    Inicjalizuje geometrię sześcianu i zwraca VAO, VBO oraz liczbę wierzchołków.
+    Inicjalizuje geometrię sześcianu i zwraca VBO oraz liczbę wierzchołków.
     
-    :return: tuple (vao, vbo_cube, vbo_offsets, vbo_materials, num_cube_vertices)
+    :return: tuple (vbo_cube, num_cube_vertices)
     """
 
     cube_vertices = create_cube_geometry(VOXEL_SIZE)
     num_cube_vertices = len(cube_vertices) // 8
+
+    vbo_cube = GL.glGenBuffers(1)
+    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_cube)
+    GL.glBufferData(GL.GL_ARRAY_BUFFER, cube_vertices.nbytes, cube_vertices, GL.GL_STATIC_DRAW)
+    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+    return vbo_cube, num_cube_vertices
+
+
+def create_instance_vao(vbo_cube):
+    """
+    Tworzy VAO łączące wspólną geometrię sześcianu z nowym buforem instancji
+    (jedno słowo uint32 na instancję, odczytywane jako liczba całkowita).
+
+    :param int vbo_cube: ID bufora geometrii sześcianu.
+    :return: tuple (vao, vbo_instances)
+    """
+
     stride = 8 * 4
 
     vao = GL.glGenVertexArrays(1)
     GL.glBindVertexArray(vao)
 
-    vbo_cube = GL.glGenBuffers(1)
     GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_cube)
-    GL.glBufferData(GL.GL_ARRAY_BUFFER, cube_vertices.nbytes, cube_vertices, GL.GL_STATIC_DRAW)
 
     GL.glEnableVertexAttribArray(0)
     GL.glVertexAttribPointer(0, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, ctypes.c_void_p(0))
@@ -77,110 +144,153 @@ def init_geometry():
     GL.glEnableVertexAttribArray(3)
     GL.glVertexAttribPointer(3, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, ctypes.c_void_p(20))
 
-    vbo_offsets = GL.glGenBuffers(1)
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_offsets)
+    vbo_instances = GL.glGenBuffers(1)
+    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_instances)
     GL.glEnableVertexAttribArray(1)
-    GL.glVertexAttribPointer(1, 3, GL.GL_FLOAT, GL.GL_FALSE, 0, None)
+    GL.glVertexAttribIPointer(1, 1, GL.GL_UNSIGNED_INT, 0, None)
     GL.glVertexAttribDivisor(1, 1)
 
-    vbo_materials = GL.glGenBuffers(1)
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_materials)
-    GL.glEnableVertexAttribArray(4)
-    GL.glVertexAttribPointer(4, 1, GL.GL_FLOAT, GL.GL_FALSE, 0, None)
-    GL.glVertexAttribDivisor(4, 1)
-
     GL.glBindVertexArray(0)
 
-    return vao, vbo_cube, vbo_offsets, vbo_materials, num_cube_vertices
+    return vao, vbo_instances
 
 
-def update_instance_buffers(vbo_offsets, vbo_materials, world):
+def create_mesh_vao():
     """
-    Aktualizuje bufory instancji dla przesunięć i materiałów na podstawie stanu świata.
-    
-    :param int vbo_offsets: ID bufora przesunięć.
-    :param int vbo_materials: ID bufora identyfikatorów materiałów.
-    :param World world: Obiekt świata voxelowego.
+    Tworzy VAO i VBO dla siatki chunka (jedno spakowane słowo uint32 na wierzchołek).
+
+    :return: tuple (vao, vbo)
     """
 
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_offsets)
-    if len(world.offsets) > 0:
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, world.offsets.nbytes, world.offsets, GL.GL_DYNAMIC_DRAW)
-    else:
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, 0, None, GL.GL_DYNAMIC_DRAW)
+    vao = GL.glGenVertexArrays(1)
+    GL.glBindVertexArray(vao)
 
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_materials)
-    if len(world.instance_material_ids) > 0:
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, world.instance_material_ids.nbytes, world.instance_material_ids, GL.GL_DYNAMIC_DRAW)
-    else:
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, 0, None, GL.GL_DYNAMIC_DRAW)
+    vbo = GL.glGenBuffers(1)
+    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
+
+    GL.glEnableVertexAttribArray(0)
+    GL.glVertexAttribIPointer(0, 1, GL.GL_UNSIGNED_INT, 0, None)
+
+    GL.glBindVertexArray(0)
+
+    return vao, vbo
 
 
-def load_texture(path):
+def upload_mesh(vbo, vertices, stream=None):
     """
-    Ładuje teksturę z pliku i zwraca jej ID.
+    Wysyła wierzchołki siatki chunka do bufora. Ze StreamBuffer bufor jest tylko alokowany,
+    a dane trafiają do niego z pierścienia przy najbliższym flush.
 
-    :param str path: Ścieżka do pliku tekstury.
-    :return: ID tekstury OpenGL.
+    :param int vbo: ID bufora wierzchołków.
+    :param np.array vertices: Tablica spakowanych wierzchołków (N,) uint32.
+    :param StreamBuffer stream: Pierścień do wysyłania danych lub None.
+    :return: Liczba wysłanych bajtów.
     """
 
-    img = Image.open(path).convert("RGBA")
-    img = img.transpose(Image.FLIP_TOP_BOTTOM)
-    img_data = np.frombuffer(img.tobytes(), dtype=np.uint8)
+    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
+    if len(vertices) > 0 and stream is None:
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL.GL_STATIC_DRAW)
+    else:
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, vertices.nbytes, None, GL.GL_STATIC_DRAW)
+        if stream is not None:
+            stream.upload(vbo, 0, vertices)
+    return vertices.nbytes
 
-    width, height = img.size
 
-    tex_id = GL.glGenTextures(1)
-    GL.glBindTexture(GL.GL_TEXTURE_2D, tex_id)
-
-    GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA, width, height, 0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, img_data)
-    GL.glGenerateMipmap(GL.GL_TEXTURE_2D)
-    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_REPEAT)
-    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_REPEAT)
-    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR_MIPMAP_LINEAR)
-    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
-    GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
-    return tex_id
+def update_instance_buffers(vbo_instances, pool, stream=None):
+    """
+    Aktualizuje bufor instancji przyrostowo na podstawie puli instancji.
+    Po zmianie pojemności puli bufor jest alokowany od nowa, w przeciwnym razie
+    wysyłane są tylko zmienione zakresy slotów przez glBufferSubData
+    (albo, ze StreamBuffer, przez pierścień przy najbliższym flush).
+
+    :param int vbo_instances: ID bufora instancji.
+    :param InstancePool pool: Pula instancji (np. chunka).
+    :param StreamBuffer stream: Pierścień do wysyłania danych lub None.
+    :return: Liczba wysłanych bajtów.
+    """
 
-def load_shader_source(path: str):
+    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_instances)
+    if pool.resized:
+        if stream is None:
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, pool.packed_buf.nbytes, pool.packed_buf, GL.GL_DYNAMIC_DRAW)
+            uploaded = pool.packed_buf.nbytes
+        else:
+            # nowy magazyn bez danych (stary zostaje sterownikowi, dopóki GPU go używa), dane z pierścienia
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, pool.packed_buf.nbytes, None, GL.GL_DYNAMIC_DRAW)
+            uploaded = stream.upload(vbo_instances, 0, pool.packed)
+        pool.resized = False
+        pool.take_dirty()
+        return uploaded
+
+    uploaded = 0
+    for start, end in pool.take_dirty():
+        chunk = pool.packed_buf[start:end]
+        if stream is None:
+            GL.glBufferSubData(GL.GL_ARRAY_BUFFER, start * chunk.itemsize, chunk.nbytes, chunk)
+        else:
+            stream.upload(vbo_instances, start * chunk.itemsize, chunk)
+        uploaded += chunk.nbytes
+    return uploaded
+
+
+def create_texture_array(levels):
     """
-    Ładuje kod źródłowy shadera z pliku.
-    :param str path: Ścieżka do pliku shadera.
-    :return: Kod źródłowy shadera jako string.
+    Tworzy tablicę tekstur (GL_TEXTURE_2D_ARRAY) z gotowych poziomów mipmap, po jednej warstwie na materiał.
+
+    :param list levels: Lista poziomów mipmap, każdy jako tablica (warstwy, S, S, 4) uint8.
+    :return: ID tekstury OpenGL.
     """
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
 
+    tex_id = GL.glGenTextures(1)
+    GL.glBindTexture(GL.GL_TEXTURE_2D_ARRAY, tex_id)
+    for i, level in enumerate(levels):
+        layers, height, width, _ = level.shape
+        data = np.ascontiguousarray(level)
+        GL.glTexImage3D(GL.GL_TEXTURE_2D_ARRAY, i, GL.GL_RGBA8, width, height, layers, 0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, data)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D_ARRAY, GL.GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D_ARRAY, GL.GL_TEXTURE_WRAP_S, GL.GL_REPEAT)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D_ARRAY, GL.GL_TEXTURE_WRAP_T, GL.GL_REPEAT)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D_ARRAY, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR_MIPMAP_LINEAR)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D_ARRAY, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
+    GL.glBindTexture(GL.GL_TEXTURE_2D_ARRAY, 0)
+    return tex_id
 
-def update_offsets_buffer(vbo_offsets, offsets):
+
+def create_material_ubo(table):
     """
-    Aktualizuje bufor przesunięć instancji.
+    Tworzy bufor uniformów z tabelą właściwości materiałów i wiąże go z punktem MATERIALS_UBO_BINDING.
 
-    :param int vbo_offsets: ID bufora przesunięć.
-    :param np.array offsets: Tablica przesunięć.
+    :param np.array table: Tabela materiałów (float32) w układzie std140.
+    :return: ID bufora.
     """
 
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_offsets)
-    if len(offsets) > 0:
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, offsets.nbytes, offsets, GL.GL_DYNAMIC_DRAW)
-    else:
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, 0, None, GL.GL_DYNAMIC_DRAW)
+    ubo = GL.glGenBuffers(1)
+    GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, ubo)
+    GL.glBufferData(GL.GL_UNIFORM_BUFFER, table.nbytes, table, GL.GL_STATIC_DRAW)
+    GL.glBindBuffer(GL.GL_UNIFORM_BUFFER, 0)
+    GL.glBindBufferBase(GL.GL_UNIFORM_BUFFER, MATERIALS_UBO_BINDING, ubo)
+    return ubo
 
-def update_materials_buffer(vbo_materials, material_ids):
+
+def bind_material_texture(tex_id):
     """
-    Aktualizuje bufor identyfikatorów materiałów instancji.
+    Wiąże tablicę tekstur materiałów z jej jednostką tekstury.
 
-    :param int vbo_materials: ID bufora identyfikatorów materiałów.
-    :param list material_ids: Lista identyfikatorów materiałów.
+    :param int tex_id: ID tablicy tekstur.
     """
 
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo_materials)
+    GL.glActiveTexture(GL.GL_TEXTURE0 + MATERIAL_TEXTURE_UNIT)
+    GL.glBindTexture(GL.GL_TEXTURE_2D_ARRAY, tex_id)
 
-    if material_ids is not None and len(material_ids) > 0:
-        arr = np.array(material_ids, dtype=np.float32)
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, arr.nbytes, arr, GL.GL_DYNAMIC_DRAW)
-    else:
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, 0, None, GL.GL_DYNAMIC_DRAW)
+def load_shader_source(path: str):
+    """
+    Ładuje kod źródłowy shadera z pliku.
+    :param str path: Ścieżka do pliku shadera.
+    :return: Kod źródłowy shadera jako string.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
 
 
 def set_matrices(loc_view, loc_proj, view, proj):
@@ -214,32 +324,35 @@ def set_selection_uniforms(loc_selected, loc_highlight, selected_voxel):
         GL.glUniform3i(loc_selected, -1, -1, -1)
 
 
-def draw_voxels(vao, num_cube_vertices, offsets):
+def draw_voxels_batch(loc_chunk_origin, vaos, origins, num_cube_vertices, instance_counts):
     """
-    Rysuje voxele za pomocą instancjonowania.
+    Rysuje instancje wielu chunków jedną serią wywołań, bez odpinania VAO pomiędzy nimi.
 
-    :param int vao: ID VAO sześcianu.
+    :param int loc_chunk_origin: Lokalizacja uniformu narożnika chunka.
+    :param list vaos: Lista ID VAO chunków.
+    :param list origins: Narożniki kolejnych chunków (współrzędne voxelowe).
     :param int num_cube_vertices: Liczba wierzchołków sześcianu.
-    :param np.array offsets: Tablica przesunięć instancji.
+    :param list instance_counts: Liczby instancji kolejnych chunków.
     """
 
-    GL.glBindVertexArray(vao)
-    if len(offsets) > 0:
-        GL.glDrawArraysInstanced(GL.GL_TRIANGLES, 0, num_cube_vertices, len(offsets))
+    for vao, origin, count in zip(vaos, origins, instance_counts):
+        GL.glUniform3i(loc_chunk_origin, origin[0], origin[1], origin[2])
+        GL.glBindVertexArray(vao)
+        GL.glDrawArraysInstanced(GL.GL_TRIANGLES, 0, num_cube_vertices, count)
     GL.glBindVertexArray(0)
 
-def draw_text_2d(x, y, text, font=GLUT.GLUT_BITMAP_9_BY_15):
+def draw_mesh_batch(loc_chunk_origin, vaos, origins, vertex_counts):
     """
-    Rysuje tekst 2D na ekranie w pozycji (x, y).
+    Rysuje siatki wielu chunków jedną serią wywołań, bez odpinania VAO pomiędzy nimi.
 
-    :param float x: Pozycja tekstu w pikselach (oś X).
-    :param float y: Pozycja tekstu w pikselach (oś Y).
-    :param str text: Tekst do wyświetlenia.
-    :param font: Czcionka GLUT do użycia.
+    :param int loc_chunk_origin: Lokalizacja uniformu narożnika chunka.
+    :param list vaos: Lista ID VAO siatek.
+    :param list origins: Narożniki kolejnych chunków (współrzędne voxelowe).
+    :param list vertex_counts: Liczby wierzchołków kolejnych siatek.
     """
 
-    GL.glUseProgram(0)
-    GL.glColor3f(1.0, 1.0, 1.0)
-    GL.glWindowPos2f(x, y)
-    for ch in text:
-        GLUT.glutBitmapCharacter(font, ord(ch))
\ No newline at end of file
+    for vao, origin, count in zip(vaos, origins, vertex_counts):
+        GL.glUniform3i(loc_chunk_origin, origin[0], origin[1], origin[2])
+        GL.glBindVertexArray(vao)
+        GL.glDrawArrays(GL.GL_TRIANGLES, 0, count)
+    GL.glBindVertexArray(0)
@@ -0,0 +1,215 @@
+import json
+import time
+from collections import deque
+
+import OpenGL.GL as GL
+import numpy as np
+
+"""
+Profiler etapów klatki. Czas każdego etapu jest mierzony zegarem wysokiej rozdzielczości
+i zapisywany w buforze cyklicznym, z którego liczone są kroczące percentyle p50/p95/p99.
+Wybrane etapy mogą być dodatkowo mierzone zapytaniami GL_TIME_ELAPSED (czas GPU),
+których wyniki są odbierane w kolejnych klatkach bez czekania na GPU.
+Zdarzenia ostatnich klatek można zapisać w formacie Chrome trace-event (chrome://tracing, Perfetto).
+
+Wyłączony profiler zwraca ze stage wspólny pusty obiekt, więc koszt pomiaru sprowadza się
+do jednego wywołania metody.
+"""
+
+PROFILE_HISTORY = 240                      # liczba klatek w buforze cyklicznym
+GPU_PREFIX = "gpu:"                        # przedrostek serii z czasem GPU
+
+
+"""Pusty etap używany, gdy profiler jest wyłączony."""
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+"""Bufor cykliczny próbek jednej serii (w milisekundach)."""
+class RingSeries:
+    def __init__(self, capacity):
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+        self.pos = 0
+
+    def push(self, value):
+        """Dodaje próbkę, nadpisując najstarszą po zapełnieniu bufora."""
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def percentiles(self, q=(50, 95, 99)):
+        """
+        Zwraca percentyle próbek w buforze.
+
+        :param tuple q: Percentyle do obliczenia.
+        :return: Tablica wartości percentyli (zera dla pustej serii).
+        """
+        if self.count == 0:
+            return np.zeros(len(q))
+        return np.percentile(self.values[:self.count], q)
+
+
+"""Pomiar jednego etapu klatki (menedżer kontekstu zwracany przez Profiler.stage)."""
+class _Stage:
+    __slots__ = ("profiler", "name", "query", "start")
+
+    def __init__(self, profiler, name, query):
+        self.profiler = profiler
+        self.name = name
+        self.query = query
+
+    def __enter__(self):
+        if self.query is not None:
+            GL.glBeginQuery(GL.GL_TIME_ELAPSED, self.query)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter_ns()
+        if self.query is not None:
+            GL.glEndQuery(GL.GL_TIME_ELAPSED)
+        self.profiler._record(self.name, self.start, end, self.query)
+        return False
+
+
+"""
+Profiler etapów klatki z buforami cyklicznymi czasów, opcjonalnymi zapytaniami czasu GPU
+i zdarzeniami do eksportu.
+"""
+class Profiler:
+    def __init__(self, enabled=False, gpu_timers=False, history=PROFILE_HISTORY):
+        self.enabled = enabled
+        self.gpu_timers = gpu_timers
+        self.history = history
+        self.series = {}                   # nazwa etapu -> RingSeries
+        self.frame = {}                    # nazwa etapu -> suma czasu (ms) w bieżącej klatce
+        self.frame_start = None
+        self.events = deque(maxlen=history * 16)   # zdarzenia Chrome trace ostatnich klatek
+        self.origin_ns = time.perf_counter_ns()
+        self.free_queries = []
+        self.pending_queries = deque()     # (zapytanie, nazwa, początek w ns)
+
+    def stage(self, name, gpu=False):
+        """
+        Zwraca menedżer kontekstu mierzący etap klatki.
+
+        :param str name: Nazwa etapu.
+        :param bool gpu: Czy mierzyć też czas GPU (etapy GPU nie mogą być zagnieżdżone).
+        :return: Menedżer kontekstu.
+        """
+        if not self.enabled:
+            return _NULL_STAGE
+        query = None
+        if gpu and self.gpu_timers:
+            query = self.free_queries.pop() if self.free_queries else GL.glGenQueries(1)
+        return _Stage(self, name, query)
+
+    def begin_frame(self):
+        """Rozpoczyna pomiar klatki."""
+        if not self.enabled:
+            return
+        self.frame = {}
+        self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self, discard=False):
+        """
+        Kończy pomiar klatki i zapisuje czasy etapów do buforów cyklicznych.
+        Etapy znane z poprzednich klatek, które w tej klatce nie wystąpiły, dostają czas 0.
+
+        :param bool discard: Czy odrzucić klatkę (np. obieg pętli bez rysowania).
+        """
+        if not self.enabled or self.frame_start is None:
+            return
+        end = time.perf_counter_ns()
+        if not discard:
+            self._series("frame").push((end - self.frame_start) / 1e6)
+            self._add_event("frame", self.frame_start, end, tid=0)
+            for name, series in self.series.items():
+                if name != "frame" and not name.startswith(GPU_PREFIX):
+                    series.push(self.frame.get(name, 0.0))
+        self.frame_start = None
+        self._collect_queries()
+
+    def _series(self, name):
+        """Zwraca serię o podanej nazwie, tworząc ją w razie potrzeby."""
+        series = self.series.get(name)
+        if series is None:
+            series = RingSeries(self.history)
+            self.series[name] = series
+        return series
+
+    def _record(self, name, start, end, query):
+        """Zapisuje czas etapu w bieżącej klatce oraz zdarzenie do eksportu."""
+        self._series(name)
+        self.frame[name] = self.frame.get(name, 0.0) + (end - start) / 1e6
+        self._add_event(name, start, end, tid=0)
+        if query is not None:
+            self.pending_queries.append((query, name, start))
+
+    def _add_event(self, name, start, end, tid):
+        """Dodaje zdarzenie typu "X" (etap o znanym czasie trwania) w mikrosekundach."""
+        self.events.append({
+            "name": name, "ph": "X", "pid": 0, "tid": tid,
+            "ts": (start - self.origin_ns) / 1000.0, "dur": (end - start) / 1000.0,
+        })
+
+    def _collect_queries(self):
+        """Odbiera wyniki zakończonych zapytań czasu GPU bez czekania na GPU."""
+        while self.pending_queries:
+            query, name, start = self.pending_queries[0]
+            if not GL.glGetQueryObjectiv(query, GL.GL_QUERY_RESULT_AVAILABLE):
+                break
+            self.pending_queries.popleft()
+            elapsed = GL.glGetQueryObjectui64v(query, GL.GL_QUERY_RESULT)
+            self.free_queries.append(query)
+            self._series(GPU_PREFIX + name).push(elapsed / 1e6)
+            self._add_event(GPU_PREFIX + name, start, start + elapsed, tid=1)
+
+    def summary(self):
+        """
+        Zwraca percentyle czasów wszystkich serii.
+
+        :return: Lista krotek (nazwa, p50, p95, p99) w milisekundach, w kolejności pojawienia się etapów.
+        """
+        return [(name, *series.percentiles()) for name, series in self.series.items()]
+
+    def overlay_lines(self):
+        """Zwraca wiersze nakładki HUD z percentylami etapów."""
+        lines = ["Profil [ms]            p50     p95     p99"]
+        for name, p50, p95, p99 in self.summary():
+            lines.append(f"{name:<18} {p50:>7.2f} {p95:>7.2f} {p99:>7.2f}")
+        return lines
+
+    def export_trace(self, path):
+        """
+        Zapisuje zdarzenia ostatnich klatek w formacie Chrome trace-event JSON.
+
+        :param str path: Ścieżka pliku wynikowego.
+        """
+        trace = {
+            "traceEvents": [
+                {"name": "thread_name", "ph": "M", "pid": 0, "tid": 0, "args": {"name": "CPU"}},
+                {"name": "thread_name", "ph": "M", "pid": 0, "tid": 1, "args": {"name": "GPU"}},
+                *self.events,
+            ],
+            "displayTimeUnit": "ms",
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+
+    def release(self):
+        """Zwalnia zapytania GPU."""
+        queries = self.free_queries + [query for query, _, _ in self.pending_queries]
+        if queries:
+            GL.glDeleteQueries(len(queries), queries)
+        self.free_queries, self.pending_queries = [], deque()
@@ -0,0 +1,397 @@
+import time
+
+import OpenGL.GL as GL
+import numpy as np
+
+from constants import LOD_DISTANCE, LOD_HYSTERESIS, MESH_UPLOAD_BUDGET
+from lod import choose_lod_levels, lod_instances, max_lod_level
+from meshing import build_chunk_mesh
+from opengl_helpers import create_instance_vao, create_mesh_vao, update_instance_buffers, upload_mesh, draw_voxels_batch, draw_mesh_batch
+from utils import frustum_planes, boxes_in_frustum
+
+MODE_INSTANCED = "instanced"               # każdy voxel to pełny sześcian rysowany instancjonowaniem
+MODE_MESHED = "meshed"                     # tylko odsłonięte ściany połączone w większe prostokąty
+
+"""
+Siatka chunka w dwóch buforach: rysowany jest bufor przedni, a nowa siatka trafia do tylnego
+i zamienia się z przednim dopiero po wysłaniu, więc do tego czasu widoczna jest poprzednia wersja
+(także poprzedni poziom LOD, gdy chunk przechodzi na inny).
+"""
+class ChunkMesh:
+    def __init__(self):
+        vao_a, vbo_a = create_mesh_vao()
+        vao_b, vbo_b = create_mesh_vao()
+        self.vaos = [vao_a, vao_b]
+        self.vbos = [vbo_a, vbo_b]
+        self.counts = [0, 0]
+        self.front = 0
+        self.chunk = None
+        self.requested = None              # (wersja chunka, poziom LOD), dla których zlecono ostatnią budowę
+        self.version = None                # (wersja chunka, poziom LOD) siatki w przednim buforze
+
+    @property
+    def vao(self):
+        return self.vaos[self.front]
+
+    @property
+    def vertex_count(self):
+        return self.counts[self.front]
+
+    @property
+    def level(self):
+        """Poziom LOD siatki w przednim buforze."""
+        return 0 if self.version is None else self.version[1]
+
+    def upload(self, vertices, version, stream=None):
+        """
+        Wysyła siatkę do tylnego bufora i zamienia bufory.
+
+        :param np.array vertices: Tablica wierzchołków.
+        :param tuple version: (wersja chunka, poziom LOD), z których zbudowano siatkę.
+        :param StreamBuffer stream: Pierścień do wysyłania danych lub None.
+        :return: Liczba wysłanych bajtów.
+        """
+        back = 1 - self.front
+        uploaded = upload_mesh(self.vbos[back], vertices, stream)
+        self.counts[back] = len(vertices)
+        self.front = back
+        self.version = version
+        return uploaded
+
+    def release(self):
+        """Zwalnia VAO i bufory siatki."""
+        GL.glDeleteBuffers(2, self.vbos)
+        GL.glDeleteVertexArrays(2, self.vaos)
+
+
+"""
+Renderer świata podzielonego na chunki. W trybie instancjonowanym każdy chunk ma własne VAO
+i bufory instancji, w trybie siatek - VAO z siatką odsłoniętych ścian. Bufory chunka
+są aktualizowane tylko wtedy, gdy zmieni się wersja chunka.
+
+Dalekie chunki są rysowane z piramidy LOD (patrz lod): poziom jest wybierany w draw według
+odległości chunka od kamery, a bufory wybranego poziomu powstają przy najbliższym sync.
+Do tego czasu chunk jest rysowany z buforów poziomu, który już jest na GPU.
+"""
+class ChunkRenderer:
+    def __init__(self, vbo_cube, num_cube_vertices, mode=MODE_INSTANCED, scheduler=None, upload_budget=MESH_UPLOAD_BUDGET,
+                 lod_distance=LOD_DISTANCE, lod_hysteresis=LOD_HYSTERESIS, stream=None):
+        self.vbo_cube = vbo_cube
+        self.num_cube_vertices = num_cube_vertices
+        self.mode = mode
+        self.scheduler = scheduler         # MeshScheduler lub None (siatki budowane w wątku renderowania)
+        self.upload_budget = upload_budget
+        self.stream = stream               # StreamBuffer do wysyłania danych lub None (glBufferData/glBufferSubData)
+        self.lod_distance = lod_distance   # odległość w voxelach, od której zaczyna się poziom 1 (0 lub None wyłącza LOD)
+        self.lod_hysteresis = lod_hysteresis
+        self.buffers = {}                  # klucz chunka -> [vao, vbo_instances, chunk, wersja]
+        self.lod_buffers = {}              # klucz chunka -> [vao, vbo_instances, chunk, wersja, poziom, liczba instancji]
+        self.meshes = {}                   # klucz chunka -> ChunkMesh
+        self.lod = {}                      # klucz chunka -> wybrany poziom LOD
+        self.synced_version = -1
+        self.uploaded_bytes = 0
+        self.upload_seconds = 0.0          # czas CPU synchronizacji, w których coś wysłano
+        self.triangles = 0                 # liczba trójkątów w ostatniej klatce
+        self.draw_calls = 0                # liczba wywołań rysowania w ostatniej klatce
+        self.drawn_chunks = 0              # chunki w ostrosłupie widzenia w ostatniej klatce
+        self.culled_chunks = 0             # chunki odrzucone w ostatniej klatce
+        self.visible_keys = set()          # chunki w ostrosłupie widzenia w ostatniej klatce
+        self.waiting_loads = False         # widoczne chunki z pliku sceny czekają na zdekodowanie
+        self.waiting_lod = False           # widoczne chunki czekają na bufory wybranego poziomu LOD
+        self.lod_chunks = 0                # chunki rysowane z piramidy LOD w ostatniej klatce
+        self.bounds_version = -1
+        self.bounds_cache = ([], np.zeros((0, 3)), np.zeros((0, 3)))
+
+    def set_mode(self, mode):
+        """
+        Przełącza sposób renderowania. Bufory nowego trybu zostaną zsynchronizowane przy najbliższym sync.
+
+        :param str mode: MODE_INSTANCED lub MODE_MESHED.
+        """
+        if mode != self.mode:
+            self.mode = mode
+            self.synced_version = -1
+
+    def pending(self):
+        """Sprawdza, czy w bieżącym trybie czekają siatki do zbudowania lub wysłania albo chunki do zdekodowania lub zmiany poziomu LOD."""
+        return self.waiting_loads or self.waiting_lod or (self.mode == MODE_MESHED and self.scheduler is not None and self.scheduler.pending())
+
+    def should_sync(self, key, chunk):
+        """
+        Sprawdza, czy chunk ma mieć bufory GPU. Chunk wczytany z pliku sceny, którego komórki
+        nie zostały jeszcze zdekodowane, jest dekodowany dopiero, gdy trafi do ostrosłupa widzenia.
+        """
+        return chunk.loaded or key in self.visible_keys
+
+    def meshes_ready(self):
+        """Sprawdza, czy w bieżącym trybie czekają zbudowane siatki do wysłania lub chunki do zdekodowania lub zmiany poziomu LOD (wymagają kolejnej klatki)."""
+        return self.waiting_loads or self.waiting_lod or (self.mode == MODE_MESHED and self.scheduler is not None and self.scheduler.has_ready())
+
+    def sync(self, world):
+        """
+        Synchronizuje bufory GPU bieżącego trybu z chunkami świata: tworzy bufory nowych chunków,
+        wysyła zmiany zmienionych i zwalnia bufory chunków usuniętych. Dane wysyłane przez
+        StreamBuffer trafiają do buforów przed powrotem z tej metody (flush).
+
+        :param VoxelEditor world: Obiekt świata voxelowego.
+        :return: Liczba wysłanych bajtów.
+        """
+        if world.version == self.synced_version and not self.pending():
+            return 0
+
+        start = time.perf_counter()
+        if self.mode == MODE_MESHED:
+            uploaded = self._sync_meshes(world)
+        else:
+            uploaded = self._sync_instances(world)
+        if self.stream is not None:
+            self.stream.flush()
+        if uploaded:
+            self.upload_seconds += time.perf_counter() - start
+
+        for key in [k for k in self.lod if k not in world.chunks]:
+            del self.lod[key]
+        self.synced_version = world.version
+        self.uploaded_bytes += uploaded
+        return uploaded
+
+    def upload_rate(self):
+        """Średnia przepustowość wysyłania danych chunków (MiB na sekundę czasu CPU synchronizacji)."""
+        return self.uploaded_bytes / 2**20 / self.upload_seconds if self.upload_seconds > 0 else 0.0
+
+    def _sync_instances(self, world):
+        """Synchronizuje bufory instancji chunków."""
+        uploaded = 0
+        for key, chunk in world.chunks.items():
+            if not self.should_sync(key, chunk):
+                continue
+            entry = self.buffers.get(key)
+            if entry is None:
+                vao, vbo_instances = create_instance_vao(self.vbo_cube)
+                entry = [vao, vbo_instances, None, -1]
+                self.buffers[key] = entry
+            if entry[2] is not chunk:
+                # nowy (lub ponownie zaalokowany) chunk wymaga pełnego wysłania bufora
+                chunk.instances.resized = True
+                entry[2] = chunk
+                entry[3] = -1
+            if entry[3] != chunk.version:
+                uploaded += update_instance_buffers(entry[1], chunk.instances, self.stream)
+                entry[3] = chunk.version
+
+            level = self.lod.get(key, 0)
+            if level == 0:
+                continue
+            lod_entry = self.lod_buffers.get(key)
+            if lod_entry is None:
+                vao, vbo_instances = create_instance_vao(self.vbo_cube)
+                lod_entry = [vao, vbo_instances, None, -1, 0, 0]
+                self.lod_buffers[key] = lod_entry
+            if lod_entry[2] is not chunk or lod_entry[3:5] != [chunk.version, level]:
+                # instancje poziomu są wysyłane w całości (glBufferData, jak siatka)
+                instances = lod_instances(chunk.lod(level))
+                uploaded += upload_mesh(lod_entry[1], instances, self.stream)
+                lod_entry[2:] = [chunk, chunk.version, level, len(instances)]
+
+        for key in [k for k in self.buffers if k not in world.chunks]:
+            vao, vbo_instances, _, _ = self.buffers.pop(key)
+            GL.glDeleteBuffers(1, [vbo_instances])
+            GL.glDeleteVertexArrays(1, [vao])
+        for key in [k for k in self.lod_buffers if k not in world.chunks or self.lod.get(k, 0) == 0]:
+            self._release_lod_buffer(key)
+        return uploaded
+
+    def _release_lod_buffer(self, key):
+        """Zwalnia bufor instancji poziomu LOD chunka."""
+        vao, vbo_instances = self.lod_buffers.pop(key)[:2]
+        GL.glDeleteBuffers(1, [vbo_instances])
+        GL.glDeleteVertexArrays(1, [vao])
+
+    def _sync_meshes(self, world):
+        """
+        Zleca budowę siatek zmienionych chunków i wysyła gotowe siatki w ramach budżetu na klatkę.
+        Bez planisty siatki są budowane i wysyłane od razu.
+        """
+        uploaded = 0
+        if self.scheduler is not None:
+            # odbiór wyników przed zlecaniem nowych zadań: chunk, którego wynik okazał się
+            # nieaktualny, zostanie zlecony ponownie jeszcze w tej klatce
+            def is_current(key, version):
+                chunk = world.chunks.get(key)
+                mesh = self.meshes.get(key)
+                return chunk is not None and mesh is not None and mesh.chunk is chunk and (chunk.version, self.lod.get(key, 0)) == version
+
+            for key, version, vertices in self.scheduler.take_ready(is_current, self.upload_budget):
+                uploaded += self.meshes[key].upload(vertices, version, self.stream)
+
+        for key, chunk in world.chunks.items():
+            if not self.should_sync(key, chunk):
+                continue
+            mesh = self.meshes.get(key)
+            if mesh is None:
+                mesh = ChunkMesh()
+                self.meshes[key] = mesh
+            if mesh.chunk is not chunk:
+                mesh.chunk = chunk
+                mesh.requested = None
+            # siatka poziomu LOD powstaje z komórek poziomu (także sąsiadów), jak siatka pełnej rozdzielczości
+            version = (chunk.version, self.lod.get(key, 0))
+            if mesh.requested == version:
+                continue
+            if self.scheduler is None:
+                vertices = build_chunk_mesh(world.chunk_map.padded_cells(key, version[1]))
+                uploaded += mesh.upload(vertices, version, self.stream)
+                mesh.requested = version
+            elif not self.scheduler.busy(key):
+                # padded_cells zwraca kopię, więc dalsze edycje nie wpływają na zadanie w toku
+                self.scheduler.submit(key, version, world.chunk_map.padded_cells(key, version[1]))
+                mesh.requested = version
+
+        for key in [k for k in self.meshes if k not in world.chunks]:
+            self.meshes.pop(key).release()
+        return uploaded
+
+    def _chunk_bounds(self, world):
+        """
+        Zwraca klucze chunków i ich prostopadłościany otaczające jako tablice NumPy.
+        Wynik jest przeliczany tylko po zmianie świata.
+
+        :return: (keys, box_mins, box_maxs)
+        """
+        if self.bounds_version != world.version:
+            keys = list(world.chunks)
+            size = world.chunk_map.chunk_size * world.voxel_size
+            box_mins = np.array([world.chunks[k].origin for k in keys], dtype=np.float64).reshape(-1, 3) * world.voxel_size
+            self.bounds_cache = (keys, box_mins, box_mins + size)
+            self.bounds_version = world.version
+        return self.bounds_cache
+
+    def visible_chunks(self, world, view_proj, cam_pos):
+        """
+        Wybiera chunki przecinające ostrosłup widzenia, posortowane od najbliższego do kamery
+        (bliższe chunki zasłaniają dalsze, co zmniejsza pracę fragment shadera).
+
+        :param VoxelEditor world: Obiekt świata voxelowego.
+        :param np.array view_proj: Macierz proj @ view (4x4).
+        :param np.array cam_pos: Pozycja kamery lub None (bez sortowania).
+        :return: Lista kluczy widocznych chunków.
+        """
+        keys, box_mins, box_maxs = self._chunk_bounds(world)
+        if not keys:
+            self.drawn_chunks = self.culled_chunks = 0
+            return []
+        visible = boxes_in_frustum(frustum_planes(view_proj), box_mins, box_maxs)
+        idx = np.flatnonzero(visible)
+        if cam_pos is not None:
+            centers = (box_mins[idx] + box_maxs[idx]) * 0.5
+            idx = idx[np.argsort(np.sum((centers - cam_pos) ** 2, axis=1))]
+        self.drawn_chunks = len(idx)
+        self.culled_chunks = len(keys) - len(idx)
+        return [keys[i] for i in idx]
+
+    def choose_lod(self, world, keys, cam_pos):
+        """
+        Wybiera poziomy LOD chunków według odległości kamery od ich prostopadłościanów otaczających
+        (z histerezą, patrz lod.choose_lod_levels).
+
+        :param VoxelEditor world: Obiekt świata voxelowego.
+        :param list keys: Klucze chunków.
+        :param np.array cam_pos: Pozycja kamery.
+        """
+        if not keys:
+            return
+        c = world.chunk_map.chunk_size
+        origins = np.array([world.chunks[k].origin for k in keys], dtype=np.float64)
+        cam = np.asarray(cam_pos, dtype=np.float64) / world.voxel_size
+        gap = np.maximum(np.maximum(origins - cam, cam - (origins + c)), 0.0)
+        current = [self.lod.get(k, 0) for k in keys]
+        levels = choose_lod_levels(np.linalg.norm(gap, axis=1), current, max_lod_level(c), self.lod_distance, self.lod_hysteresis)
+        self.lod.update(zip(keys, levels.tolist()))
+
+    def draw(self, world, loc_chunk_origin, view_proj=None, cam_pos=None, loc_cell_scale=-1):
+        """
+        Rysuje widoczne chunki świata w bieżącym trybie jedną serią wywołań na poziom LOD i zlicza trójkąty.
+        Bez macierzy view_proj rysowane są wszystkie chunki, a bez pozycji kamery lub uniformu
+        boku komórki - wszystkie w pełnej rozdzielczości.
+
+        :param VoxelEditor world: Obiekt świata voxelowego.
+        :param int loc_chunk_origin: Lokalizacja uniformu narożnika chunka w aktywnym programie.
+        :param np.array view_proj: Macierz proj @ view (4x4) lub None.
+        :param np.array cam_pos: Pozycja kamery (do sortowania chunków i wyboru poziomu LOD).
+        :param int loc_cell_scale: Lokalizacja uniformu boku komórki w aktywnym programie (-1 wyłącza LOD).
+        :return: Liczba wywołań rysowania.
+        """
+        if view_proj is None:
+            keys = list(world.chunks)
+            self.drawn_chunks, self.culled_chunks = len(keys), 0
+        else:
+            keys = self.visible_chunks(world, view_proj, cam_pos)
+
+        if self.lod_distance and cam_pos is not None and loc_cell_scale != -1:
+            self.choose_lod(world, keys, cam_pos)
+        elif self.lod:
+            self.lod = {}
+
+        self.visible_keys = set(keys)
+        self.waiting_loads = self.waiting_lod = False
+        groups = {}                        # poziom LOD -> (vaos, narożniki, liczby)
+        triangles = 0
+        for key in keys:
+            chunk = world.chunks[key]
+            if not chunk.loaded:
+                # chunk zostanie zdekodowany przy najbliższym sync
+                self.waiting_loads = True
+                continue
+            level = self.lod.get(key, 0)
+            if self.mode == MODE_MESHED:
+                mesh = self.meshes.get(key)
+                if mesh is None:
+                    continue
+                # do czasu wysłania siatki nowego poziomu rysowana jest siatka poprzedniego
+                self.waiting_lod |= mesh.level != level
+                level, vao, count = mesh.level, mesh.vao, mesh.vertex_count
+                triangles += count // 3
+            else:
+                entry = self.buffers.get(key)
+                if entry is None:
+                    continue
+                lod_entry = self.lod_buffers.get(key)
+                if level > 0 and lod_entry is not None and lod_entry[2] is chunk and lod_entry[3:5] == [chunk.version, level]:
+                    vao, count = lod_entry[0], lod_entry[5]
+                else:
+                    self.waiting_lod |= level > 0
+                    level, vao, count = 0, entry[0], chunk.instances.count
+                triangles += count * self.num_cube_vertices // 3
+            if count == 0:
+                continue
+            vaos, origins, counts = groups.setdefault(level, ([], [], []))
+            vaos.append(vao)
+            origins.append(chunk.origin)
+            counts.append(count)
+
+        for level in sorted(groups):
+            vaos, origins, counts = groups[level]
+            if loc_cell_scale != -1:
+                GL.glUniform1f(loc_cell_scale, float(1 << level))
+            if self.mode == MODE_MESHED:
+                draw_mesh_batch(loc_chunk_origin, vaos, origins, counts)
+            else:
+                draw_voxels_batch(loc_chunk_origin, vaos, origins, self.num_cube_vertices, counts)
+        if loc_cell_scale != -1:
+            GL.glUniform1f(loc_cell_scale, 1.0)
+        self.triangles = triangles
+        self.draw_calls = sum(len(group[0]) for group in groups.values())
+        self.lod_chunks = sum(len(group[0]) for level, group in groups.items() if level > 0)
+        return self.draw_calls
+
+    def release(self):
+        """Zwalnia bufory GPU wszystkich chunków obu trybów."""
+        for vao, vbo_instances, _, _ in self.buffers.values():
+            GL.glDeleteBuffers(1, [vbo_instances])
+            GL.glDeleteVertexArrays(1, [vao])
+        for key in list(self.lod_buffers):
+            self._release_lod_buffer(key)
+        for mesh in self.meshes.values():
+            mesh.release()
+        self.buffers, self.meshes, self.lod = {}, {}, {}
+        self.synced_version = -1
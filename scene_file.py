@@ -0,0 +1,300 @@
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+from chunks import Chunk
+from voxel_editor import VoxelEditor
+
+"""
+Zapis i odczyt sceny w binarnym formacie podzielonym na chunki (.vxs).
+
+Układ pliku (little-endian):
+    nagłówek      HEADER: sygnatura, wersja, rozmiar chunka, rozmiar świata, rozmiar voxela,
+                  liczba chunków, położenie tabeli indeksu i bloku materiałów
+    dane chunków  zakodowane komórki kolejnych chunków
+    materiały     JSON z listą materiałów (nazwa, tekstura, odcień, parametry)
+    indeks        tablica INDEX_DTYPE, jeden wpis na niepusty chunk
+
+Chunk jest zapisywany jako jednolity (cała zawartość w polu value wpisu, bez danych),
+RLE (długości serii uint16, potem wartości uint8) albo zlib - wybierane jest krótsze kodowanie.
+Puste chunki nie są zapisywane wcale. Plik jest otwierany przez mmap, a komórki chunka są dekodowane
+dopiero przy pierwszym użyciu, więc otwarcie dużej sceny wymaga tylko odczytu indeksu.
+"""
+
+MAGIC = b"VXS1"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHIfIQQI")      # sygnatura, wersja, chunk, świat, voxel, chunki, indeks, materiały, długość materiałów
+
+ENC_UNIFORM = 1                            # cały chunk ma jedną wartość komórki (bez danych)
+ENC_RLE = 2                                # serie: długości uint16, potem wartości uint8
+ENC_ZLIB = 3                               # komórki skompresowane zlib
+ZLIB_LEVEL = 6
+
+INDEX_DTYPE = np.dtype([
+    ("key", "<i4", (3,)),                  # współrzędne chunka
+    ("encoding", "u1"),
+    ("value", "u1"),                       # wartość komórek chunka jednolitego
+    ("reserved", "<u2"),
+    ("count", "<u4"),                      # liczba pełnych voxeli
+    ("offset", "<u8"),                     # położenie danych w pliku
+    ("length", "<u4"),                     # długość danych w bajtach
+])
+
+
+def encode_chunk(cells):
+    """
+    Koduje komórki chunka najkrótszym z dostępnych kodowań.
+
+    :param np.array cells: Komórki chunka (C, C, C) uint8.
+    :return: (kodowanie, wartość dla ENC_UNIFORM, dane w bajtach)
+    """
+    flat = cells.reshape(-1)
+    if (flat == flat[0]).all():
+        return ENC_UNIFORM, int(flat[0]), b""
+
+    starts = np.flatnonzero(np.r_[True, flat[1:] != flat[:-1]])
+    lengths = np.diff(np.r_[starts, len(flat)])
+    packed = zlib.compress(flat.tobytes(), ZLIB_LEVEL)
+    if lengths.max() <= 0xFFFF and len(starts) * 3 < len(packed):
+        return ENC_RLE, 0, lengths.astype("<u2").tobytes() + flat[starts].tobytes()
+    return ENC_ZLIB, 0, packed
+
+
+def decode_payload(encoding, value, payload, size):
+    """
+    Dekoduje komórki chunka.
+
+    :param int encoding: Kodowanie (ENC_UNIFORM, ENC_RLE lub ENC_ZLIB).
+    :param int value: Wartość komórek chunka jednolitego.
+    :param payload: Dane chunka (bytes lub memoryview).
+    :param int size: Rozmiar chunka.
+    :return: Tablica uint8 (C, C, C).
+    """
+    shape = (size, size, size)
+    if encoding == ENC_UNIFORM:
+        return np.full(shape, value, dtype=np.uint8)
+    if encoding == ENC_RLE:
+        runs = len(payload) // 3
+        lengths = np.frombuffer(payload, dtype="<u2", count=runs)
+        values = np.frombuffer(payload, dtype=np.uint8, count=runs, offset=runs * 2)
+        return np.repeat(values, lengths).reshape(shape)
+    if encoding == ENC_ZLIB:
+        return np.frombuffer(zlib.decompress(payload), dtype=np.uint8).reshape(shape).copy()
+    raise ValueError(f"Nieznane kodowanie chunka: {encoding}")
+
+
+"""
+Otwarty plik sceny: mapowanie pamięci, nagłówek i tabela indeksu. Chunki świata utworzonego
+przez open_scene odwołują się do tego obiektu i dekodują swoje komórki przy pierwszym użyciu.
+Gdy plik jest zastępowany nowym (replace_scene_file), mapowanie jest zamykane i tworzone na nowo,
+a numery wpisów z chwili otwarcia wskazują dalej chunki o tych samych kluczach.
+"""
+class SceneFile:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()       # chroni mapowanie przed zamianą pliku w innym wątku (autozapis)
+        self.mmap = None
+        self._map()
+
+    def _map(self):
+        """Mapuje plik i wczytuje nagłówek, tabelę indeksu (kopia, niezależna od mapowania) i materiały."""
+        path = self.path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.chunk_size, self.grid_size, self.voxel_size, n_chunks, index_offset, materials_offset, materials_length = \
+            HEADER.unpack_from(self.mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: to nie jest plik sceny")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: nieobsługiwana wersja formatu {version}")
+        self.index = np.frombuffer(self.mmap, dtype=INDEX_DTYPE, count=n_chunks, offset=index_offset).copy()
+        self.materials = json.loads(bytes(self.mmap[materials_offset:materials_offset + materials_length]).decode("utf-8"))
+
+    def close(self):
+        """
+        Zamyka mapowanie pliku (np. przed zastąpieniem pliku, czego Windows nie pozwala zrobić
+        z plikiem zmapowanym). Widoki zwrócone przez payload muszą być wcześniej zwolnione.
+        """
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+    def reopen(self):
+        """
+        Mapuje na nowo plik o tej samej ścieżce (po jego zastąpieniu). Tabela indeksu jest
+        ułożona według numerów wpisów z chwili otwarcia, więc chunki (SceneFile, wpis) nie
+        wymagają zmiany; wpisy, których klucza nie ma w nowym pliku, nie nadają się do dekodowania.
+        """
+        keys = self.index["key"].copy()
+        self.close()
+        self._map()
+        rows = {key: row for row, key in enumerate(map(tuple, self.index["key"].tolist()))}
+        found = np.array([rows.get(key, -1) for key in map(tuple, keys.tolist())], dtype=np.int64)
+        index = self.index[np.maximum(found, 0)] if len(self.index) else np.zeros(len(keys), dtype=INDEX_DTYPE)
+        index["key"] = keys
+        index["encoding"][found < 0] = 0
+        self.index = index
+
+    def payload(self, entry):
+        """Zwraca widok na dane chunka w pliku (bez kopiowania)."""
+        row = self.index[entry]
+        offset = int(row["offset"])
+        return memoryview(self.mmap)[offset:offset + int(row["length"])]
+
+    def decode_chunk(self, entry):
+        """
+        Dekoduje komórki chunka.
+
+        :param int entry: Numer wpisu w tabeli indeksu.
+        :return: Tablica uint8 (C, C, C).
+        """
+        with self.lock:
+            row = self.index[entry]
+            payload = self.payload(entry)
+            try:
+                return decode_payload(int(row["encoding"]), int(row["value"]), payload, self.chunk_size)
+            finally:
+                payload.release()
+
+
+def chunk_records(world):
+    """
+    Zwraca zakodowane chunki świata do zapisu. Chunki wczytane z pliku, których komórki
+    nie zostały zdekodowane, są przepisywane bez dekodowania.
+
+    :param VoxelEditor world: Obiekt świata voxelowego.
+    :return: Generator krotek (klucz, liczba voxeli, kodowanie, wartość, dane).
+    """
+    for key, chunk in world.chunks.items():
+        if chunk.count == 0:
+            continue
+        if chunk.loaded:
+            encoding, value, payload = encode_chunk(chunk.cells)
+        else:
+            scene, entry = chunk.source
+            row = scene.index[entry]
+            encoding, value, payload = int(row["encoding"]), int(row["value"]), scene.payload(entry)
+        yield key, chunk.count, encoding, value, payload
+
+
+def write_scene_file(path, grid_size, voxel_size, chunk_size, materials, records, scenes=()):
+    """
+    Zapisuje plik sceny z gotowych rekordów chunków. Plik powstaje obok docelowego
+    i zastępuje go dopiero po zapisaniu (i zsynchronizowaniu z dyskiem) w całości.
+
+    :param str path: Ścieżka pliku.
+    :param int grid_size: Rozmiar świata.
+    :param float voxel_size: Rozmiar voxela.
+    :param int chunk_size: Rozmiar chunka.
+    :param list materials: Lista materiałów (nazwa, plik tekstury, odcień, parametry oświetlenia).
+    :param records: Iterowalne krotki (klucz, liczba voxeli, kodowanie, wartość, dane).
+    :param scenes: Otwarte pliki sceny o ścieżce path, mapowane na nowo po zastąpieniu pliku (patrz replace_scene_file).
+    :return: Liczba bajtów pliku.
+    """
+    index = []
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        offset = HEADER.size
+        for key, count, encoding, value, payload in records:
+            index.append((key, encoding, value, 0, count, offset, len(payload)))
+            f.write(payload)
+            offset += len(payload)
+            if isinstance(payload, memoryview):
+                # widok na mapowany plik źródłowy: zwolniony od razu, żeby ten plik można było zamknąć
+                payload.release()
+
+        materials_blob = json.dumps([list(m) for m in materials], ensure_ascii=False).encode("utf-8")
+        materials_offset = offset
+        f.write(materials_blob)
+        index_offset = materials_offset + len(materials_blob)
+        table = np.array(index, dtype=INDEX_DTYPE)
+        f.write(table.tobytes())
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, chunk_size, grid_size, voxel_size, len(table),
+                            index_offset, materials_offset, len(materials_blob)))
+        f.flush()
+        os.fsync(f.fileno())
+    replace_scene_file(tmp_path, path, scenes)
+    return index_offset + table.nbytes
+
+
+def replace_scene_file(tmp_path, path, scenes=()):
+    """
+    Zastępuje plik sceny nowym. Otwarte pliki tej sceny są na czas zamiany zamykane (zmapowanego
+    pliku nie da się zastąpić w systemie Windows), a potem mapowane na nowo, także gdy zamiana się nie powiedzie.
+
+    :param str tmp_path: Ścieżka zapisanego nowego pliku.
+    :param str path: Ścieżka zastępowanego pliku.
+    :param scenes: Otwarte pliki sceny (SceneFile) o ścieżce path, np. źródła niezdekodowanych chunków świata.
+    """
+    scenes = list(scenes)
+    for scene in scenes:
+        scene.lock.acquire()
+    try:
+        for scene in scenes:
+            scene.close()
+        os.replace(tmp_path, path)
+    finally:
+        for scene in scenes:
+            scene.reopen()
+            scene.lock.release()
+
+
+def mapped_scene_files(world, path):
+    """
+    Zwraca pliki sceny o ścieżce path, z których niezdekodowane chunki świata odczytują jeszcze komórki.
+
+    :param VoxelEditor world: Obiekt świata voxelowego.
+    :param str path: Ścieżka pliku sceny.
+    :return: Lista obiektów SceneFile.
+    """
+    path = os.path.abspath(path)
+    scenes = {}
+    for chunk in world.chunks.values():
+        if not chunk.loaded:
+            scene = chunk.source[0]
+            if os.path.abspath(scene.path) == path:
+                scenes[id(scene)] = scene
+    return list(scenes.values())
+
+
+def save_scene(world, path, materials):
+    """
+    Zapisuje świat do pliku sceny. Niezdekodowane chunki wczytane z tego samego pliku
+    odczytują po zapisie komórki z nowego pliku.
+
+    :param VoxelEditor world: Obiekt świata voxelowego.
+    :param str path: Ścieżka pliku.
+    :param list materials: Lista materiałów (nazwa, plik tekstury, odcień, parametry oświetlenia).
+    :return: Liczba bajtów pliku.
+    """
+    return write_scene_file(path, world.grid_size, world.voxel_size, world.chunk_map.chunk_size, materials, chunk_records(world),
+                            mapped_scene_files(world, path))
+
+
+def open_scene(path):
+    """
+    Otwiera plik sceny. Tworzone są tylko obiekty chunków z tabeli indeksu; ich komórki
+    są dekodowane z mapowanego pliku dopiero przy pierwszym odczycie lub narysowaniu.
+
+    :param str path: Ścieżka pliku.
+    :return: (VoxelEditor, lista materiałów)
+    """
+    scene = SceneFile(path)
+    world = VoxelEditor(scene.grid_size, scene.voxel_size, chunk_size=scene.chunk_size, seed=False)
+    chunks = world.chunks
+    for entry, (key, count) in enumerate(zip(scene.index["key"].tolist(), scene.index["count"].tolist())):
+        key = tuple(key)
+        chunks[key] = Chunk(key, scene.chunk_size, source=(scene, entry), count=count)
+    world.version += 1
+    materials = [(name, texture, tuple(tint), tuple(params)) for name, texture, tint, params in scene.materials]
+    return world, materials
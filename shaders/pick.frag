@@ -0,0 +1,11 @@
+#version 330 core
+
+in vec3 v_offset;
+flat in int v_face;
+
+// (x, y, z voxela, indeks ściany + 1); 0 w ostatniej składowej oznacza brak voxela
+layout(location = 0) out ivec4 out_id;
+
+void main() {
+    out_id = ivec4(ivec3(round(v_offset)), v_face + 1);
+}
@@ -0,0 +1,28 @@
+#version 330 core
+
+// wariant voxel.vert dla przebiegu wyboru: zamiast koloru przekazuje voxel i indeks ściany
+layout(location = 0) in vec3 in_pos;
+layout(location = 1) in uint in_packed;
+layout(location = 3) in vec3 in_normal;
+
+uniform mat4 u_view;
+uniform mat4 u_proj;
+uniform ivec3 u_chunk_origin;
+uniform float u_voxel_size;
+uniform float u_cell_scale;             // bok komórki w voxelach (2^poziom LOD chunka)
+
+out vec3 v_offset;
+flat out int v_face;
+
+
+void main() {
+    ivec3 local = ivec3(int(in_packed & 0xFFu), int((in_packed >> 8) & 0xFFu), int((in_packed >> 16) & 0xFFu));
+    vec3 voxel = vec3(u_chunk_origin) + vec3(local) * u_cell_scale;
+    gl_Position = u_proj * u_view * vec4(in_pos * u_cell_scale + voxel * u_voxel_size, 1.0);
+
+    // indeks ściany w kolejności FACE_DIRECTIONS (meshing.py): oś * 2 + (1 dla ujemnego zwrotu)
+    vec3 a = abs(in_normal);
+    int axis = a.x > 0.5 ? 0 : (a.y > 0.5 ? 1 : 2);
+    v_face = axis * 2 + (in_normal[axis] < 0.0 ? 1 : 0);
+    v_offset = voxel;
+}
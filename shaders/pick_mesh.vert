@@ -0,0 +1,32 @@
+#version 330 core
+
+// wariant voxel_mesh.vert dla przebiegu wyboru: zamiast koloru przekazuje voxel i indeks ściany
+layout(location = 0) in uint in_packed;
+
+uniform mat4 u_view;
+uniform mat4 u_proj;
+uniform ivec3 u_chunk_origin;
+uniform float u_voxel_size;
+uniform float u_cell_scale;             // bok komórki w voxelach (2^poziom LOD chunka)
+
+out vec3 v_offset;
+flat out int v_face;
+
+// kolejność jak FACE_DIRECTIONS w meshing.py
+const vec3 NORMALS[6] = vec3[6](
+    vec3(1.0, 0.0, 0.0), vec3(-1.0, 0.0, 0.0),
+    vec3(0.0, 1.0, 0.0), vec3(0.0, -1.0, 0.0),
+    vec3(0.0, 0.0, 1.0), vec3(0.0, 0.0, -1.0)
+);
+
+
+void main() {
+    ivec3 local = ivec3(int(in_packed & 0x1Fu), int((in_packed >> 5) & 0x1Fu), int((in_packed >> 10) & 0x1Fu));
+    int face = int((in_packed >> 15) & 0x7u);
+    vec3 pos = vec3(u_chunk_origin) + vec3(local) * u_cell_scale;
+    gl_Position = u_proj * u_view * vec4(pos * u_voxel_size, 1.0);
+
+    v_face = face;
+    // jak w voxel_mesh.vert: round(v_offset) w pick.frag daje voxel pod ścianą
+    v_offset = pos - 0.5 * NORMALS[face] - vec3(0.5);
+}
@@ -0,0 +1,13 @@
+#version 330 core
+
+in vec2 v_uv;
+
+uniform sampler2D u_atlas;
+uniform vec3 u_color;
+
+out vec4 FragColor;
+
+void main() {
+    float alpha = texture(u_atlas, v_uv).r;
+    FragColor = vec4(u_color, alpha);
+}
@@ -0,0 +1,14 @@
+#version 330 core
+
+layout(location = 0) in vec2 in_pos;      // pozycja w pikselach, (0, 0) w lewym dolnym rogu okna
+layout(location = 1) in vec2 in_uv;
+
+uniform vec2 u_screen_size;
+
+out vec2 v_uv;
+
+
+void main() {
+    gl_Position = vec4(in_pos / u_screen_size * 2.0 - 1.0, 0.0, 1.0);
+    v_uv = in_uv;
+}
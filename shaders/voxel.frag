@@ -11,21 +11,27 @@ uniform vec3 u_view_pos;
 uniform ivec3 u_selected;
 uniform bool  u_highlight_selected;
 
-uniform sampler2D u_textures[5];
-in float v_mat_id;
+uniform sampler2DArray u_material_tex;
+flat in int v_mat_id;
+
+// właściwości materiałów (MAX_MATERIALS w chunks.py), tabela budowana przez material_table()
+layout(std140) uniform Materials {
+    vec4 u_material_tint[255];
+    vec4 u_material_params[255];   // x: oświetlenie otoczenia, y: rozproszone
+};
 
 out vec4 FragColor;
 
 void main() {
-    int mid = int(v_mat_id + 0.5);
-    mid = clamp(mid, 0, 4);
-    vec3 texColor = texture(u_textures[mid], v_uv).rgb;
+    int mid = clamp(v_mat_id, 0, textureSize(u_material_tex, 0).z - 1);
+    vec3 texColor = texture(u_material_tex, vec3(v_uv, float(mid))).rgb * u_material_tint[mid].rgb;
+    vec4 params = u_material_params[mid];
     vec3 normal = normalize(v_normal);
-    vec3 ambient = 0.6 * texColor;
+    vec3 ambient = params.x * texColor;
 
     vec3 light_dir = normalize(u_light_pos - v_world_pos);
     float diff = max(dot(normal, light_dir), 0.0);
-    vec3 diffuse = diff * texColor * 0.75;
+    vec3 diffuse = diff * texColor * params.y;
     vec3 color = ambient + diffuse;
     
     if (u_highlight_selected) {
@@ -1,28 +1,32 @@
 #version 330 core
 
 layout(location = 0) in vec3 in_pos;      
-layout(location = 1) in vec3 in_offset;   
+layout(location = 1) in uint in_packed;   // x, y, z względem narożnika chunka i materiał, po 8 bitów
 layout(location = 2) in vec2 in_uv;       
 layout(location = 3) in vec3 in_normal;
-layout(location = 4) in float in_mat_id;
 
 uniform mat4 u_view;
 uniform mat4 u_proj;
+uniform ivec3 u_chunk_origin;
+uniform float u_voxel_size;
+uniform float u_cell_scale;             // bok komórki w voxelach (2^poziom LOD chunka)
 
 out vec3 v_normal;
 out vec3 v_world_pos;
 out vec2 v_uv;
 out vec3 v_offset;
-out float v_mat_id;
+flat out int v_mat_id;
 
 
 void main() {
-    vec3 world_pos = in_pos + in_offset;
+    ivec3 local = ivec3(int(in_packed & 0xFFu), int((in_packed >> 8) & 0xFFu), int((in_packed >> 16) & 0xFFu));
+    vec3 voxel = vec3(u_chunk_origin) + vec3(local) * u_cell_scale;
+    vec3 world_pos = in_pos * u_cell_scale + voxel * u_voxel_size;
     gl_Position = u_proj * u_view * vec4(world_pos, 1.0);
 
     v_world_pos = world_pos;
     v_normal = in_normal;
     v_uv = in_uv;
-    v_offset = in_offset;
-    v_mat_id = in_mat_id;
-}
\ No newline at end of file
+    v_offset = voxel;
+    v_mat_id = int(in_packed >> 24);
+}
@@ -0,0 +1,43 @@
+#version 330 core
+
+// pozycja względem narożnika chunka (po 5 bitów na oś), indeks ściany (3 bity), materiał (8 bitów)
+layout(location = 0) in uint in_packed;
+
+uniform mat4 u_view;
+uniform mat4 u_proj;
+uniform ivec3 u_chunk_origin;
+uniform float u_voxel_size;
+uniform float u_cell_scale;             // bok komórki w voxelach (2^poziom LOD chunka)
+
+out vec3 v_normal;
+out vec3 v_world_pos;
+out vec2 v_uv;
+out vec3 v_offset;
+flat out int v_mat_id;
+
+// kolejność jak FACE_DIRECTIONS w meshing.py
+const vec3 NORMALS[6] = vec3[6](
+    vec3(1.0, 0.0, 0.0), vec3(-1.0, 0.0, 0.0),
+    vec3(0.0, 1.0, 0.0), vec3(0.0, -1.0, 0.0),
+    vec3(0.0, 0.0, 1.0), vec3(0.0, 0.0, -1.0)
+);
+
+
+void main() {
+    ivec3 local = ivec3(int(in_packed & 0x1Fu), int((in_packed >> 5) & 0x1Fu), int((in_packed >> 10) & 0x1Fu));
+    int face = int((in_packed >> 15) & 0x7u);
+    int axis = face / 2;
+    vec3 normal = NORMALS[face];
+    vec3 pos = vec3(u_chunk_origin) + vec3(local) * u_cell_scale;
+    vec3 world_pos = pos * u_voxel_size;
+    gl_Position = u_proj * u_view * vec4(world_pos, 1.0);
+
+    v_world_pos = world_pos;
+    v_normal = normal;
+    // współrzędne tekstury z pozycji, aby tekstura powtarzała się co voxel także na połączonych ścianach
+    v_uv = vec2(axis == 0 ? pos.z : pos.x, axis == 1 ? pos.z : pos.y);
+    // połączona ściana obejmuje wiele voxeli, więc voxel wyznaczamy dla każdego fragmentu:
+    // round(v_offset) w voxel.frag daje floor(pozycja - normalna / 2), czyli voxel pod ścianą
+    v_offset = pos - 0.5 * normal - vec3(0.5);
+    v_mat_id = int(in_packed >> 18);
+}
@@ -0,0 +1,191 @@
+import ctypes
+import time
+
+import OpenGL.GL as GL
+import numpy as np
+
+"""
+Strumieniowe wysyłanie danych na GPU przez pierścień segmentów w jednym dużym buforze.
+
+Zamiast glBufferData/glBufferSubData z tablicy NumPy (sterownik kopiuje dane i może czekać,
+aż GPU przestanie używać docelowego bufora) dane są zapisywane bezpośrednio do zmapowanego
+segmentu pierścienia (glMapBufferRange bez synchronizacji), a potem kopiowane na GPU
+do buforów docelowych przez glCopyBufferSubData. Po kopiach segment dostaje fence i wraca
+do użytku dopiero po STREAM_SEGMENTS klatkach, gdy GPU na pewno skończyło go czytać,
+więc w zwykłym przypadku mapowanie nie czeka na GPU wcale. Oczekiwania na fence są liczone
+jako zatrzymania.
+
+Użycie w jednej klatce: alloc (albo upload) dowolną liczbę razy, potem jeden flush przed rysowaniem.
+"""
+
+STREAM_SEGMENTS = 3                        # segmenty pierścienia (potrójne buforowanie)
+STREAM_SEGMENT_SIZE = 8 * 1024 * 1024      # pojemność segmentu w bajtach (dane wysyłane w jednej klatce)
+STREAM_ALIGNMENT = 16                      # wyrównanie przydziałów w segmencie
+STALL_WAIT_NS = 1000000                    # czas pojedynczego oczekiwania na fence (ns)
+MAP_FLAGS = (GL.GL_MAP_WRITE_BIT | GL.GL_MAP_INVALIDATE_RANGE_BIT
+             | GL.GL_MAP_UNSYNCHRONIZED_BIT | GL.GL_MAP_FLUSH_EXPLICIT_BIT)
+
+
+def _signaled(status):
+    """Czy wynik glClientWaitSync oznacza zakończenie pracy GPU przed fence (lub błąd oczekiwania)."""
+    return status in (GL.GL_ALREADY_SIGNALED, GL.GL_CONDITION_SATISFIED, GL.GL_WAIT_FAILED)
+
+
+"""
+Pierścień segmentów do strumieniowego wysyłania danych. Przydział zwraca przesunięcie
+w pierścieniu i zapisywalny widok NumPy na zmapowaną pamięć, który wywołujący wypełnia
+bez pośrednich kopii. Dane, które nie mieszczą się w segmencie, są wysyłane zwykłym
+glBufferSubData (w tej samej kolejności co kopie z pierścienia).
+"""
+class StreamBuffer:
+    def __init__(self, segment_size=STREAM_SEGMENT_SIZE, segments=STREAM_SEGMENTS):
+        self.segment_size = segment_size
+        self.segments = segments
+        self.buffer = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, self.buffer)
+        GL.glBufferData(GL.GL_COPY_READ_BUFFER, segment_size * segments, None, GL.GL_STREAM_DRAW)
+        GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, 0)
+        self.fences = [None] * segments    # fence ostatniego użycia każdego segmentu
+        self.segment = 0                   # segment zapisywany w bieżącej klatce
+        self.used = 0                      # bajty przydzielone w bieżącym segmencie
+        self.mapped = None                 # zmapowany segment (uint8) lub None
+        self.writes = []                   # [bufor docelowy, przesunięcie docelowe, źródło, bajty]; źródło to przesunięcie w pierścieniu lub tablica
+        self.started = None                # początek wysyłania w bieżącej klatce (perf_counter)
+
+        self.streamed_bytes = 0            # bajty wysłane przez pierścień
+        self.direct_bytes = 0              # bajty wysłane glBufferSubData (nie zmieściły się w segmencie)
+        self.frames = 0                    # klatki, w których użyto pierścienia
+        self.stalls = 0                    # mapowania, które musiały czekać na GPU
+        self.stall_seconds = 0.0
+        self.upload_seconds = 0.0          # czas CPU od pierwszego przydziału do końca flush
+
+    def alloc(self, count, dtype=np.uint8):
+        """
+        Przydziela miejsce w bieżącym segmencie. Przy pierwszym przydziale w klatce segment jest mapowany.
+        Widok jest ważny do najbliższego flush.
+
+        :param int count: Liczba elementów.
+        :param dtype: Typ elementów zwracanego widoku.
+        :return: (przesunięcie w pierścieniu w bajtach, zapisywalny widok (count,)) lub None, jeśli dane nie mieszczą się w segmencie.
+        """
+        nbytes = count * np.dtype(dtype).itemsize
+        size = -(-nbytes // STREAM_ALIGNMENT) * STREAM_ALIGNMENT
+        if size > self.segment_size - self.used:
+            return None
+        if self.started is None:
+            self.started = time.perf_counter()
+        if self.mapped is None:
+            self._map()
+        offset = self.used
+        self.used += size
+        return self.segment * self.segment_size + offset, self.mapped[offset:offset + nbytes].view(dtype)
+
+    def copy(self, offset, buffer, buffer_offset, nbytes):
+        """
+        Zleca skopiowanie przydzielonych danych do bufora docelowego (wykonywane w flush).
+
+        :param int offset: Przesunięcie danych w pierścieniu (z alloc).
+        :param int buffer: ID bufora docelowego.
+        :param int buffer_offset: Przesunięcie w buforze docelowym w bajtach.
+        :param int nbytes: Liczba bajtów.
+        """
+        self.writes.append([buffer, buffer_offset, offset, nbytes])
+
+    def upload(self, buffer, buffer_offset, data):
+        """
+        Wysyła tablicę do bufora docelowego przez pierścień (albo glBufferSubData, gdy się nie mieści).
+        Dane trafiają do bufora dopiero w flush.
+
+        :param int buffer: ID bufora docelowego.
+        :param int buffer_offset: Przesunięcie w buforze docelowym w bajtach.
+        :param np.array data: Dane do wysłania.
+        :return: Liczba bajtów.
+        """
+        data = np.ascontiguousarray(data).reshape(-1)
+        if data.nbytes == 0:
+            return 0
+        allocated = self.alloc(data.size, data.dtype)
+        if allocated is None:
+            if self.started is None:
+                self.started = time.perf_counter()
+            self.writes.append([buffer, buffer_offset, data.copy(), data.nbytes])
+            return data.nbytes
+        offset, view = allocated
+        view[:] = data
+        self.copy(offset, buffer, buffer_offset, data.nbytes)
+        return data.nbytes
+
+    def _map(self):
+        """Mapuje bieżący segment, czekając na fence tylko wtedy, gdy GPU jeszcze go czyta."""
+        fence = self.fences[self.segment]
+        if fence is not None:
+            if not _signaled(GL.glClientWaitSync(fence, 0, 0)):
+                self.stalls += 1
+                start = time.perf_counter()
+                while not _signaled(GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, STALL_WAIT_NS)):
+                    pass
+                self.stall_seconds += time.perf_counter() - start
+            GL.glDeleteSync(fence)
+            self.fences[self.segment] = None
+
+        GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, self.buffer)
+        pointer = GL.glMapBufferRange(GL.GL_COPY_READ_BUFFER, self.segment * self.segment_size, self.segment_size, MAP_FLAGS)
+        GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, 0)
+        address = getattr(pointer, "value", pointer)
+        self.mapped = np.ctypeslib.as_array((ctypes.c_ubyte * self.segment_size).from_address(address))
+
+    def flush(self):
+        """
+        Kończy wysyłanie w bieżącej klatce: odmapowuje segment, wykonuje zlecone kopie i zapisy
+        w kolejności zlecenia, wstawia fence segmentu i przechodzi do następnego.
+        """
+        if self.started is None:
+            return
+        GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, self.buffer)
+        if self.mapped is not None:
+            GL.glFlushMappedBufferRange(GL.GL_COPY_READ_BUFFER, 0, self.used)
+            GL.glUnmapBuffer(GL.GL_COPY_READ_BUFFER)
+            self.mapped = None
+
+        for buffer, buffer_offset, source, nbytes in self.writes:
+            GL.glBindBuffer(GL.GL_COPY_WRITE_BUFFER, buffer)
+            if isinstance(source, np.ndarray):
+                GL.glBufferSubData(GL.GL_COPY_WRITE_BUFFER, buffer_offset, nbytes, source)
+                self.direct_bytes += nbytes
+            else:
+                GL.glCopyBufferSubData(GL.GL_COPY_READ_BUFFER, GL.GL_COPY_WRITE_BUFFER, source, buffer_offset, nbytes)
+                self.streamed_bytes += nbytes
+        GL.glBindBuffer(GL.GL_COPY_WRITE_BUFFER, 0)
+        GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, 0)
+
+        if self.used:
+            self.fences[self.segment] = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+            self.segment = (self.segment + 1) % self.segments
+            self.frames += 1
+        self.used = 0
+        self.writes = []
+        self.upload_seconds += time.perf_counter() - self.started
+        self.started = None
+
+    def throughput(self):
+        """Średnia przepustowość wysyłania (MiB na sekundę czasu CPU spędzonego na wysyłaniu)."""
+        total = self.streamed_bytes + self.direct_bytes
+        return total / 2**20 / self.upload_seconds if self.upload_seconds > 0 else 0.0
+
+    def status(self):
+        """Zwraca krótki opis liczników do HUD."""
+        return (f"pierscien {self.streamed_bytes / 2**20:.1f} MiB, bezposrednio {self.direct_bytes / 2**20:.1f} MiB, "
+                f"{self.throughput():.0f} MiB/s, zatrzymania {self.stalls}")
+
+    def release(self):
+        """Zwalnia bufor pierścienia i fence."""
+        if self.mapped is not None:
+            GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, self.buffer)
+            GL.glUnmapBuffer(GL.GL_COPY_READ_BUFFER)
+            GL.glBindBuffer(GL.GL_COPY_READ_BUFFER, 0)
+            self.mapped = None
+        for fence in self.fences:
+            if fence is not None:
+                GL.glDeleteSync(fence)
+        self.fences = [None] * self.segments
+        GL.glDeleteBuffers(1, [self.buffer])
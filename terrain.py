@@ -0,0 +1,399 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from constants import CHUNK_SIZE, VOXEL_SIZE
+from scene_file import encode_chunk, write_scene_file
+from voxel_editor import VoxelEditor
+
+"""
+Proceduralny generator terenu: mapa wysokości z szumu (wartości albo simplex, kilka oktaw),
+warstwy materiałów (kamień, a na nim trawa albo piasek na wybrzeżach; odsłonięte szczyty
+z kamienia) i drzewa (pień z drewna, korona z liści).
+
+Szum jest liczony wektorowo w NumPy z mieszającego skrótu współrzędnych siatki, więc wartość
+w danym punkcie nie zależy od tego, który fragment świata jest generowany. Dzięki temu świat
+dzieli się na kafelki kolumn chunków generowane niezależnie w puli procesów: każdy proces
+zapisuje swój kafelek do wspólnego bufora w pamięci współdzielonej (bez kopiowania wyników
+między procesami), a drzewa na granicach kafelków są dokładnie takie same po obu stronach.
+Przy zapisie do pliku procesy od razu kodują też chunki swojego kafelka.
+
+Uruchomienie bez okna (zapis sceny do pliku):
+    python terrain.py --size 512 --height 128 --seed 7 --out swiat.vxs
+"""
+
+TERRAIN_SIZE = 512                         # domyślny rozmiar świata w osiach X i Z
+TERRAIN_HEIGHT = 128                       # domyślna wysokość generowanego obszaru (oś Y)
+TILE = 64                                  # bok kafelka kolumn generowanego przez jedno zadanie (wielokrotność CHUNK_SIZE)
+NOISE_VALUE = "value"
+NOISE_SIMPLEX = "simplex"
+FEATURE_SCALE = 160.0                      # rozmiar największych form terenu w voxelach
+OCTAVES = 5
+NOISE_CONTRAST = 1.4                       # suma oktaw rzadko wychodzi poza [-0.7, 0.7], więc jest rozciągana
+HEIGHT_EXPONENT = 1.3                      # >1 spłaszcza niziny i wyostrza wzgórza
+SEA_LEVEL = 0.22                           # poziom wybrzeża jako ułamek wysokości (niżej piasek)
+ROCK_LEVEL = 0.6                           # poziom, powyżej którego powierzchnia jest skalista
+SOIL_DEPTH = 3                             # grubość wierzchniej warstwy trawy lub piasku
+TREE_DENSITY = 0.35                        # prawdopodobieństwo drzewa w komórce siatki drzew
+TREE_CELL = 8                              # bok komórki siatki drzew (najwyżej jedno drzewo na komórkę)
+TREE_RADIUS = 2                            # promień korony
+TRUNK_MIN, TRUNK_MAX = 4, 7                # zakres wysokości pnia
+# materiały jak w materials.MATERIALS
+MAT_WOOD, MAT_GRASS, MAT_STONE, MAT_SAND, MAT_LEAVES = 0, 1, 2, 3, 4
+
+_F2 = 0.5 * (np.sqrt(3.0) - 1.0)           # skos siatki simplex 2D
+_G2 = (3.0 - np.sqrt(3.0)) / 6.0
+_GRADIENTS = np.array([(1, 1), (-1, 1), (1, -1), (-1, -1), (1, 0), (-1, 0), (0, 1), (0, -1)], dtype=np.float64)
+_LEAF_OFFSETS = np.array([(dx, dy, dz)
+                          for dx in range(-TREE_RADIUS, TREE_RADIUS + 1)
+                          for dy in range(-TREE_RADIUS, TREE_RADIUS + 1)
+                          for dz in range(-TREE_RADIUS, TREE_RADIUS + 1)
+                          if dx * dx + dy * dy + dz * dz <= TREE_RADIUS * TREE_RADIUS + 1], dtype=np.int64)
+
+
+def _hash(ix, iz, seed):
+    """
+    Mieszający skrót całkowitych współrzędnych siatki (ten sam w każdym procesie i kafelku).
+
+    :param np.array ix: Współrzędne X (int).
+    :param np.array iz: Współrzędne Z (int).
+    :param int seed: Ziarno.
+    :return: Tablica uint32.
+    """
+    h = (np.asarray(ix).astype(np.uint32) * np.uint32(0x8DA6B343)) ^ (np.asarray(iz).astype(np.uint32) * np.uint32(0xD8163841))
+    h ^= np.uint32((seed * 0x9E3779B9) & 0xFFFFFFFF)
+    h ^= h >> np.uint32(16)
+    h *= np.uint32(0x7FEB352D)
+    h ^= h >> np.uint32(15)
+    h *= np.uint32(0x846CA68B)
+    h ^= h >> np.uint32(16)
+    return h
+
+
+def _random(ix, iz, seed):
+    """Liczby pseudolosowe w [0, 1) przypisane punktom siatki."""
+    return _hash(ix, iz, seed) * (1.0 / 2**32)
+
+
+def value_noise(x, z, seed=0):
+    """
+    Szum wartości 2D: losowe wartości w węzłach siatki całkowitej interpolowane gładko.
+
+    :param np.array x: Współrzędne X (float).
+    :param np.array z: Współrzędne Z (float, ten sam kształt lub rozgłaszalny).
+    :param int seed: Ziarno.
+    :return: Tablica float64 wartości w [-1, 1].
+    """
+    x0, z0 = np.floor(x), np.floor(z)
+    fx, fz = x - x0, z - z0
+    ix, iz = x0.astype(np.int64), z0.astype(np.int64)
+    u, v = fx * fx * (3.0 - 2.0 * fx), fz * fz * (3.0 - 2.0 * fz)
+    a = _random(ix, iz, seed) * (1 - u) + _random(ix + 1, iz, seed) * u
+    b = _random(ix, iz + 1, seed) * (1 - u) + _random(ix + 1, iz + 1, seed) * u
+    return (a * (1 - v) + b * v) * 2.0 - 1.0
+
+
+def simplex_noise(x, z, seed=0):
+    """
+    Szum simplex 2D (siatka trójkątów, gradienty w węzłach), bez kierunkowych artefaktów szumu wartości.
+
+    :param np.array x: Współrzędne X (float).
+    :param np.array z: Współrzędne Z (float, ten sam kształt lub rozgłaszalny).
+    :param int seed: Ziarno.
+    :return: Tablica float64 wartości w przybliżeniu w [-1, 1].
+    """
+    x, z = np.broadcast_arrays(np.asarray(x, dtype=np.float64), np.asarray(z, dtype=np.float64))
+    s = (x + z) * _F2
+    i, j = np.floor(x + s), np.floor(z + s)
+    t = (i + j) * _G2
+    x0, z0 = x - (i - t), z - (j - t)
+    # drugi wierzchołek trójkąta zależy od tego, w której połowie komórki leży punkt
+    i1 = (x0 > z0).astype(np.float64)
+    j1 = 1.0 - i1
+    corners = (
+        (i, j, x0, z0),
+        (i + i1, j + j1, x0 - i1 + _G2, z0 - j1 + _G2),
+        (i + 1.0, j + 1.0, x0 - 1.0 + 2.0 * _G2, z0 - 1.0 + 2.0 * _G2),
+    )
+    total = np.zeros_like(x)
+    for ci, cj, dx, dz in corners:
+        falloff = np.maximum(0.5 - dx * dx - dz * dz, 0.0)
+        gradient = _GRADIENTS[_hash(ci.astype(np.int64), cj.astype(np.int64), seed) & np.uint32(7)]
+        total += falloff ** 4 * (gradient[..., 0] * dx + gradient[..., 1] * dz)
+    return 70.0 * total
+
+
+NOISES = {
+    NOISE_VALUE: value_noise,
+    NOISE_SIMPLEX: simplex_noise,
+}
+
+
+def fractal_noise(x, z, seed=0, noise=NOISE_SIMPLEX, octaves=OCTAVES):
+    """
+    Suma oktaw szumu (każda o dwukrotnie większej częstotliwości i o połowę mniejszej amplitudzie).
+
+    :return: Tablica float64 wartości w przybliżeniu w [-1, 1].
+    """
+    fn = NOISES[noise]
+    total = 0.0
+    amplitude, frequency, norm = 1.0, 1.0, 0.0
+    for octave in range(octaves):
+        total = total + amplitude * fn(x * frequency, z * frequency, seed + octave)
+        norm += amplitude
+        amplitude *= 0.5
+        frequency *= 2.0
+    return total / norm
+
+
+def heightmap(x0, z0, width, depth, height, seed=0, noise=NOISE_SIMPLEX):
+    """
+    Wysokości kolumn terenu w prostokącie kolumn.
+
+    :param int x0: Początek prostokąta w osi X.
+    :param int z0: Początek prostokąta w osi Z.
+    :param int width: Liczba kolumn w osi X.
+    :param int depth: Liczba kolumn w osi Z.
+    :param int height: Wysokość generowanego obszaru.
+    :param int seed: Ziarno.
+    :param str noise: Rodzaj szumu (NOISE_VALUE lub NOISE_SIMPLEX).
+    :return: Tablica int64 (width, depth) wysokości (liczba pełnych voxeli kolumny, co najmniej 1).
+    """
+    x = np.arange(x0, x0 + width, dtype=np.float64)[:, None] / FEATURE_SCALE
+    z = np.arange(z0, z0 + depth, dtype=np.float64)[None, :] / FEATURE_SCALE
+    e = np.clip((fractal_noise(x, z, seed, noise) * NOISE_CONTRAST + 1.0) * 0.5, 0.0, 1.0) ** HEIGHT_EXPONENT
+    # nad najwyższym terenem zostaje miejsce na drzewo
+    top = height - TRUNK_MAX - TREE_RADIUS - 1
+    return (1 + e * (top - 1)).astype(np.int64)
+
+
+def _trees(x0, z0, x1, z1, heights, height, seed, density):
+    """
+    Drzewa, których pień lub korona mogą sięgać do prostokąta kolumn [x0, x1) x [z0, z1).
+
+    :param np.array heights: Wysokości kolumn prostokąta powiększonego o TREE_RADIUS z każdej strony.
+    :return: (x, y podstawy pnia, z, wysokość pnia) - tablice int64.
+    """
+    r, c = TREE_RADIUS, TREE_CELL
+    gx, gz = np.meshgrid(np.arange((x0 - r) // c, (x1 + r - 1) // c + 1),
+                         np.arange((z0 - r) // c, (z1 + r - 1) // c + 1), indexing="ij")
+    gx, gz = gx.ravel(), gz.ravel()
+    keep = _random(gx, gz, seed + 101) < density
+    gx, gz = gx[keep], gz[keep]
+    tx = gx * c + (_hash(gx, gz, seed + 102) % np.uint32(c)).astype(np.int64)
+    tz = gz * c + (_hash(gx, gz, seed + 103) % np.uint32(c)).astype(np.int64)
+    trunk = TRUNK_MIN + (_hash(gx, gz, seed + 104) % np.uint32(TRUNK_MAX - TRUNK_MIN + 1)).astype(np.int64)
+    near = (tx >= x0 - r) & (tx < x1 + r) & (tz >= z0 - r) & (tz < z1 + r)
+    tx, tz, trunk = tx[near], tz[near], trunk[near]
+    base = heights[tx - (x0 - r), tz - (z0 - r)]
+    # drzewa rosną tylko na trawie
+    on_grass = (base > int(height * SEA_LEVEL) + 1) & (base < int(height * ROCK_LEVEL))
+    return tx[on_grass], base[on_grass], tz[on_grass], trunk[on_grass]
+
+
+def generate_tile(x0, z0, x1, z1, height, seed=0, noise=NOISE_SIMPLEX, tree_density=TREE_DENSITY):
+    """
+    Generuje komórki prostokąta kolumn [x0, x1) x [z0, z1) na pełną wysokość.
+
+    :param int height: Wysokość generowanego obszaru (oś Y).
+    :param int seed: Ziarno.
+    :param str noise: Rodzaj szumu (NOISE_VALUE lub NOISE_SIMPLEX).
+    :param float tree_density: Prawdopodobieństwo drzewa w komórce siatki drzew (0 wyłącza drzewa).
+    :return: Tablica uint8 (x1 - x0, height, z1 - z0) komórek (0 = pusto, materiał + 1).
+    """
+    r = TREE_RADIUS
+    heights = heightmap(x0 - r, z0 - r, x1 - x0 + 2 * r, z1 - z0 + 2 * r, height, seed, noise)
+    h = heights[r:-r, r:-r][:, None, :]
+    y = np.arange(height)[None, :, None]
+    sea, rock = int(height * SEA_LEVEL), int(height * ROCK_LEVEL)
+    surface = np.where(h <= sea + 1, MAT_SAND, np.where(h >= rock, MAT_STONE, MAT_GRASS))
+    material = np.where(y < h - SOIL_DEPTH, MAT_STONE, surface)
+    cells = np.where(y < h, material + 1, 0).astype(np.uint8)
+
+    if tree_density > 0:
+        tx, ty, tz, trunk = _trees(x0, z0, x1, z1, heights, height, seed, tree_density)
+        # najpierw wszystkie pnie, potem liście tylko w pustych komórkach: wynik nie zależy od podziału na kafelki
+        steps = np.arange(TRUNK_MAX)
+        mask = steps[None, :] < trunk[:, None]
+        px = np.broadcast_to(tx[:, None], mask.shape)[mask]
+        py = (ty[:, None] + steps[None, :])[mask]
+        pz = np.broadcast_to(tz[:, None], mask.shape)[mask]
+        inside = (px >= x0) & (px < x1) & (pz >= z0) & (pz < z1)
+        cells[px[inside] - x0, py[inside], pz[inside] - z0] = MAT_WOOD + 1
+
+        crowns = np.stack([tx, ty + trunk - 1, tz], axis=1)[:, None, :] + _LEAF_OFFSETS[None, :, :]
+        crowns = crowns.reshape(-1, 3)
+        inside = ((crowns[:, 0] >= x0) & (crowns[:, 0] < x1) & (crowns[:, 2] >= z0) & (crowns[:, 2] < z1)
+                  & (crowns[:, 1] >= 0) & (crowns[:, 1] < height))
+        lx, ly, lz = crowns[inside, 0] - x0, crowns[inside, 1], crowns[inside, 2] - z0
+        empty = cells[lx, ly, lz] == 0
+        cells[lx[empty], ly[empty], lz[empty]] = MAT_LEAVES + 1
+    return cells
+
+
+def tile_records(cells, x0, z0, chunk_size=CHUNK_SIZE):
+    """
+    Koduje niepuste chunki kafelka do zapisu w pliku sceny.
+
+    :param np.array cells: Komórki kafelka (jak z generate_tile), wymiary podzielne przez chunk_size.
+    :param int x0: Początek kafelka w osi X.
+    :param int z0: Początek kafelka w osi Z.
+    :param int chunk_size: Rozmiar chunka.
+    :return: Lista krotek (klucz, liczba voxeli, kodowanie, wartość, dane) jak w scene_file.chunk_records.
+    """
+    c = chunk_size
+    records = []
+    for lx in range(0, cells.shape[0], c):
+        for ly in range(0, cells.shape[1], c):
+            for lz in range(0, cells.shape[2], c):
+                block = cells[lx:lx + c, ly:ly + c, lz:lz + c]
+                count = int(np.count_nonzero(block))
+                if count:
+                    key = ((x0 + lx) // c, ly // c, (z0 + lz) // c)
+                    records.append((key, count, *encode_chunk(block)))
+    return records
+
+
+def _tiles(size, tile):
+    """Prostokąty kolumn kafelków (x0, z0, x1, z1) pokrywające świat."""
+    return [(x0, z0, min(x0 + tile, size), min(z0 + tile, size))
+            for x0 in range(0, size, tile) for z0 in range(0, size, tile)]
+
+
+def _generate_into(name, shape, tile, options, encode, chunk_size):
+    """
+    Zadanie procesu roboczego: generuje kafelek do bufora w pamięci współdzielonej.
+
+    :return: Rekordy chunków kafelka (gdy encode) lub None.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        x0, z0, x1, z1 = tile
+        cells = generate_tile(x0, z0, x1, z1, shape[1], **options)
+        out = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        out[x0:x1, :, z0:z1] = cells
+        del out                            # widok musi zniknąć przed zamknięciem pamięci
+        return tile_records(cells, x0, z0, chunk_size) if encode else None
+    finally:
+        shm.close()
+
+
+def generate(size=TERRAIN_SIZE, height=TERRAIN_HEIGHT, seed=0, noise=NOISE_SIMPLEX, tree_density=TREE_DENSITY,
+             workers=None, encode=False, consume=None, chunk_size=CHUNK_SIZE, tile=TILE):
+    """
+    Generuje świat kafelkami w puli procesów do wspólnego bufora w pamięci współdzielonej.
+
+    :param int size: Rozmiar świata w osiach X i Z (wielokrotność chunk_size).
+    :param int height: Wysokość generowanego obszaru (wielokrotność chunk_size).
+    :param int seed: Ziarno.
+    :param str noise: Rodzaj szumu (NOISE_VALUE lub NOISE_SIMPLEX).
+    :param float tree_density: Prawdopodobieństwo drzewa w komórce siatki drzew.
+    :param int workers: Liczba procesów (None = liczba rdzeni, 1 = bez puli procesów).
+    :param bool encode: Czy procesy mają też zakodować chunki kafelków do zapisu w pliku sceny.
+    :param consume: Funkcja (komórki (size, height, size), rekordy lub None) wywoływana, póki bufor istnieje, albo None.
+    :param int chunk_size: Rozmiar chunka.
+    :param int tile: Bok kafelka kolumn (wielokrotność chunk_size).
+    :return: Wynik consume (albo kopia komórek, gdy consume jest None).
+    """
+    if size % chunk_size or height % chunk_size or tile % chunk_size:
+        raise ValueError(f"Rozmiar, wysokość i kafelek muszą być wielokrotnościami rozmiaru chunka ({chunk_size})")
+    if noise not in NOISES:
+        raise ValueError(f"Nieznany rodzaj szumu: {noise!r} (dostępne: {', '.join(NOISES)})")
+    if consume is None:
+        consume = lambda cells, records: cells.copy()
+    options = dict(seed=seed, noise=noise, tree_density=tree_density)
+    shape = (size, height, size)
+    tiles = _tiles(size, tile)
+
+    if workers == 1:
+        cells = np.empty(shape, dtype=np.uint8)
+        records = [] if encode else None
+        for x0, z0, x1, z1 in tiles:
+            cells[x0:x1, :, z0:z1] = generate_tile(x0, z0, x1, z1, height, **options)
+            if encode:
+                records += tile_records(cells[x0:x1, :, z0:z1], x0, z0, chunk_size)
+        return consume(cells, records)
+
+    shm = shared_memory.SharedMemory(create=True, size=size * height * size)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_generate_into, shm.name, shape, t, options, encode, chunk_size) for t in tiles]
+            results = [f.result() for f in futures]
+        records = [r for result in results for r in result] if encode else None
+        cells = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        try:
+            return consume(cells, records)
+        finally:
+            del cells
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def generate_world(size=TERRAIN_SIZE, height=TERRAIN_HEIGHT, seed=0, noise=NOISE_SIMPLEX, tree_density=TREE_DENSITY,
+                   workers=None, voxel_size=VOXEL_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Tworzy świat z wygenerowanym terenem. Edytowalny obszar świata to sześcian o boku size.
+
+    :return: Obiekt VoxelEditor.
+    """
+    world = VoxelEditor(max(size, height), voxel_size, chunk_size=chunk_size, seed=False)
+
+    def consume(cells, records):
+        world.chunk_map.write_dense((0, 0, 0), cells)
+
+    generate(size, height, seed, noise, tree_density, workers, consume=consume, chunk_size=chunk_size)
+    world.version += 1
+    return world
+
+
+def generate_scene_file(path, materials, size=TERRAIN_SIZE, height=TERRAIN_HEIGHT, seed=0, noise=NOISE_SIMPLEX,
+                        tree_density=TREE_DENSITY, workers=None, voxel_size=VOXEL_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    Generuje teren i zapisuje go od razu do pliku sceny, bez budowania obiektu świata
+    (chunki są kodowane w procesach roboczych).
+
+    :param str path: Ścieżka pliku sceny.
+    :param list materials: Lista materiałów zapisywana w pliku sceny.
+    :return: (liczba bajtów pliku, liczba chunków)
+    """
+    def consume(cells, records):
+        records.sort(key=lambda record: record[0])
+        nbytes = write_scene_file(path, max(size, height), voxel_size, chunk_size, materials, records)
+        return nbytes, len(records)
+
+    return generate(size, height, seed, noise, tree_density, workers, encode=True, consume=consume, chunk_size=chunk_size)
+
+
+def parse_dimensions(text):
+    """
+    Rozpoznaje rozmiar świata zapisany jako "ROZMIARxWYSOKOŚĆ" lub "ROZMIAR" (wysokość domyślna).
+
+    :return: (rozmiar, wysokość)
+    """
+    size, _, height = text.lower().partition("x")
+    return int(size), int(height) if height else TERRAIN_HEIGHT
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generator terenu Voxel Editor 3D")
+    parser.add_argument("--size", type=int, default=TERRAIN_SIZE, help="rozmiar świata w osiach X i Z")
+    parser.add_argument("--height", type=int, default=TERRAIN_HEIGHT, help="wysokość generowanego obszaru")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--noise", choices=list(NOISES), default=NOISE_SIMPLEX)
+    parser.add_argument("--trees", type=float, default=TREE_DENSITY, metavar="GĘSTOŚĆ",
+                        help="prawdopodobieństwo drzewa w komórce siatki drzew (0 wyłącza drzewa)")
+    parser.add_argument("--workers", type=int, default=None, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument("--out", metavar="PLIK", required=True, help="plik sceny (.vxs) do zapisania")
+    args = parser.parse_args()
+
+    from materials import MATERIALS
+
+    start = time.perf_counter()
+    nbytes, chunks = generate_scene_file(args.out, MATERIALS, args.size, args.height, args.seed, args.noise, args.trees, args.workers)
+    print(f"Zapisano {args.out}: {args.size}x{args.height}x{args.size}, {chunks} chunków, {nbytes / 2**20:.1f} MiB, "
+          f"{time.perf_counter() - start:.2f} s ({args.workers or os.cpu_count()} procesów)")
@@ -0,0 +1,197 @@
+import ctypes
+
+import OpenGL.GL as GL
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from opengl_helpers import create_program
+
+"""
+Rysowanie tekstu interfejsu w profilu core. Znaki są rysowane raz do atlasu (tekstura
+jednokanałowa), a każdy napis jest zamieniany na prostokąty znaków tylko wtedy, gdy zmieni się
+jego treść lub położenie. Wszystkie napisy leżą w jednym buforze wierzchołków i są rysowane
+jednym wywołaniem glDrawArrays.
+"""
+
+HUD_FONT_SIZE = 14
+HUD_FONTS = ("DejaVuSans.ttf", "Arial.ttf", "arial.ttf")
+HUD_CHARSET = "".join(chr(c) for c in range(32, 127)) + "ąćęłńóśźżĄĆĘŁŃÓŚŹŻ"
+ATLAS_COLUMNS = 16
+VERTEX_FLOATS = 4                          # pozycja (2), uv (2)
+
+
+def load_font(size):
+    """
+    Wczytuje pierwszą dostępną czcionkę z HUD_FONTS, a w razie braku domyślną czcionkę Pillow.
+
+    :param int size: Rozmiar czcionki w pikselach.
+    :return: Czcionka ImageFont.
+    """
+    for name in HUD_FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size)
+
+
+"""
+Atlas znaków: obraz z komórkami o stałym rozmiarze, współrzędne tekstury komórek
+i szerokości znaków potrzebne do rozmieszczenia napisu.
+"""
+class GlyphAtlas:
+    def __init__(self, font_size=HUD_FONT_SIZE, charset=HUD_CHARSET):
+        font = load_font(font_size)
+        self.ascent, self.descent = font.getmetrics()
+        self.cell_w = max(font.getbbox(ch)[2] for ch in charset) + 1
+        self.cell_h = self.ascent + self.descent
+
+        rows = (len(charset) + ATLAS_COLUMNS - 1) // ATLAS_COLUMNS
+        width, height = ATLAS_COLUMNS * self.cell_w, rows * self.cell_h
+        image = Image.new("L", (width, height), 0)
+        draw = ImageDraw.Draw(image)
+        for i, ch in enumerate(charset):
+            row, col = divmod(i, ATLAS_COLUMNS)
+            draw.text((col * self.cell_w, row * self.cell_h), ch, fill=255, font=font)
+        self.pixels = np.asarray(image, dtype=np.uint8)
+
+        self.index = {ch: i for i, ch in enumerate(charset)}
+        self.fallback = self.index.get("?", 0)
+        self.advances = np.array([font.getlength(ch) for ch in charset], dtype=np.float32)
+
+        # wiersz 0 obrazu trafia do t = 0 tekstury, więc górna krawędź komórki ma mniejsze t
+        idx = np.arange(len(charset))
+        row, col = idx // ATLAS_COLUMNS, idx % ATLAS_COLUMNS
+        self.uv = np.stack([
+            col * self.cell_w / width, (col + 1) * self.cell_w / width,
+            row * self.cell_h / height, (row + 1) * self.cell_h / height,
+        ], axis=1).astype(np.float32)
+
+    def layout(self, x, y, text):
+        """
+        Zamienia napis na prostokąty znaków (po dwa trójkąty na znak).
+
+        :param float x: Początek napisu w pikselach (oś X).
+        :param float y: Linia bazowa napisu w pikselach (oś Y, od dołu okna).
+        :param str text: Napis.
+        :return: Tablica float32 (len(text) * 6, VERTEX_FLOATS).
+        """
+        if not text:
+            return np.zeros((0, VERTEX_FLOATS), dtype=np.float32)
+        idx = np.array([self.index.get(ch, self.fallback) for ch in text])
+        advances = self.advances[idx]
+        x0 = np.floor(x + np.concatenate([[0.0], np.cumsum(advances)[:-1]]))
+        x1 = x0 + self.cell_w
+        y0 = np.full_like(x0, y - self.descent)
+        y1 = np.full_like(x0, y + self.ascent)
+        u0, u1, t_top, t_bottom = self.uv[idx].T
+
+        quads = np.stack([
+            np.stack([x0, y0, u0, t_bottom], axis=1),
+            np.stack([x1, y0, u1, t_bottom], axis=1),
+            np.stack([x1, y1, u1, t_top], axis=1),
+            np.stack([x0, y0, u0, t_bottom], axis=1),
+            np.stack([x1, y1, u1, t_top], axis=1),
+            np.stack([x0, y1, u0, t_top], axis=1),
+        ], axis=1)
+        return quads.reshape(-1, VERTEX_FLOATS).astype(np.float32)
+
+
+"""
+Renderer napisów interfejsu. Napisy są identyfikowane kluczem; set_text przebudowuje
+wierzchołki tylko zmienionych napisów, a draw wysyła wspólny bufor tylko po zmianie.
+"""
+class TextRenderer:
+    def __init__(self, font_size=HUD_FONT_SIZE, color=(1.0, 1.0, 1.0)):
+        self.atlas = GlyphAtlas(font_size)
+        self.color = color
+        self.strings = {}                  # klucz -> (x, y, napis, wierzchołki)
+        self.dirty = True                  # wspólny bufor wymaga ponownego wysłania
+        self.vertex_count = 0
+
+        self.program = create_program("shaders/text.vert", "shaders/text.frag")
+        self.loc_screen_size = GL.glGetUniformLocation(self.program, "u_screen_size")
+        self.loc_color = GL.glGetUniformLocation(self.program, "u_color")
+        GL.glUseProgram(self.program)
+        GL.glUniform1i(GL.glGetUniformLocation(self.program, "u_atlas"), 0)
+
+        self.texture = GL.glGenTextures(1)
+        height, width = self.atlas.pixels.shape
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_R8, width, height, 0, GL.GL_RED, GL.GL_UNSIGNED_BYTE, self.atlas.pixels)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 4)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+        stride = VERTEX_FLOATS * 4
+        self.vao = GL.glGenVertexArrays(1)
+        GL.glBindVertexArray(self.vao)
+        self.vbo = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+        GL.glEnableVertexAttribArray(0)
+        GL.glVertexAttribPointer(0, 2, GL.GL_FLOAT, GL.GL_FALSE, stride, ctypes.c_void_p(0))
+        GL.glEnableVertexAttribArray(1)
+        GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE, stride, ctypes.c_void_p(8))
+        GL.glBindVertexArray(0)
+
+    def set_text(self, key, x, y, text):
+        """
+        Ustawia napis. Wierzchołki są budowane ponownie tylko po zmianie treści lub położenia.
+
+        :param key: Identyfikator napisu.
+        :param float x: Początek napisu w pikselach (oś X).
+        :param float y: Linia bazowa napisu w pikselach (oś Y, od dołu okna).
+        :param str text: Napis.
+        """
+        current = self.strings.get(key)
+        if current is not None and current[:3] == (x, y, text):
+            return
+        self.strings[key] = (x, y, text, self.atlas.layout(x, y, text))
+        self.dirty = True
+
+    def remove(self, key):
+        """Usuwa napis."""
+        if self.strings.pop(key, None) is not None:
+            self.dirty = True
+
+    def draw(self, width, height):
+        """
+        Rysuje wszystkie napisy jednym wywołaniem.
+
+        :param int width: Szerokość okna w pikselach.
+        :param int height: Wysokość okna w pikselach.
+        """
+        if self.dirty:
+            parts = [vertices for _, _, _, vertices in self.strings.values()]
+            vertices = np.concatenate(parts) if parts else np.zeros((0, VERTEX_FLOATS), dtype=np.float32)
+            GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, vertices.nbytes, vertices if len(vertices) else None, GL.GL_DYNAMIC_DRAW)
+            self.vertex_count = len(vertices)
+            self.dirty = False
+        if self.vertex_count == 0:
+            return
+
+        GL.glDisable(GL.GL_DEPTH_TEST)
+        GL.glEnable(GL.GL_BLEND)
+        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+
+        GL.glUseProgram(self.program)
+        GL.glUniform2f(self.loc_screen_size, float(width), float(height))
+        GL.glUniform3f(self.loc_color, *self.color)
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+        GL.glBindVertexArray(self.vao)
+        GL.glDrawArrays(GL.GL_TRIANGLES, 0, self.vertex_count)
+        GL.glBindVertexArray(0)
+
+        GL.glDisable(GL.GL_BLEND)
+        GL.glEnable(GL.GL_DEPTH_TEST)
+
+    def release(self):
+        """Zwalnia zasoby GPU."""
+        GL.glDeleteBuffers(1, [self.vbo])
+        GL.glDeleteVertexArrays(1, [self.vao])
+        GL.glDeleteTextures(1, [self.texture])
+        GL.glDeleteProgram(self.program)
@@ -21,6 +21,28 @@ def perspective(fov_y_deg, aspect, near, far):
     M[3, 2] = -1.0
     return M
 
+def perspective_inverse(fov_y_deg, aspect, near, far):
+    """
+    Zwraca odwrotność macierzy z perspective w postaci jawnej (bez ogólnego odwracania macierzy).
+
+    :param float fov_y_deg: Kąt pola widzenia w pionie w stopniach.
+    :param float aspect: Stosunek szerokości do wysokości widoku.
+    :param float near: Odległość od płaszczyzny bliskiej.
+    :param float far: Odległość od płaszczyzny dalekiej.
+    :return: Macierz odwrotna projekcji (4x4).
+    """
+
+    f = 1.0 / math.tan(math.radians(fov_y_deg) / 2.0)
+    c = (far + near) / (near - far)
+    d = (2.0 * far * near) / (near - far)
+    M = np.zeros((4, 4), dtype=np.float32)
+    M[0, 0] = aspect / f
+    M[1, 1] = 1.0 / f
+    M[2, 3] = -1.0
+    M[3, 2] = 1.0 / d
+    M[3, 3] = c / d
+    return M
+
 def look_at(eye, target, up):
     """
     Generuje macierz widoku (view matrix) na podstawie pozycji kamery, punktu docelowego i wektora "up".
@@ -48,6 +70,20 @@ def look_at(eye, target, up):
     T[2, 3] = -eye[2]
     return M @ T
 
+def look_at_inverse(view):
+    """
+    Zwraca odwrotność macierzy widoku z look_at. Macierz widoku to obrót i przesunięcie,
+    więc odwrotność to transpozycja obrotu i przesunięcie o -R^T t.
+
+    :param np.array view: Macierz widoku (4x4) zbudowana przez look_at.
+    :return: Macierz odwrotna widoku (4x4).
+    """
+    R = view[0:3, 0:3]
+    M = np.identity(4, dtype=np.float32)
+    M[0:3, 0:3] = R.T
+    M[0:3, 3] = -R.T @ view[0:3, 3]
+    return M
+
 def ray_box_intersection(ray_origin, ray_dir, box_min, box_max):
     """
     Oblicza przecięcie promienia z osiągniętym pudełkiem (AABB).
@@ -72,9 +108,179 @@ def ray_box_intersection(ray_origin, ray_dir, box_min, box_max):
         return None, None
     return t_near, t_far
 
-def compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos):
+def frustum_planes(view_proj):
+    """
+    Wyznacza płaszczyzny ostrosłupa widzenia z macierzy projekcji razy widoku (metoda Gribba-Hartmanna).
+
+    :param np.array view_proj: Macierz proj @ view (4x4).
+    :return: Tablica (6, 4) znormalizowanych płaszczyzn (a, b, c, d), wnętrze spełnia a*x + b*y + c*z + d >= 0.
+    """
+    m = np.asarray(view_proj, dtype=np.float64)
+    planes = np.array([
+        m[3] + m[0], m[3] - m[0],          # lewa, prawa
+        m[3] + m[1], m[3] - m[1],          # dolna, górna
+        m[3] + m[2], m[3] - m[2],          # bliska, daleka
+    ])
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+def boxes_in_frustum(planes, box_mins, box_maxs):
+    """
+    Sprawdza jednocześnie wiele prostopadłościanów (AABB) względem ostrosłupa widzenia.
+    Dla każdej płaszczyzny testowany jest wierzchołek pudełka najdalej w stronę jej normalnej.
+
+    :param np.array planes: Tablica (6, 4) płaszczyzn z frustum_planes.
+    :param np.array box_mins: Tablica (N, 3) minimalnych współrzędnych pudełek.
+    :param np.array box_maxs: Tablica (N, 3) maksymalnych współrzędnych pudełek.
+    :return: Tablica bool (N,) - True dla pudełek przynajmniej częściowo widocznych.
+    """
+    corner = np.where(planes[None, :, :3] >= 0.0, box_maxs[:, None, :], box_mins[:, None, :])
+    dist = np.einsum("npk,pk->np", corner, planes[:, :3]) + planes[:, 3]
+    return (dist >= 0.0).all(axis=1)
+
+def traverse_grid(ray_origin, ray_dir, cell_lo, cell_hi, cell_size=1.0):
+    """
+    Przechodzi po komórkach siatki przecinanych przez promień (algorytm Amanatidesa–Woo).
+
+    Komórki są zwracane w kolejności wzdłuż promienia, więc wywołujący może
+    przerwać iterację na pierwszej pełnej komórce. Koszt jest proporcjonalny
+    do liczby przeciętych komórek, a nie do rozmiaru siatki.
+
+    :param np.array ray_origin: Początek promienia (3-elementowy wektor).
+    :param np.array ray_dir: Kierunek promienia (3-elementowy wektor).
+    :param cell_lo: Minimalny indeks komórki w każdej osi (włącznie).
+    :param cell_hi: Maksymalny indeks komórki w każdej osi (wyłącznie).
+    :param float cell_size: Rozmiar komórki w jednostkach świata.
+    :return: Generator krotek (cell, normal, t_enter), gdzie normal to normalna ściany, przez którą promień wszedł do komórki ((0, 0, 0) dla komórki startowej wewnątrz siatki).
+    """
+    o = [float(v) for v in ray_origin]
+    d = [float(v) for v in ray_dir]
+
+    t_enter, t_exit = 0.0, math.inf
+    enter_axis = -1
+    for a in range(3):
+        lo = cell_lo[a] * cell_size
+        hi = cell_hi[a] * cell_size
+        if d[a] == 0.0:
+            if o[a] < lo or o[a] >= hi:
+                return
+            continue
+        t0 = (lo - o[a]) / d[a]
+        t1 = (hi - o[a]) / d[a]
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+            enter_axis = a
+        t_exit = min(t_exit, t1)
+    if t_enter > t_exit:
+        return
+
+    cell = [0, 0, 0]
+    step = [0, 0, 0]
+    t_max = [math.inf, math.inf, math.inf]
+    t_delta = [math.inf, math.inf, math.inf]
+    for a in range(3):
+        p = o[a] + d[a] * t_enter
+        c = int(math.floor(p / cell_size))
+        cell[a] = min(max(c, cell_lo[a]), cell_hi[a] - 1)
+        if d[a] > 0.0:
+            step[a] = 1
+            t_delta[a] = cell_size / d[a]
+        elif d[a] < 0.0:
+            step[a] = -1
+            t_delta[a] = -cell_size / d[a]
+    if enter_axis >= 0:
+        # na ścianie wejścia zaokrąglenie floor bywa niestabilne, więc indeks ustalamy wprost
+        cell[enter_axis] = cell_lo[enter_axis] if d[enter_axis] > 0.0 else cell_hi[enter_axis] - 1
+    for a in range(3):
+        if step[a] != 0:
+            boundary = (cell[a] + (1 if step[a] > 0 else 0)) * cell_size
+            t_max[a] = (boundary - o[a]) / d[a]
+
+    normal = [0, 0, 0]
+    if enter_axis >= 0:
+        normal[enter_axis] = -step[enter_axis]
+
+    t = t_enter
+    while True:
+        yield (cell[0], cell[1], cell[2]), (normal[0], normal[1], normal[2]), t
+
+        if t_max[0] < t_max[1]:
+            a = 0 if t_max[0] < t_max[2] else 2
+        else:
+            a = 1 if t_max[1] < t_max[2] else 2
+
+        t = t_max[a]
+        if t > t_exit:
+            return
+        cell[a] += step[a]
+        if cell[a] < cell_lo[a] or cell[a] >= cell_hi[a]:
+            return
+        t_max[a] += t_delta[a]
+        normal = [0, 0, 0]
+        normal[a] = -step[a]
+
+def ray_boxes_intersection(ray_origins, ray_dirs, box_mins, box_maxs):
+    """
+    Wektorowa wersja ray_box_intersection: testuje jeden lub wiele promieni względem wielu pudełek
+    w jednym przebiegu NumPy.
+
+    :param np.array ray_origins: Początek promienia (3,) lub początki M promieni (M, 3).
+    :param np.array ray_dirs: Kierunek promienia (3,) lub kierunki M promieni (M, 3).
+    :param np.array box_mins: Tablica (N, 3) minimalnych współrzędnych pudełek.
+    :param np.array box_maxs: Tablica (N, 3) maksymalnych współrzędnych pudełek.
+    :return: (hit, t_near, t_far) - tablice kształtu (N,) dla jednego promienia lub (M, N) dla wielu.
+    """
+    origins = np.asarray(ray_origins, dtype=np.float32)
+    dirs = np.asarray(ray_dirs, dtype=np.float32)
+    single = origins.ndim == 1
+    origins = origins.reshape(-1, 1, 3)
+    dirs = dirs.reshape(-1, 1, 3)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tmin = (box_mins[None, :, :] - origins) / dirs
+        tmax = (box_maxs[None, :, :] - origins) / dirs
+
+    t_near = np.minimum(tmin, tmax).max(axis=2)
+    t_far = np.maximum(tmin, tmax).min(axis=2)
+    hit = (t_near <= t_far) & (t_far >= 0)
+
+    if single:
+        return hit[0], t_near[0], t_far[0]
+    return hit, t_near, t_far
+
+def nearest_box_hit(ray_origin, ray_dir, box_mins, box_maxs):
+    """
+    Znajduje najbliższe pudełko trafione przez promień przed jego początkiem (t_near >= 0)
+    oraz ścianę, przez którą promień do niego wchodzi.
+
+    :param np.array ray_origin: Początek promienia (3-elementowy wektor).
+    :param np.array ray_dir: Kierunek promienia (3-elementowy wektor).
+    :param np.array box_mins: Tablica (N, 3) minimalnych współrzędnych pudełek.
+    :param np.array box_maxs: Tablica (N, 3) maksymalnych współrzędnych pudełek.
+    :return: (index, t_near, normal) lub (None, None, None), jeśli promień nie trafia żadnego pudełka.
+    """
+    if len(box_mins) == 0:
+        return None, None, None
+
+    hit, t_near, _ = ray_boxes_intersection(ray_origin, ray_dir, box_mins, box_maxs)
+    candidates = np.where(hit & (t_near >= 0.0), t_near, np.inf)
+    index = int(np.argmin(candidates))
+    if not np.isfinite(candidates[index]):
+        return None, None, None
+
+    # ściana wejścia leży na osi, dla której promień najpóźniej wchodzi w przedział pudełka
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = np.minimum((box_mins[index] - ray_origin) / ray_dir, (box_maxs[index] - ray_origin) / ray_dir)
+    axis = int(np.nanargmax(t1))
+    normal = [0, 0, 0]
+    normal[axis] = -1 if ray_dir[axis] > 0 else 1
+    return index, float(candidates[index]), tuple(normal)
+
+def compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos, inv_view=None, inv_proj=None):
     """
     Oblicza promień w przestrzeni świata na podstawie pozycji myszy.
+    Gotowe macierze odwrotne (np. z pamięci podręcznej kamery) pozwalają pominąć odwracanie macierzy.
 
     :param float mouse_x: Pozycja myszy w pikselach (oś X).
     :param float mouse_y: Pozycja myszy w pikselach (oś Y).
@@ -83,6 +289,8 @@ def compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat,
     :param np.array view_mat: Macierz widoku (4x4).
     :param np.array proj_mat: Macierz projekcji (4x4).
     :param np.array cam_pos: Pozycja kamery (3-elementowy wektor).
+    :param np.array inv_view: Macierz odwrotna widoku lub None.
+    :param np.array inv_proj: Macierz odwrotna projekcji lub None.
     :return: (ray_origin, ray_dir)
     """
     x = (2.0 * mouse_x) / width - 1.0
@@ -90,8 +298,10 @@ def compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat,
     z = 1.0
     ray_nds = np.array([x, y, z, 1.0], dtype=np.float32)
 
-    inv_proj = np.linalg.inv(proj_mat)
-    inv_view = np.linalg.inv(view_mat)
+    if inv_proj is None:
+        inv_proj = np.linalg.inv(proj_mat)
+    if inv_view is None:
+        inv_view = np.linalg.inv(view_mat)
 
     ray_eye = inv_proj @ ray_nds
     ray_eye = np.array([ray_eye[0], ray_eye[1], -1.0, 0.0], dtype=np.float32)
@@ -1,25 +1,39 @@
 import numpy as np
-from utils import compute_ray_from_mouse, ray_box_intersection
+from chunks import ChunkMap, MAX_MATERIALS, pack_cells, pack_keys
+from bulk_edit import box_bounds, sphere_mask, cylinder_mask, flood_mask, transform_block
+from constants import CHUNK_SIZE
+from journal import EditJournal, JOURNAL_MAX_BYTES
+from utils import compute_ray_from_mouse, ray_box_intersection, nearest_box_hit, traverse_grid
 # jeśli używasz pakietu "Projekt", możesz też dać:
-# from Projekt.utils import compute_ray_from_mouse, ray_box_intersection
+# from Projekt.utils import compute_ray_from_mouse, ray_box_intersection, nearest_box_hit, traverse_grid
 
 """
 Klasa reprezentująca edytor voxelowy i operacje na voxelach.
+Voxele są przechowywane w rzadkiej mapie chunków; grid_size określa edytowalny obszar świata.
+Edycje są zapisywane w dzienniku, z którego można je cofać i ponawiać. Wybór voxela promieniem
+i zapytania o obszar korzystają z hierarchicznego indeksu zajętości mapy chunków (octree).
 """
 class VoxelEditor:
-    def __init__(self, grid_size, voxel_size):
+    def __init__(self, grid_size, voxel_size, chunk_size=CHUNK_SIZE, journal_max_bytes=JOURNAL_MAX_BYTES, seed=True):
         self.grid_size = grid_size
         self.voxel_size = voxel_size
-        self.voxels = np.zeros((grid_size, grid_size, grid_size), dtype=np.uint8)
-        self.material_ids_3d = np.zeros((grid_size, grid_size, grid_size), dtype=np.uint8)
+        self.chunk_map = ChunkMap(chunk_size, voxel_size)
+        self.journal = EditJournal(journal_max_bytes)
+        self.clipboard = None              # blok komórek skopiowany przez copy_region
+        self.version = 0                   # zwiększany przy każdej zmianie świata
+        self.on_change = None              # wywoływana po zmianie komórek: (coords, nowe wartości), np. przez autozapis
 
-        center = grid_size // 2
-        self.voxels[center-1:center+2, center-1:center+2, center-1:center+2] = 1
-        self.material_ids_3d[center-1:center+2, center-1:center+2, center-1:center+2] = 1  
-        self.offsets = None                #
-        self.material_ids = None           
+        if seed:
+            # nowy świat zaczyna się od bloku 3x3x3 na środku, wczytany (open_scene) - pusty
+            center = grid_size // 2
+            block = pack_cells(np.ones((3, 3, 3)), np.ones((3, 3, 3)))
+            self.chunk_map.write_dense((center - 1, center - 1, center - 1), block)
+            self.version += 1
 
-        self.build_instance_data()
+    @property
+    def chunks(self):
+        """Słownik chunków świata indeksowany współrzędnymi chunka."""
+        return self.chunk_map.chunks
 
     def get_center(self):
         """
@@ -33,23 +47,75 @@ class VoxelEditor:
             self.grid_size * self.voxel_size / 2.0,
         ], dtype=np.float32)
 
+    def in_bounds(self, x, y, z):
+        """Sprawdza, czy voxel leży w edytowalnym obszarze świata."""
+        return 0 <= x < self.grid_size and 0 <= y < self.grid_size and 0 <= z < self.grid_size
+
+    def get_voxel(self, voxel):
+        """
+        Zwraca materiał voxela.
+
+        :param voxel: 3-elementowy wektor współrzędnych voxela.
+        :return: Identyfikator materiału lub None, jeśli voxel jest pusty.
+        """
+        return self.chunk_map.get(*voxel)
+
     def build_instance_data(self):
         """
-        Buduje tablice offsetów i identyfikatorów materiałów dla istniejących voxeli.
+        Buduje od nowa pule instancji wszystkich chunków.
+        Pojedyncze edycje aktualizują pule przyrostowo i nie wymagają przebudowy.
 
         :return: None
         """
-        xs, ys, zs = np.where(self.voxels == 1)
+        for chunk in self.chunks.values():
+            chunk.rebuild_instances()
+        self.version += 1
 
-        if len(xs) == 0:
-            self.offsets = np.zeros((0, 3), dtype=np.float32)
-            self.material_ids = np.zeros((0,), dtype=np.float32)
-            return
+    def raycast(self, ray_origin, ray_dir):
+        """
+        Znajduje pierwszy pełny voxel na drodze promienia. Promień schodzi po hierarchicznym indeksie
+        zajętości (octree), więc pusta przestrzeń jest pomijana krokami całych węzłów, chunków i bricków.
 
-        self.offsets = np.stack([xs, ys, zs], axis=1).astype(np.float32) * self.voxel_size
-        self.material_ids = self.material_ids_3d[xs, ys, zs].astype(np.float32)
+        :param np.array ray_origin: Początek promienia (3-elementowy wektor).
+        :param np.array ray_dir: Kierunek promienia (3-elementowy wektor).
+        :return: (voxel, normal, t) - współrzędne voxela, normalna ściany wejścia i odległość trafienia lub (None, None, None).
+        """
+        return self.chunk_map.tree.raycast(ray_origin, ray_dir)
 
-    def pick(self, mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos):
+    def any_in_region(self, corner_a, corner_b):
+        """
+        Sprawdza, czy w prostopadłościanie rozpiętym na dwóch narożnych voxelach jest choć jeden pełny voxel.
+
+        :param corner_a: Współrzędne pierwszego narożnika.
+        :param corner_b: Współrzędne przeciwległego narożnika.
+        :return: bool
+        """
+        return self.chunk_map.tree.any_in_box(*box_bounds(corner_a, corner_b))
+
+    def raycast_chunks(self, ray_origin, ray_dir):
+        """
+        Znajduje pierwszy pełny voxel na drodze promienia, przechodząc po płaskiej siatce chunków
+        (voxele sprawdzane są tylko w chunkach, które istnieją). Używane do porównań z raycast.
+
+        :param np.array ray_origin: Początek promienia (3-elementowy wektor).
+        :param np.array ray_dir: Kierunek promienia (3-elementowy wektor).
+        :return: (voxel, normal, t) - współrzędne voxela, normalna ściany wejścia i odległość trafienia lub (None, None, None).
+        """
+        c = self.chunk_map.chunk_size
+        n_chunks = -(-self.grid_size // c)
+        for key, _, _ in traverse_grid(ray_origin, ray_dir, (0, 0, 0), (n_chunks,) * 3, c * self.voxel_size):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                continue
+            lo = chunk.origin
+            hi = tuple(min(lo[a] + c, self.grid_size) for a in range(3))
+            for cell, normal, t in traverse_grid(ray_origin, ray_dir, lo, hi, self.voxel_size):
+                # voxel zawierający początek promienia (normalna zerowa) jest pomijany, jak w pick_brute_force
+                if normal != (0, 0, 0) and chunk.cells[cell[0] - lo[0], cell[1] - lo[1], cell[2] - lo[2]] != 0:
+                    return cell, normal, t
+        return None, None, None
+
+    def pick(self, mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos, inv_view=None, inv_proj=None):
         """
         Wybiera voxel na podstawie pozycji myszy.
 
@@ -60,34 +126,46 @@ class VoxelEditor:
         :param np.array view_mat: Macierz widoku (4x4).
         :param np.array proj_mat: Macierz projekcji (4x4).
         :param np.array cam_pos: Pozycja kamery (3-elementowy wektor).
-        :return: 3-elementowy wektor współrzędnych voxelowych wybranego voxela lub None.
+        :param np.array inv_view: Macierz odwrotna widoku lub None (zostanie obliczona).
+        :param np.array inv_proj: Macierz odwrotna projekcji lub None (zostanie obliczona).
+        :return: (voxel, normal, t) - współrzędne wybranego voxela, normalna trafionej ściany i odległość lub (None, None, None).
         """
-        ray_origin, ray_dir = compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos)
+        ray_origin, ray_dir = compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos, inv_view, inv_proj)
+        return self.raycast(ray_origin, ray_dir)
 
-        closest_t = float('inf')
-        selected = None
-
-        for x in range(self.grid_size):
-            for y in range(self.grid_size):
-                for z in range(self.grid_size):
-                    if self.voxels[x, y, z] == 0:
-                        continue
+    def pick_batched(self, mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos):
+        """
+        Wybiera voxel, testując wszystkie pełne voxele jednym wektorowym przebiegiem NumPy
+        (współrzędne instancji chunków wyznaczają minima pudełek).
 
-                    box_min = np.array([x, y, z], dtype=np.float32) * self.voxel_size
-                    box_max = box_min + self.voxel_size
+        :param float mouse_x: Pozycja myszy w pikselach (oś X).
+        :param float mouse_y: Pozycja myszy w pikselach (oś Y).
+        :param int width: Szerokość okna w pikselach.
+        :param int height: Wysokość okna w pikselach.
+        :param np.array view_mat: Macierz widoku (4x4).
+        :param np.array proj_mat: Macierz projekcji (4x4).
+        :param np.array cam_pos: Pozycja kamery (3-elementowy wektor).
+        :return: (voxel, normal, t) - jak w pick.
+        """
+        ray_origin, ray_dir = compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos)
+        if not self.chunks:
+            return None, None, None
 
-                    t_near, _ = ray_box_intersection(ray_origin, ray_dir, box_min, box_max)
-                    if t_near is not None and t_near < closest_t and t_near >= 0.0:
-                        closest_t = t_near
-                        selected = (x, y, z)
+        chunks = list(self.chunks.values())
+        box_mins = np.concatenate([chunk.instances.coords for chunk in chunks]).astype(np.float32) * self.voxel_size
+        index, t, normal = nearest_box_hit(ray_origin, ray_dir, box_mins, box_mins + self.voxel_size)
+        if index is None:
+            return None, None, None
 
-        return selected
+        for chunk in chunks:
+            if index < chunk.instances.count:
+                return chunk.instances.voxel_at[index], normal, t
+            index -= chunk.instances.count
 
-    def add_next_to(self, selected_voxel, mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos,current_material_id):
+    def pick_brute_force(self, mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos):
         """
-        Dodaje voxel obok wybranego voxela na podstawie pozycji myszy.
+        Referencyjny wybór voxela testujący każdy pełny voxel świata, używany do porównań.
 
-        :param selected_voxel: 3-elementowy wektor współrzędnych voxelowych wybranego voxela.
         :param float mouse_x: Pozycja myszy w pikselach (oś X).
         :param float mouse_y: Pozycja myszy w pikselach (oś Y).
         :param int width: Szerokość okna w pikselach.
@@ -95,47 +173,49 @@ class VoxelEditor:
         :param np.array view_mat: Macierz widoku (4x4).
         :param np.array proj_mat: Macierz projekcji (4x4).
         :param np.array cam_pos: Pozycja kamery (3-elementowy wektor).
-        :param int current_material_id: Identyfikator materiału dla nowego voxela.
-        :return: None
+        :return: 3-elementowy wektor współrzędnych voxelowych wybranego voxela lub None.
         """
-        if selected_voxel is None:
-            return
-
         ray_origin, ray_dir = compute_ray_from_mouse(mouse_x, mouse_y, width, height, view_mat, proj_mat, cam_pos)
 
-        x, y, z = selected_voxel
-        box_min = np.array([x, y, z], dtype=np.float32) * self.voxel_size
-        box_max = box_min + self.voxel_size
+        closest_t = float('inf')
+        selected = None
 
-        t_near, _ = ray_box_intersection(ray_origin, ray_dir, box_min, box_max)
-        if t_near is None:
-            return
+        for chunk in self.chunks.values():
+            for local in np.argwhere(chunk.cells != 0):
+                x, y, z = (int(v) for v in local + np.array(chunk.origin))
+
+                box_min = np.array([x, y, z], dtype=np.float32) * self.voxel_size
+                box_max = box_min + self.voxel_size
 
-        hit_point = ray_origin + t_near * ray_dir
+                t_near, _ = ray_box_intersection(ray_origin, ray_dir, box_min, box_max)
+                if t_near is not None and t_near < closest_t and t_near >= 0.0:
+                    closest_t = t_near
+                    selected = (x, y, z)
 
-        eps = 1e-3
-        normal = np.array([0, 0, 0], dtype=int)
+        return selected
+
+    def add_next_to(self, selected_voxel, normal, current_material_id):
+        """
+        Dodaje voxel obok wybranego voxela, po stronie trafionej ściany.
 
-        if abs(hit_point[0] - box_min[0]) < eps:
-            normal = np.array([-1, 0, 0], dtype=int)
-        elif abs(hit_point[0] - box_max[0]) < eps:
-            normal = np.array([1, 0, 0], dtype=int)
-        elif abs(hit_point[1] - box_min[1]) < eps:
-            normal = np.array([0, -1, 0], dtype=int)
-        elif abs(hit_point[1] - box_max[1]) < eps:
-            normal = np.array([0, 1, 0], dtype=int)
-        elif abs(hit_point[2] - box_min[2]) < eps:
-            normal = np.array([0, 0, -1], dtype=int)
-        elif abs(hit_point[2] - box_max[2]) < eps:
-            normal = np.array([0, 0, 1], dtype=int)
+        :param selected_voxel: 3-elementowy wektor współrzędnych voxelowych wybranego voxela.
+        :param normal: Normalna trafionej ściany zwrócona przez pick.
+        :param int current_material_id: Identyfikator materiału dla nowego voxela.
+        :return: None
+        """
+        if selected_voxel is None or normal is None or normal == (0, 0, 0):
+            return
 
-        new_voxel = np.array([x, y, z], dtype=int) + normal
-        nx, ny, nz = new_voxel
+        nx = selected_voxel[0] + normal[0]
+        ny = selected_voxel[1] + normal[1]
+        nz = selected_voxel[2] + normal[2]
 
-        if 0 <= nx < self.grid_size and 0 <= ny < self.grid_size and 0 <= nz < self.grid_size:
-            self.voxels[nx, ny, nz] = 1
-            self.material_ids_3d[nx, ny, nz] = current_material_id
-            self.build_instance_data()
+        if self.in_bounds(nx, ny, nz):
+            old = self.chunk_map.get_cell(nx, ny, nz)
+            self.chunk_map.set(nx, ny, nz, current_material_id)
+            self.journal.record((nx, ny, nz), old, current_material_id + 1, "dodanie voxela")
+            self.version += 1
+            self._changed([(nx, ny, nz)], [current_material_id + 1])
 
     def remove(self, selected_voxel):
         """
@@ -146,8 +226,274 @@ class VoxelEditor:
         """
         if selected_voxel is None:
             return
-        x, y, z = selected_voxel
-        self.voxels[x, y, z] = 0
-        self.material_ids_3d[x, y, z] = 0
-        self.build_instance_data()
+        old = self.chunk_map.get_cell(*selected_voxel)
+        if self.chunk_map.clear(*selected_voxel):
+            self.journal.record(selected_voxel, old, 0, "usunięcie voxela")
+            self.version += 1
+            self._changed([selected_voxel], [0])
+
+    def undo(self):
+        """
+        Cofa ostatnią operację z dziennika, zapisując przyrostowo stare wartości zmienionych komórek.
+
+        :return: True jeśli coś zostało cofnięte.
+        """
+        delta = self.journal.take_undo()
+        if delta is None:
+            return False
+        self.chunk_map.write_cells(*delta)
+        self.version += 1
+        self._changed(*delta)
+        return True
+
+    def redo(self):
+        """
+        Ponawia ostatnio cofniętą operację.
+
+        :return: True jeśli coś zostało ponowione.
+        """
+        delta = self.journal.take_redo()
+        if delta is None:
+            return False
+        self.chunk_map.write_cells(*delta)
+        self.version += 1
+        self._changed(*delta)
+        return True
+
+    def write_cells(self, coords, values, label="zapis komórek"):
+        """
+        Zapisuje wartości pojedynczych komórek jedną operacją (jeden wpis w dzienniku).
+        Voxele spoza edytowalnego obszaru są pomijane, a przy powtórzeniach zostaje ostatnia wartość.
+
+        :param np.array coords: Współrzędne voxeli (N, 3).
+        :param np.array values: Wartości komórek (N,) (0 = pusto, materiał + 1).
+        :param str label: Opis operacji w dzienniku.
+        :return: Liczba zmienionych voxeli.
+        """
+        coords = np.asarray(coords, dtype=np.int64).reshape(-1, 3)
+        values = np.asarray(values, dtype=np.uint8).reshape(-1)
+        inside = np.all((coords >= 0) & (coords < self.grid_size), axis=1)
+        coords, values = coords[inside], values[inside]
+        if len(coords) == 0:
+            return 0
+        _, last = np.unique(pack_keys(coords)[::-1], return_index=True)
+        keep = len(coords) - 1 - last
+        coords, values = coords[keep], values[keep]
+        old = self.chunk_map.read_cells(coords)
+        changed = old != values
+        n_changed = int(np.count_nonzero(changed))
+        if n_changed == 0:
+            return 0
+        coords, old, values = coords[changed], old[changed], values[changed]
+        self.journal.record_many(coords, old, values, label)
+        self.chunk_map.write_cells(coords, values)
+        self.version += 1
+        self._changed(coords, values)
+        return n_changed
+
+    def _changed(self, coords, values):
+        """
+        Powiadamia obserwatora (on_change) o zmienionych komórkach.
+
+        :param coords: Współrzędne voxeli (N, 3).
+        :param values: Nowe wartości komórek (N,).
+        """
+        if self.on_change is not None:
+            self.on_change(np.asarray(coords, dtype=np.int32).reshape(-1, 3), np.asarray(values, dtype=np.uint8).reshape(-1))
+
+    def _clip(self, lo, hi):
+        """
+        Przycina obszar do edytowalnego obszaru świata.
+
+        :return: (lo, hi) lub None, jeśli obszar jest pusty.
+        """
+        lo = tuple(max(int(v), 0) for v in lo)
+        hi = tuple(min(int(v), self.grid_size) for v in hi)
+        if any(l >= h for l, h in zip(lo, hi)):
+            return None
+        return lo, hi
+
+    def _write_region(self, lo, old, new, label):
+        """
+        Zapisuje nową zawartość obszaru jedną operacją: zmienione komórki trafiają do dziennika
+        jako jeden wpis, a każdy zmieniony chunk ma przebudowywaną pulę instancji raz.
+
+        :param tuple lo: Dolny narożnik obszaru.
+        :param np.array old: Dotychczasowe komórki obszaru.
+        :param np.array new: Nowe komórki obszaru.
+        :param str label: Opis operacji w dzienniku.
+        :return: Liczba zmienionych voxeli.
+        """
+        changed = old != new
+        n_changed = int(np.count_nonzero(changed))
+        if n_changed == 0:
+            return 0
+        coords = np.argwhere(changed) + np.array(lo, dtype=np.int64)
+        self.journal.record_many(coords, old[changed], new[changed], label)
+        self.chunk_map.write_dense(lo, new)
+        self.version += 1
+        self._changed(coords, new[changed])
+        return n_changed
+
+    def _fill_mask(self, lo, hi, mask_fn, material_id, label):
+        """
+        Wypełnia materiałem (lub opróżnia, gdy material_id jest None) voxele obszaru wskazane maską.
+
+        :param mask_fn: Funkcja (lo, hi) -> maska bool obszaru lub None (cały obszar).
+        :return: Liczba zmienionych voxeli.
+        """
+        value = 0 if material_id is None else _cell_value(material_id)
+        clipped = self._clip(lo, hi)
+        if clipped is None:
+            return 0
+        lo, hi = clipped
+        old = self.chunk_map.read_dense(lo, tuple(h - l for l, h in zip(lo, hi)))
+        if mask_fn is None:
+            new = np.full_like(old, value)
+        else:
+            new = np.where(mask_fn(lo, hi), np.uint8(value), old)
+        return self._write_region(lo, old, new, label)
+
+    def fill_box(self, corner_a, corner_b, material_id):
+        """
+        Wypełnia materiałem prostopadłościan rozpięty na dwóch narożnych voxelach (włącznie).
+
+        :param corner_a: Współrzędne pierwszego narożnika.
+        :param corner_b: Współrzędne przeciwległego narożnika.
+        :param int material_id: Identyfikator materiału.
+        :return: Liczba zmienionych voxeli.
+        """
+        return self._fill_mask(*box_bounds(corner_a, corner_b), None, material_id, "wypełnienie prostopadłościanu")
+
+    def clear_box(self, corner_a, corner_b):
+        """
+        Opróżnia prostopadłościan rozpięty na dwóch narożnych voxelach (włącznie).
+
+        :return: Liczba usuniętych voxeli.
+        """
+        return self._fill_mask(*box_bounds(corner_a, corner_b), None, None, "usunięcie prostopadłościanu")
+
+    def fill_sphere(self, center, radius, material_id):
+        """
+        Wypełnia materiałem voxele, których środek leży w kuli.
+
+        :param center: Środek kuli we współrzędnych voxelowych.
+        :param float radius: Promień kuli w voxelach.
+        :param int material_id: Identyfikator materiału lub None (opróżnienie).
+        :return: Liczba zmienionych voxeli.
+        """
+        lo = tuple(int(np.floor(c - radius)) for c in center)
+        hi = tuple(int(np.ceil(c + radius)) + 1 for c in center)
+        label = "usunięcie kuli" if material_id is None else "wypełnienie kuli"
+        return self._fill_mask(lo, hi, lambda l, h: sphere_mask(l, h, center, radius), material_id, label)
+
+    def clear_sphere(self, center, radius):
+        """Opróżnia voxele, których środek leży w kuli. Zwraca liczbę usuniętych voxeli."""
+        return self.fill_sphere(center, radius, None)
+
+    def fill_cylinder(self, base, radius, height, material_id, axis=1):
+        """
+        Wypełnia materiałem walec o osi równoległej do osi układu.
+
+        :param base: Środek podstawy walca we współrzędnych voxelowych.
+        :param float radius: Promień walca w voxelach.
+        :param int height: Wysokość walca w voxelach (wzdłuż axis, od podstawy).
+        :param int material_id: Identyfikator materiału lub None (opróżnienie).
+        :param int axis: Oś walca (0 = X, 1 = Y, 2 = Z).
+        :return: Liczba zmienionych voxeli.
+        """
+        lo = [int(np.floor(c - radius)) for c in base]
+        hi = [int(np.ceil(c + radius)) + 1 for c in base]
+        lo[axis], hi[axis] = int(base[axis]), int(base[axis]) + int(height)
+        label = "usunięcie walca" if material_id is None else "wypełnienie walca"
+        return self._fill_mask(tuple(lo), tuple(hi), lambda l, h: cylinder_mask(l, h, base, radius, axis), material_id, label)
+
+    def clear_cylinder(self, base, radius, height, axis=1):
+        """Opróżnia walec (parametry jak w fill_cylinder). Zwraca liczbę usuniętych voxeli."""
+        return self.fill_cylinder(base, radius, height, None, axis)
+
+    def replace_material(self, corner_a, corner_b, old_material, new_material):
+        """
+        Zamienia materiał voxeli w prostopadłościanie.
+
+        :param corner_a: Współrzędne pierwszego narożnika.
+        :param corner_b: Współrzędne przeciwległego narożnika.
+        :param int old_material: Materiał do zamiany.
+        :param int new_material: Nowy materiał.
+        :return: Liczba zmienionych voxeli.
+        """
+        old_value = np.uint8(_cell_value(old_material))
+        new_value = np.uint8(_cell_value(new_material))
+        clipped = self._clip(*box_bounds(corner_a, corner_b))
+        if clipped is None:
+            return 0
+        lo, hi = clipped
+        old = self.chunk_map.read_dense(lo, tuple(h - l for l, h in zip(lo, hi)))
+        new = np.where(old == old_value, new_value, old)
+        return self._write_region(lo, old, new, "zamiana materiału")
+
+    def flood_fill(self, start, material_id):
+        """
+        Wypełnia materiałem spójny (przez ściany) obszar voxeli o tej samej wartości co voxel startowy,
+        ograniczony do edytowalnego obszaru świata. Pusty voxel startowy wypełnia pustą przestrzeń,
+        a pełny - zamienia materiał połączonej bryły.
+
+        :param start: Współrzędne voxela startowego.
+        :param int material_id: Identyfikator materiału.
+        :return: Liczba zmienionych voxeli.
+        """
+        if not self.in_bounds(*start):
+            return 0
+        value = np.uint8(_cell_value(material_id))
+        lo = (0, 0, 0)
+        old = self.chunk_map.read_dense(lo, (self.grid_size,) * 3)
+        if old[tuple(start)] == value:
+            return 0
+        new = np.where(flood_mask(old, start), value, old)
+        return self._write_region(lo, old, new, "wypełnienie obszaru")
+
+    def copy_region(self, corner_a, corner_b):
+        """
+        Kopiuje komórki prostopadłościanu do schowka.
+
+        :param corner_a: Współrzędne pierwszego narożnika.
+        :param corner_b: Współrzędne przeciwległego narożnika.
+        :return: Tablica uint8 skopiowanych komórek.
+        """
+        lo, hi = box_bounds(corner_a, corner_b)
+        self.clipboard = self.chunk_map.read_dense(lo, tuple(h - l for l, h in zip(lo, hi)))
+        return self.clipboard
+
+    def paste(self, origin, cells=None, quarter_turns=0, axis=1, mirror=(), skip_empty=True):
+        """
+        Wkleja blok komórek (domyślnie schowek) po obrocie i odbiciu.
+
+        :param origin: Współrzędne voxela, w którym ląduje narożnik [0, 0, 0] przekształconego bloku.
+        :param np.array cells: Blok komórek lub None (schowek).
+        :param int quarter_turns: Liczba obrotów o 90 stopni wokół osi axis.
+        :param int axis: Oś obrotu (0 = X, 1 = Y, 2 = Z).
+        :param tuple mirror: Osie odbicia.
+        :param bool skip_empty: Czy puste komórki bloku zostawiają świat bez zmian.
+        :return: Liczba zmienionych voxeli.
+        """
+        block = self.clipboard if cells is None else cells
+        if block is None:
+            return 0
+        block = transform_block(block, quarter_turns, axis, mirror)
+        lo = tuple(int(v) for v in origin)
+        hi = tuple(l + n for l, n in zip(lo, block.shape))
+        clipped = self._clip(lo, hi)
+        if clipped is None:
+            return 0
+        c_lo, c_hi = clipped
+        block = block[tuple(slice(cl - l, ch - l) for l, cl, ch in zip(lo, c_lo, c_hi))]
+        old = self.chunk_map.read_dense(c_lo, block.shape)
+        new = np.where(block != 0, block, old) if skip_empty else block.copy()
+        return self._write_region(c_lo, old, new, "wklejenie")
+
 
+def _cell_value(material_id):
+    """Zwraca wartość komórki dla materiału, sprawdzając zakres identyfikatora."""
+    if not 0 <= material_id < MAX_MATERIALS:
+        raise ValueError(f"Identyfikator materiału poza zakresem: {material_id}")
+    return material_id + 1